@@ -1,5 +1,13 @@
 import math
 
+from scalar_correlations import (
+    calculate_compressor_base_cost,
+    calculate_compressor_power,
+    calculate_heat_exchanger_base_cost,
+    calculate_heat_exchanger_material_factor,
+    calculate_pressure_factor,
+)
+
 # Constants
 DENSITY_CARBON_STEEL = 490  # lb/ft^3
 WALL_THICKNESS = 0.20833  # 2.5 inches in feet
@@ -32,7 +40,7 @@ TRAY_MATERIAL_FACTORS = {
 
 # Heat exchanger material factors (from Table 22.25)
 HEAT_EXCHANGER_MATERIAL_FACTORS = {
-    "carbon steel/carbon steel": {"a": 0.00, "b": 0.09},
+    "carbon steel/carbon steel": {"a": 0.00, "b": 0.00},
     "carbon steel/brass": {"a": 1.08, "b": 0.05},
     "carbon steel/stainless steel": {"a": 1.75, "b": 0.13},
     "carbon steel/monel": {"a": 2.7, "b": 0.13},
@@ -219,15 +227,11 @@ def calculate_heat_exchanger_cost():
     tube_length = float(input("Enter the tube length (ft) (any number less than 20) : "))
 
     # Calculate base cost (C_B)
-    ln_area = math.log(area)
-    base_cost = math.exp(11.667 - 0.8709 * ln_area + 0.09005 * (ln_area**2))
+    base_cost = calculate_heat_exchanger_base_cost(area)
     print(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Pressure correction factor (F_P)
-    if pressure > 100:
-        pressure_factor = 0.9803 + 0.018 * (pressure / 100) + 0.0017 * (pressure / 100)**2
-    else:
-        pressure_factor = 1.0
+    pressure_factor = calculate_pressure_factor(pressure)
     print(f"Pressure correction factor (F_P): {pressure_factor:.2f}")
 
     # Tube length correction factor (F_L)
@@ -238,8 +242,7 @@ def calculate_heat_exchanger_cost():
     print(f"Tube length correction factor (F_L): {tube_length_factor:.2f}")
 
     # Material correction factor (F_M)
-    material_data = HEAT_EXCHANGER_MATERIAL_FACTORS.get(material, {"a": 0.00, "b": 0.09})
-    material_factor = material_data["a"] + (area / 100) ** material_data["b"]
+    material_factor = calculate_heat_exchanger_material_factor(area, material, HEAT_EXCHANGER_MATERIAL_FACTORS)
     print(f"Material correction factor (F_M): {material_factor:.2f}")
 
     # Total cost
@@ -260,11 +263,11 @@ def calculate_compressor_cost():
     material = input("Enter the material of construction (carbon steel, stainless steel, nickel alloy): ").lower()
 
     # Calculate power consumption (P_c)
-    power_consumption = 0.00436 * (specific_heat_ratio / (specific_heat_ratio - 1)) * (inlet_flow * inlet_pressure / efficiency) * ((outlet_pressure / inlet_pressure) ** ((specific_heat_ratio - 1) / specific_heat_ratio) - 1)
+    power_consumption = calculate_compressor_power(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency)
     print(f"Power consumption (P_c): {power_consumption:.2f} horsepower")
 
     # Calculate base cost (C_B)
-    base_cost = math.exp(7.580 + 0.8 * math.log(power_consumption))
+    base_cost = calculate_compressor_base_cost(power_consumption)
     print(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Drive type factor (F_D)
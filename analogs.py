@@ -0,0 +1,199 @@
+import csv
+import heapq
+
+import numpy as np
+
+from batch_costing import DEFAULT_MATERIALS, size_variable
+from extrapolation import SCALING_EXPONENT, cost_in_range
+from instrumentation import count_rows, instrument
+from validation import select_rows
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy is optional; fall back to the KDTree below
+    cKDTree = None
+
+# Chemical Engineering plant cost index the correlations are based on; analog costs are escalated to it
+CE_INDEX = 500
+
+# Analogs farther than this in feature space are not used (a size ratio of about 1.65 at equal pressure)
+MAX_DISTANCE = 0.5
+
+# Feature weights: ln(size), ln(1 + P/100)
+FEATURE_WEIGHTS = np.array([1.0, 1.0])
+
+def features(size, pressure):
+    """
+    Normalized features for the nearest-neighbour search.
+    """
+    size = np.asarray(size, dtype=float)
+    pressure = np.broadcast_to(np.asarray(pressure, dtype=float), size.shape)
+    return np.column_stack([np.log(size), np.log1p(np.maximum(pressure, 0) / 100)]) * FEATURE_WEIGHTS
+
+class KDTree:
+    """
+    k-d tree over a fixed set of points, for k-nearest-neighbour queries when scipy is unavailable.
+    """
+
+    def __init__(self, points, leaf_size=16):
+        self.points = np.asarray(points, dtype=float)
+        self.leaf_size = leaf_size
+        self.index = np.arange(len(self.points))
+        # Nodes are (split dimension, split value, left child, right child, start, stop); leaves have dimension -1
+        self.nodes = []
+        self._build(0, len(self.points))
+
+    def _build(self, start, stop):
+        node = len(self.nodes)
+        self.nodes.append(None)
+        if stop - start <= self.leaf_size:
+            self.nodes[node] = (-1, 0.0, -1, -1, start, stop)
+            return node
+        points = self.points[self.index[start:stop]]
+        dimension = int(np.argmax(points.max(axis=0) - points.min(axis=0)))
+        middle = (stop - start) // 2
+        order = np.argpartition(points[:, dimension], middle)
+        self.index[start:stop] = self.index[start:stop][order]
+        split = self.points[self.index[start + middle], dimension]
+        left = self._build(start, start + middle)
+        right = self._build(start + middle, stop)
+        self.nodes[node] = (dimension, split, left, right, start, stop)
+        return node
+
+    def _query_one(self, point, k):
+        best = []  # max-heap of (-distance², index)
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if len(best) == k and bound >= -best[0][0]:
+                continue
+            dimension, split, left, right, start, stop = self.nodes[node]
+            if dimension < 0:
+                candidates = self.index[start:stop]
+                distances = np.sum((self.points[candidates] - point) ** 2, axis=1)
+                for distance, candidate in zip(distances.tolist(), candidates.tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, candidate))
+                    elif distance < -best[0][0]:
+                        heapq.heapreplace(best, (-distance, candidate))
+                continue
+            offset = point[dimension] - split
+            near, far = (left, right) if offset < 0 else (right, left)
+            stack.append((far, max(bound, offset * offset)))
+            stack.append((near, bound))
+        best.sort(reverse=True)
+        distances = np.full(k, np.inf)
+        indices = np.full(k, len(self.points))
+        for position, (distance, candidate) in enumerate(best):
+            distances[position] = np.sqrt(-distance)
+            indices[position] = candidate
+        return distances, indices
+
+    def query(self, points, k=1):
+        """
+        Distances and indices of the k nearest points to each query point (missing neighbours: inf, n).
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        distances = np.empty((len(points), k))
+        indices = np.empty((len(points), k), dtype=int)
+        for row, point in enumerate(points):
+            distances[row], indices[row] = self._query_one(point, k)
+        return distances, indices
+
+def _tree(points):
+    return cKDTree(points) if cKDTree is not None else KDTree(points)
+
+class HistoricalCostStore:
+    """
+    Costs of past equipment, indexed per (equipment type, material) for nearest-analog estimates.
+    Each record has equipment_type, material (DEFAULT_MATERIALS of its type if blank), size (in the units of the type's correlation, see
+    VALIDITY_RANGES), pressure (psig), cost ($) and optionally cost_index and tag.
+    """
+
+    def __init__(self, records=()):
+        self.records = []
+        self.trees = {}
+        self.add(records)
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline="") as file:
+            return cls(csv.DictReader(file))
+
+    def add(self, records):
+        """
+        Add records; the affected indexes are rebuilt on the next query.
+        """
+        for record in records:
+            record = dict(record)
+            record["equipment_type"] = record["equipment_type"].lower()
+            # A blank CSV cell counts as no material, like a missing key
+            record["material"] = (record.get("material") or DEFAULT_MATERIALS.get(record["equipment_type"], "")).lower()
+            for name in ("size", "pressure", "cost"):
+                record[name] = float(record.get(name) or 0.0)
+            record["cost_index"] = float(record.get("cost_index") or CE_INDEX)
+            self.records.append(record)
+            self.trees.pop((record["equipment_type"], record["material"]), None)
+
+    def _index(self, equipment_type, material):
+        key = (equipment_type, material)
+        if key not in self.trees:
+            records = [record for record in self.records if (record["equipment_type"], record["material"]) == key]
+            if not records:
+                self.trees[key] = None
+            else:
+                size = np.array([record["size"] for record in records])
+                pressure = np.array([record["pressure"] for record in records])
+                # Escalate each record to CE_INDEX so analogs of different years are comparable
+                cost = np.array([record["cost"] * CE_INDEX / record["cost_index"] for record in records])
+                self.trees[key] = (_tree(features(size, pressure)), size, cost)
+        return self.trees[key]
+
+    @instrument("analogs.estimate", rows="columns")
+    def estimate(self, equipment_type, columns, k=3, max_distance=MAX_DISTANCE):
+        """
+        Estimate costs from the k nearest analogs, each scaled to the unit's size by the six-tenths rule
+        and weighted by inverse distance. Units with no analog within max_distance are costed with
+        the equipment type's correlation instead.
+        Returns "total", "source" ("analog" or "correlation"), "analogs" used and "distance" to the nearest.
+        """
+        rows = count_rows(columns)
+        with np.errstate(all="ignore"):
+            size = np.broadcast_to(np.asarray(size_variable(equipment_type, columns), dtype=float), (rows,))
+        pressure = np.broadcast_to(np.asarray(columns.get("pressure", 0.0), dtype=float), (rows,))
+        material = np.broadcast_to(np.char.lower(np.asarray(columns.get("material", DEFAULT_MATERIALS[equipment_type])).astype(str)), (rows,))
+
+        total = np.full(rows, np.nan)
+        distance = np.full(rows, np.inf)
+        used = np.zeros(rows, dtype=int)
+        for name in np.unique(material):
+            index = self._index(equipment_type, str(name))
+            if index is None:
+                continue
+            tree, analog_size, analog_cost = index
+            selected = np.flatnonzero((material == name) & np.isfinite(size) & (size > 0))
+            if not len(selected):
+                continue
+            neighbours = min(k, len(analog_size))
+            distances, indices = tree.query(features(size[selected], pressure[selected]), k=neighbours)
+            distances = distances.reshape(len(selected), neighbours)
+            indices = indices.reshape(len(selected), neighbours)
+            close = distances <= max_distance
+            indices = np.where(close, indices, 0)
+            scaled = analog_cost[indices] * (size[selected, None] / analog_size[indices]) ** SCALING_EXPONENT
+            weights = np.where(close, 1 / np.maximum(distances, 1e-9), 0.0)
+            with np.errstate(invalid="ignore"):
+                total[selected] = np.sum(weights * scaled, axis=1) / np.sum(weights, axis=1)
+            distance[selected] = distances[:, 0]
+            used[selected] = close.sum(axis=1)
+
+        # Fall back to the correlation where no close analog exists
+        fallback = used == 0
+        if fallback.any():
+            total[fallback] = cost_in_range(equipment_type, select_rows(columns, fallback))["total"]
+        return {
+            "total": total,
+            "source": np.where(fallback, "correlation", "analog"),
+            "analogs": used,
+            "distance": distance,
+        }
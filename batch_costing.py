@@ -0,0 +1,453 @@
+import importlib.util
+import math
+import os
+
+import numpy as np
+
+from instrumentation import instrument
+
+# Bump whenever a correlation or one of its coefficients changes so cached results are invalidated
+CORRELATION_VERSION = "3"
+
+def _load_reference_script():
+    """
+    Load "Equipment cost full script.py" as a module so the factor tables have a single source.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Equipment cost full script.py")
+    spec = importlib.util.spec_from_file_location("equipment_cost_full_script", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+reference = _load_reference_script()
+
+# Constants and factor tables shared with the CLI script
+WALL_THICKNESS = reference.WALL_THICKNESS
+MATERIAL_FACTORS = reference.MATERIAL_FACTORS
+TRAY_TYPE_FACTORS = reference.TRAY_TYPE_FACTORS
+TRAY_MATERIAL_FACTORS = reference.TRAY_MATERIAL_FACTORS
+HEAT_EXCHANGER_MATERIAL_FACTORS = reference.HEAT_EXCHANGER_MATERIAL_FACTORS
+COMPRESSOR_MATERIAL_FACTORS = reference.COMPRESSOR_MATERIAL_FACTORS
+
+# Material of construction used when a unit gives none
+DEFAULT_MATERIALS = {
+    "reactor": "carbon steel",
+    "distillation column": "carbon steel",
+    "heat exchanger": "carbon steel/carbon steel",
+    "compressor": "carbon steel",
+    "fired heater": "carbon steel",
+}
+
+# Compressor drive type factors
+COMPRESSOR_DRIVE_FACTORS = {
+    "electric": 1.0,
+    "steam turbine": 1.15,
+    "gas turbine": 1.25,
+}
+
+# Fired heater material factors
+FIRED_HEATER_MATERIAL_FACTORS = {
+    "carbon steel": 1.0,
+    "cr-mo alloy": 1.4,
+    "stainless steel": 1.7,
+}
+
+# Vessel cost intercepts: C_V = exp(a + 0.18255 * ln(W) + 0.02297 * (ln(W))^2)
+VESSEL_COST_INTERCEPTS = {
+    "reactor": 7.0132,
+    "distillation column": 7.2756,
+}
+
+# Platform and ladder coefficients: C_PL = c * D^d * L^l
+PLATFORM_LADDER_COEFFICIENTS = {
+    "reactor": (361.8, 0.73960, 0.70684),
+    "distillation column": (300.9, 0.63316, 0.80161),
+}
+
+# Input columns expected by each batch costing function
+INPUT_COLUMNS = {
+    "reactor": ("diameter", "length", "material"),
+    "distillation column": ("diameter", "length", "num_trays", "material", "tray_type", "tray_material"),
+    "heat exchanger": ("heat_duty", "flux_rate", "pressure", "material", "tube_length"),
+    "compressor": ("inlet_flow", "inlet_pressure", "outlet_pressure", "specific_heat_ratio", "efficiency", "drive_type", "material"),
+    "fired heater": ("heat_duty", "material"),
+}
+
+# Inputs that can stand in for some of INPUT_COLUMNS: reactor dimensions, exchanger area, compressor power
+ALTERNATE_INPUTS = {
+    "reactor": ("space_time", "volumetric_flow_rate"),
+    "heat exchanger": ("area",),
+    "compressor": ("power",),
+}
+
+# Result columns returned by each batch costing function
+RESULT_COLUMNS = {
+    "reactor": ("D", "L", "W", "C_V", "C_PV", "C_PL", "total"),
+    "distillation column": ("D", "L", "W", "C_V", "C_PV", "C_PL", "C_T", "total"),
+    "heat exchanger": ("A", "C_B", "F_P", "F_L", "F_M", "total"),
+    "compressor": ("P_c", "C_B", "F_D", "F_M", "total"),
+    "fired heater": ("Q", "C_B", "F_M", "total"),
+}
+
+# Size ranges over which each cost correlation was fitted (Seider et al., Tables 22.25/22.26)
+VALIDITY_RANGES = {
+    "reactor": ("W", 4200, 1000000),  # lb
+    "distillation column": ("W", 9000, 2500000),  # lb
+    "heat exchanger": ("A", 150, 12000),  # ft²
+    "compressor": ("P_c", 200, 30000),  # hp
+    "fired heater": ("Q", 10e6, 500e6),  # Btu/hr
+}
+
+# Factor tables each equipment type depends on (used to key cached results)
+TABLE_DEPENDENCIES = {
+    "reactor": ("MATERIAL_FACTORS", "VESSEL_COST_INTERCEPTS", "PLATFORM_LADDER_COEFFICIENTS"),
+    "distillation column": ("MATERIAL_FACTORS", "VESSEL_COST_INTERCEPTS", "PLATFORM_LADDER_COEFFICIENTS", "TRAY_TYPE_FACTORS", "TRAY_MATERIAL_FACTORS"),
+    "heat exchanger": ("HEAT_EXCHANGER_MATERIAL_FACTORS",),
+    "compressor": ("COMPRESSOR_DRIVE_FACTORS", "COMPRESSOR_MATERIAL_FACTORS"),
+    "fired heater": ("FIRED_HEATER_MATERIAL_FACTORS",),
+}
+
+def factor_tables(equipment_type):
+    """
+    Return the factor tables used to cost an equipment type, by name.
+    """
+    return {name: globals()[name] for name in TABLE_DEPENDENCIES[equipment_type]}
+
+@instrument("batch_costing.factor_lookup", rows="keys")
+def _lookup(table, keys, default, field=None):
+    """
+    Map an array of table keys to factor values with one dictionary lookup per distinct key.
+    Keys are matched case-insensitively, like the CLI prompts.
+    """
+    def value(key):
+        entry = table.get(str(key).lower(), default)
+        return entry[field] if field else entry
+
+    keys = np.asarray(keys)
+    if keys.ndim == 0:
+        return float(value(keys.item()))
+    unique, inverse = np.unique(keys, return_inverse=True)
+    values = np.array([value(key) for key in unique], dtype=float)
+    return values[inverse.reshape(keys.shape)]
+
+def _lookup_coefficients(table, keys):
+    """
+    Map an equipment type, or an array of them, to rows of a coefficient table.
+    A single type is looked up once and broadcasts against the batch like any scalar input.
+    """
+    keys = np.asarray(keys)
+    if keys.ndim == 0:
+        return np.asarray(table[str(keys.item()).lower()], dtype=float)
+    # Every row has the width of the table's entries, even when there are no keys
+    width = np.shape(next(iter(table.values())))
+    unique, inverse = np.unique(keys.reshape(-1), return_inverse=True)
+    rows = np.array([table[str(key).lower()] for key in unique], dtype=float).reshape((len(unique),) + width)
+    return rows[inverse.reshape(-1)].reshape(keys.shape + width)
+
+@instrument("batch_costing.vessel_weight")
+def vessel_weight(diameter, length, density):
+    """
+    Calculate the weight of the vessels.
+    Equation: W = π (D_i + t)(L + 0.8D_i) t ρ
+    """
+    diameter = np.asarray(diameter, dtype=float)
+    length = np.asarray(length, dtype=float)
+    return math.pi * (diameter + WALL_THICKNESS) * (length + 0.8 * diameter) * WALL_THICKNESS * np.asarray(density, dtype=float)
+
+@instrument("batch_costing.vessel_cost")
+def vessel_cost(weight, equipment_type):
+    """
+    Calculate the base cost of the vessels.
+    Equation: C_V = exp(a + 0.18255 * ln(W) + 0.02297 * (ln(W))^2)
+    """
+    ln_weight = np.log(np.asarray(weight, dtype=float))
+    intercept = _lookup_coefficients(VESSEL_COST_INTERCEPTS, equipment_type)
+    return np.exp(intercept + 0.18255 * ln_weight + 0.02297 * ln_weight**2)
+
+@instrument("batch_costing.platform_ladder_cost")
+def platform_ladder_cost(diameter, length, equipment_type):
+    """
+    Calculate the cost of platforms and ladders.
+    Equation: C_PL = c * D^d * L^l
+    """
+    diameter = np.asarray(diameter, dtype=float)
+    length = np.asarray(length, dtype=float)
+    coefficients = _lookup_coefficients(PLATFORM_LADDER_COEFFICIENTS, equipment_type)
+    return coefficients[..., 0] * diameter ** coefficients[..., 1] * length ** coefficients[..., 2]
+
+@instrument("batch_costing.tray_cost")
+def tray_cost(diameter, num_trays, tray_type, tray_material):
+    """
+    Calculate the cost of trays.
+    Equation: C_T = N_T * F_NT * F_TT * F_TM * C_BT
+    C_BT = 468 * exp(0.1739 * D)  (for sieve trays)
+    """
+    diameter = np.asarray(diameter, dtype=float)
+    num_trays = np.asarray(num_trays, dtype=float)
+    base_tray_cost = 468 * np.exp(0.1739 * diameter)
+    tray_type_factor = _lookup(TRAY_TYPE_FACTORS, tray_type, 1.0)
+    num_trays_factor = np.where(num_trays > 20, 1.0, 2.25 / 1.0414**num_trays)
+    tray_material_factor = _lookup(TRAY_MATERIAL_FACTORS, tray_material, 1.0)
+    return num_trays * num_trays_factor * tray_type_factor * tray_material_factor * base_tray_cost
+
+@instrument("batch_costing.heat_exchanger_base_cost")
+def heat_exchanger_base_cost(area):
+    """
+    Calculate the base cost of shell-and-tube heat exchangers.
+    Equation: C_B = exp(11.667 - 0.8709 * ln(A) + 0.09005 * (ln(A))^2)
+    """
+    ln_area = np.log(np.asarray(area, dtype=float))
+    return np.exp(11.667 - 0.8709 * ln_area + 0.09005 * ln_area**2)
+
+@instrument("batch_costing.heat_exchanger_pressure_factor")
+def heat_exchanger_pressure_factor(pressure):
+    """
+    Calculate the pressure correction factor.
+    Equation: F_P = 0.9803 + 0.018 * (P/100) + 0.0017 * (P/100)^2  (for P > 100 psig)
+    """
+    pressure = np.asarray(pressure, dtype=float)
+    return np.where(pressure > 100, 0.9803 + 0.018 * (pressure / 100) + 0.0017 * (pressure / 100) ** 2, 1.0)
+
+@instrument("batch_costing.heat_exchanger_material_factor")
+def heat_exchanger_material_factor(area, material):
+    """
+    Calculate the material correction factor; unknown materials are costed as carbon steel/carbon steel.
+    Equation: F_M = a + (A/100)^b
+    """
+    a = _lookup(HEAT_EXCHANGER_MATERIAL_FACTORS, material, HEAT_EXCHANGER_MATERIAL_FACTORS["carbon steel/carbon steel"], "a")
+    b = _lookup(HEAT_EXCHANGER_MATERIAL_FACTORS, material, HEAT_EXCHANGER_MATERIAL_FACTORS["carbon steel/carbon steel"], "b")
+    return a + (np.asarray(area, dtype=float) / 100) ** b
+
+@instrument("batch_costing.compressor_power")
+def compressor_power(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency):
+    """
+    Calculate the power consumption of compressors in horsepower.
+    Equation: P_c = 0.00436 * (k/(k-1)) * (Q_1 * P_1/η) * ((P_2/P_1)^((k-1)/k) - 1)
+    """
+    k = np.asarray(specific_heat_ratio, dtype=float)
+    inlet_pressure = np.asarray(inlet_pressure, dtype=float)
+    pressure_ratio = np.asarray(outlet_pressure, dtype=float) / inlet_pressure
+    return 0.00436 * (k / (k - 1)) * (np.asarray(inlet_flow, dtype=float) * inlet_pressure / np.asarray(efficiency, dtype=float)) * (pressure_ratio ** ((k - 1) / k) - 1)
+
+@instrument("batch_costing.compressor_base_cost")
+def compressor_base_cost(power):
+    """
+    Calculate the base cost of compressors.
+    Equation: C_B = exp(7.580 + 0.8 * ln(P_c))
+    """
+    return np.exp(7.580 + 0.8 * np.log(np.asarray(power, dtype=float)))
+
+@instrument("batch_costing.fired_heater_base_cost")
+def fired_heater_base_cost(heat_duty):
+    """
+    Calculate the base cost of fired heaters.
+    Equation: C_B = exp(0.32325 + 0.766 * ln(Q))
+    """
+    return np.exp(0.32325 + 0.766 * np.log(np.asarray(heat_duty, dtype=float)))
+
+def reactor_dimensions(space_time, volumetric_flow_rate):
+    """
+    Calculate reactor dimensions from space time and volumetric flow rate.
+    Equation: V = Q * τ, D = (4V / 2.5π)^(1/3), L = 2.5D
+    """
+    volume = np.asarray(volumetric_flow_rate, dtype=float) * np.asarray(space_time, dtype=float)
+    diameter = (4 * volume / (2.5 * math.pi)) ** (1 / 3)
+    return diameter, 2.5 * diameter
+
+@instrument("batch_costing.cost_reactors")
+def cost_reactors(columns):
+    """
+    Calculate the cost breakdown of an array of reactors.
+    Dimensions come from "diameter" and "length", or from "space_time" and "volumetric_flow_rate".
+    """
+    if "diameter" in columns:
+        diameter = np.asarray(columns["diameter"], dtype=float)
+        length = np.asarray(columns["length"], dtype=float)
+    else:
+        diameter, length = reactor_dimensions(columns["space_time"], columns["volumetric_flow_rate"])
+    material = columns.get("material", DEFAULT_MATERIALS["reactor"])
+    density = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "density")
+    material_factor = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "F_M")
+
+    weight = vessel_weight(diameter, length, density)
+    base_vessel_cost = vessel_cost(weight, "reactor")
+    adjusted_vessel_cost = material_factor * base_vessel_cost
+    platform_ladder = platform_ladder_cost(diameter, length, "reactor")
+    return {
+        "D": diameter,
+        "L": length,
+        "W": weight,
+        "C_V": base_vessel_cost,
+        "C_PV": adjusted_vessel_cost,
+        "C_PL": platform_ladder,
+        "total": adjusted_vessel_cost + platform_ladder,
+    }
+
+@instrument("batch_costing.cost_distillation_columns")
+def cost_distillation_columns(columns):
+    """
+    Calculate the cost breakdown of an array of distillation columns.
+    """
+    diameter = np.asarray(columns["diameter"], dtype=float)
+    length = np.asarray(columns["length"], dtype=float)
+    material = columns.get("material", DEFAULT_MATERIALS["distillation column"])
+    density = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "density")
+    material_factor = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "F_M")
+
+    weight = vessel_weight(diameter, length, density)
+    base_vessel_cost = vessel_cost(weight, "distillation column")
+    adjusted_vessel_cost = material_factor * base_vessel_cost
+    platform_ladder = platform_ladder_cost(diameter, length, "distillation column")
+    trays = tray_cost(diameter, columns["num_trays"], columns.get("tray_type", "sieve"), columns.get("tray_material", "carbon steel"))
+    return {
+        "D": diameter,
+        "L": length,
+        "W": weight,
+        "C_V": base_vessel_cost,
+        "C_PV": adjusted_vessel_cost,
+        "C_PL": platform_ladder,
+        "C_T": trays,
+        "total": adjusted_vessel_cost + platform_ladder + trays,
+    }
+
+@instrument("batch_costing.cost_heat_exchangers")
+def cost_heat_exchangers(columns):
+    """
+    Calculate the cost breakdown of an array of shell-and-tube heat exchangers.
+    The area comes from "area", or from "heat_duty" / "flux_rate".
+    """
+    if "area" in columns:
+        area = np.asarray(columns["area"], dtype=float)
+    else:
+        area = np.asarray(columns["heat_duty"], dtype=float) / np.asarray(columns["flux_rate"], dtype=float)
+    base_cost = heat_exchanger_base_cost(area)
+    pressure_factor = heat_exchanger_pressure_factor(columns.get("pressure", 0.0)) * np.ones_like(area)
+    # Assume F_L = 1 for tube lengths < 20 ft, as the CLI does for all lengths
+    tube_length_factor = np.ones_like(area)
+    material_factor = heat_exchanger_material_factor(area, columns.get("material", DEFAULT_MATERIALS["heat exchanger"]))
+    return {
+        "A": area,
+        "C_B": base_cost,
+        "F_P": pressure_factor,
+        "F_L": tube_length_factor,
+        "F_M": material_factor,
+        "total": pressure_factor * material_factor * tube_length_factor * base_cost,
+    }
+
+@instrument("batch_costing.cost_compressors")
+def cost_compressors(columns):
+    """
+    Calculate the cost breakdown of an array of compressors.
+    The power comes from "power", or from the inlet conditions and pressure ratio.
+    """
+    if "power" in columns:
+        power = np.asarray(columns["power"], dtype=float)
+    else:
+        power = compressor_power(
+            columns["inlet_flow"],
+            columns["inlet_pressure"],
+            columns["outlet_pressure"],
+            columns["specific_heat_ratio"],
+            columns["efficiency"],
+        )
+    base_cost = compressor_base_cost(power)
+    drive_factor = _lookup(COMPRESSOR_DRIVE_FACTORS, columns.get("drive_type", "electric"), 1.0) * np.ones_like(power)
+    material_factor = _lookup(COMPRESSOR_MATERIAL_FACTORS, columns.get("material", DEFAULT_MATERIALS["compressor"]), 1.0) * np.ones_like(power)
+    return {
+        "P_c": power,
+        "C_B": base_cost,
+        "F_D": drive_factor,
+        "F_M": material_factor,
+        "total": drive_factor * material_factor * base_cost,
+    }
+
+@instrument("batch_costing.cost_fired_heaters")
+def cost_fired_heaters(columns):
+    """
+    Calculate the cost breakdown of an array of fired heaters.
+    """
+    heat_duty = np.asarray(columns["heat_duty"], dtype=float)
+    base_cost = fired_heater_base_cost(heat_duty)
+    material_factor = _lookup(FIRED_HEATER_MATERIAL_FACTORS, columns.get("material", DEFAULT_MATERIALS["fired heater"]), 1.0) * np.ones_like(heat_duty)
+    return {
+        "Q": heat_duty,
+        "C_B": base_cost,
+        "F_M": material_factor,
+        "total": material_factor * base_cost,
+    }
+
+def size_variable(equipment_type, columns):
+    """
+    Calculate the variable each cost correlation is fitted against (see VALIDITY_RANGES).
+    """
+    if equipment_type in ("reactor", "distillation column"):
+        if "diameter" in columns:
+            diameter, length = columns["diameter"], columns["length"]
+        else:
+            diameter, length = reactor_dimensions(columns["space_time"], columns["volumetric_flow_rate"])
+        density = _lookup(MATERIAL_FACTORS, columns.get("material", DEFAULT_MATERIALS[equipment_type]), {"F_M": 1.0, "density": 490}, "density")
+        return vessel_weight(diameter, length, density)
+    if equipment_type == "heat exchanger":
+        if "area" in columns:
+            return np.asarray(columns["area"], dtype=float)
+        return np.asarray(columns["heat_duty"], dtype=float) / np.asarray(columns["flux_rate"], dtype=float)
+    if equipment_type == "compressor":
+        if "power" in columns:
+            return np.asarray(columns["power"], dtype=float)
+        return compressor_power(
+            columns["inlet_flow"],
+            columns["inlet_pressure"],
+            columns["outlet_pressure"],
+            columns["specific_heat_ratio"],
+            columns["efficiency"],
+        )
+    if equipment_type == "fired heater":
+        return np.asarray(columns["heat_duty"], dtype=float)
+    raise ValueError(f"Unknown equipment type: {equipment_type}")
+
+BATCH_COSTERS = {
+    "reactor": cost_reactors,
+    "distillation column": cost_distillation_columns,
+    "heat exchanger": cost_heat_exchangers,
+    "compressor": cost_compressors,
+    "fired heater": cost_fired_heaters,
+}
+
+def cost_batch(equipment_type, columns):
+    """
+    Calculate the cost breakdown of an array of units of one equipment type.
+    Columns are equal-length arrays (or scalars broadcast to every unit).
+    """
+    if equipment_type not in BATCH_COSTERS:
+        raise ValueError(f"Unknown equipment type: {equipment_type}")
+    return BATCH_COSTERS[equipment_type](columns)
+
+def _broadcast_results(results, shape):
+    """
+    Give every result column the batch shape; columns that only depend on scalar inputs become
+    read-only stride-0 views rather than copies.
+    """
+    return {name: np.broadcast_to(values, shape) for name, values in results.items()}
+
+def sweep(equipment_type, base, name, values, coster=cost_batch):
+    """
+    Cost one unit while a single input varies over an array of values.
+    The other inputs stay scalar, so their factors are looked up once and only the swept column is an array.
+    coster is cost_batch or a drop-in replacement such as jit_kernels.cost_batch.
+    """
+    values = np.asarray(values)
+    columns = dict(base)
+    columns[name] = values
+    return _broadcast_results(coster(equipment_type, columns), values.shape)
+
+def monte_carlo(equipment_type, base, spreads, samples, seed=0, coster=cost_batch):
+    """
+    Cost one unit with uniformly distributed relative uncertainty on some inputs.
+    spreads maps an input name to its fractional half-width, e.g. {"diameter": 0.1} for ±10%.
+    Only the sampled inputs are arrays; the rest (materials, tray types, fixed sizes) stay scalar.
+    """
+    rng = np.random.default_rng(seed)
+    columns = dict(base)
+    for name in sorted(spreads):
+        columns[name] = float(base[name]) * rng.uniform(1 - spreads[name], 1 + spreads[name], samples)
+    return _broadcast_results(coster(equipment_type, columns), (samples,))
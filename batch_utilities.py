@@ -0,0 +1,62 @@
+import numpy as np
+
+from instrumentation import instrument
+
+# Constants (same values as UtilitiesCalculator.py)
+Cp_water = 1.0  # Specific heat capacity of water (kcal/kg·°C)
+delta_H_comb = 13277.0  # Heat of combustion for natural gas (kcal/kg)
+CO2_emission_factor = 2.74  # kg CO₂ per kg of natural gas burned
+efficiency = 0.8  # Efficiency of the fired heater
+
+# Constants the utilities results depend on (used to key cached results)
+UTILITY_CONSTANTS = {
+    "Cp_water": Cp_water,
+    "delta_H_comb": delta_H_comb,
+    "CO2_emission_factor": CO2_emission_factor,
+    "efficiency": efficiency,
+}
+
+# Inputs of each utility and the result columns they produce
+UTILITY_INPUTS = {
+    "Q_cooling": ("Q_cooling", "delta_T_cw"),
+    "Q_heating": ("Q_heating", "efficiency"),
+}
+UTILITY_RESULTS = {
+    "Q_cooling": ("m_cw",),
+    "Q_heating": ("Q_heater", "m_ng", "m_CO2"),
+}
+
+# Function to calculate cooling water for an array of duties
+@instrument("batch_utilities.calculate_cooling_water")
+def calculate_cooling_water(Q_cooling, Cp_water, delta_T_cw):
+    m_cw = np.asarray(Q_cooling, dtype=float) / (np.asarray(Cp_water, dtype=float) * np.asarray(delta_T_cw, dtype=float))  # Mass flow rate of cooling water (kg/hr)
+    return m_cw
+
+# Function to calculate natural gas for an array of duties
+@instrument("batch_utilities.calculate_natural_gas")
+def calculate_natural_gas(Q_heating, delta_H_comb, efficiency):
+    Q_heater = np.asarray(Q_heating, dtype=float) / np.asarray(efficiency, dtype=float)  # Heat required by the fired heater (kcal/hr)
+    m_ng = Q_heater / np.asarray(delta_H_comb, dtype=float)  # Mass flow rate of natural gas (kg/hr)
+    return Q_heater, m_ng
+
+# Function to calculate CO₂ emissions for an array of natural gas flows
+@instrument("batch_utilities.calculate_CO2_emissions")
+def calculate_CO2_emissions(m_ng, CO2_emission_factor):
+    m_CO2 = np.asarray(m_ng, dtype=float) * np.asarray(CO2_emission_factor, dtype=float)  # Mass flow rate of CO₂ (kg/hr)
+    return m_CO2
+
+@instrument("batch_utilities.utilities_batch")
+def utilities_batch(columns):
+    """
+    Calculate cooling water, natural gas and CO₂ flows for an array of utility profiles.
+    Columns: Q_cooling and delta_T_cw (kcal/hr, °C), Q_heating (kcal/hr); either group may be omitted.
+    """
+    results = {}
+    if "Q_cooling" in columns:
+        results["m_cw"] = calculate_cooling_water(columns["Q_cooling"], columns.get("Cp_water", Cp_water), columns["delta_T_cw"])
+    if "Q_heating" in columns:
+        Q_heater, m_ng = calculate_natural_gas(columns["Q_heating"], columns.get("delta_H_comb", delta_H_comb), columns.get("efficiency", efficiency))
+        results["Q_heater"] = Q_heater
+        results["m_ng"] = m_ng
+        results["m_CO2"] = calculate_CO2_emissions(m_ng, columns.get("CO2_emission_factor", CO2_emission_factor))
+    return results
@@ -0,0 +1,115 @@
+import numpy as np
+
+from extrapolation import cost_in_range
+from instrumentation import instrument
+
+# Bare-module (installation) factors F_BM per equipment type (Guthrie, Seider et al. Table 22.11)
+BARE_MODULE_FACTORS = {
+    "reactor": 4.16,  # vertical pressure vessel
+    "distillation column": 4.16,  # tower
+    "heat exchanger": 3.17,  # shell-and-tube
+    "compressor": 2.15,  # centrifugal, motor driven
+    "fired heater": 2.19,
+}
+
+# Capital factors (Seider et al. Table 16.9); site and service facilities at the low end, for an addition to an existing plant
+CAPITAL_FACTORS = {
+    "site": 0.05,  # site preparation, as a fraction of C_TBM (10-20% for a grass-roots plant)
+    "service_facilities": 0.05,  # service facilities, as a fraction of C_TBM
+    "contingency": 0.15,  # as a fraction of the direct permanent investment
+    "fee": 0.03,  # contractor's fee, as a fraction of the direct permanent investment
+    "land": 0.02,  # as a fraction of the total depreciable capital
+    "royalties": 0.02,  # as a fraction of the total depreciable capital
+    "startup": 0.10,  # plant startup, as a fraction of the total depreciable capital
+}
+
+def bare_module_factors(equipment_types, factors=None):
+    """
+    Map an array of equipment types to their bare-module factors, one lookup per distinct type.
+    factors overrides entries of BARE_MODULE_FACTORS.
+    """
+    factors = {**BARE_MODULE_FACTORS, **(factors or {})}
+    equipment_types = np.asarray(equipment_types)
+    unique, inverse = np.unique(equipment_types, return_inverse=True)
+    return np.array([factors[str(name)] for name in unique], dtype=float)[inverse.reshape(equipment_types.shape)]
+
+def _subtotals(groups, values):
+    """
+    Sum values per distinct group label in one pass.
+    """
+    labels, index = np.unique(np.asarray(groups), return_inverse=True)
+    return {str(label): float(total) for label, total in zip(labels, np.bincount(index.reshape(-1), weights=np.nan_to_num(values)))}
+
+@instrument("capital.capital_rollup")
+def capital_rollup(equipment_types, purchase_costs, areas=None, factors=None, capital_factors=None):
+    """
+    Roll purchased-equipment costs up to bare-module and total capital.
+    Equation: C_BM = F_BM * C_P per unit; C_DPI = C_TBM * (1 + site + service facilities);
+    C_TDC = C_DPI * (1 + contingency + fee); C_TPI = C_TDC * (1 + land + royalties + startup)
+    Returns per-unit bare-module costs, subtotals per plant area and per equipment type, and plant totals.
+    Units without a cost (NaN) count as zero in the subtotals.
+    """
+    capital_factors = dict(CAPITAL_FACTORS, **(capital_factors or {}))
+    purchase_costs = np.asarray(purchase_costs, dtype=float)
+    bare_module_costs = bare_module_factors(equipment_types, factors) * purchase_costs
+    areas = np.full(purchase_costs.shape, "plant") if areas is None else np.broadcast_to(areas, purchase_costs.shape)
+
+    total_purchase = float(np.nansum(purchase_costs))
+    total_bare_module = float(np.nansum(bare_module_costs))
+    direct_permanent = total_bare_module * (1 + capital_factors["site"] + capital_factors["service_facilities"])
+    contingency = direct_permanent * capital_factors["contingency"]
+    fee = direct_permanent * capital_factors["fee"]
+    depreciable = direct_permanent + contingency + fee
+    land = depreciable * capital_factors["land"]
+    royalties = depreciable * capital_factors["royalties"]
+    startup = depreciable * capital_factors["startup"]
+    return {
+        "C_BM": bare_module_costs,
+        "area_purchase": _subtotals(areas, purchase_costs),
+        "area_bare_module": _subtotals(areas, bare_module_costs),
+        "type_bare_module": _subtotals(equipment_types, bare_module_costs),
+        "plant": {
+            "C_P": total_purchase,
+            "C_TBM": total_bare_module,
+            "C_DPI": direct_permanent,
+            "contingency": contingency,
+            "fee": fee,
+            "C_TDC": depreciable,
+            "land": land,
+            "royalties": royalties,
+            "startup": startup,
+            "C_TPI": depreciable + land + royalties + startup,
+        },
+    }
+
+def cost_equipment_list(equipment):
+    """
+    Cost a whole equipment list; equipment maps an equipment type to its input columns,
+    optionally with "plant_area" and "tag" columns ("area" is the heat exchanger input).
+    Returns flat arrays of equipment type, area, tag and purchase cost, one entry per unit.
+    """
+    types, areas, tags, costs = [], [], [], []
+    for equipment_type, columns in equipment.items():
+        columns = dict(columns)
+        area = columns.pop("plant_area", None)
+        tag = columns.pop("tag", None)
+        total = np.atleast_1d(cost_in_range(equipment_type, columns)["total"])
+        types.append(np.full(total.shape, equipment_type))
+        areas.append(np.broadcast_to("plant" if area is None else area, total.shape))
+        tags.append(np.broadcast_to("" if tag is None else tag, total.shape))
+        costs.append(total)
+    return {
+        "equipment_type": np.concatenate(types),
+        "area": np.concatenate(areas),
+        "tag": np.concatenate(tags),
+        "C_P": np.concatenate(costs),
+    }
+
+def plant_capital(equipment, factors=None, capital_factors=None):
+    """
+    Cost an equipment list and roll it up to total capital in one call.
+    """
+    units = cost_equipment_list(equipment)
+    rollup = capital_rollup(units["equipment_type"], units["C_P"], units["area"], factors, capital_factors)
+    rollup["units"] = units
+    return rollup
@@ -0,0 +1,95 @@
+import functools
+
+import numpy as np
+
+from batch_costing import (
+    COMPRESSOR_MATERIAL_FACTORS,
+    FIRED_HEATER_MATERIAL_FACTORS,
+    HEAT_EXCHANGER_MATERIAL_FACTORS,
+    MATERIAL_FACTORS,
+    VALIDITY_RANGES,
+    _lookup,
+    compressor_base_cost,
+    fired_heater_base_cost,
+    heat_exchanger_base_cost,
+    heat_exchanger_material_factor,
+    vessel_cost,
+)
+from instrumentation import instrument
+
+# Points per precomputed grid, log-spaced over the size range
+GRID_POINTS = 2048
+
+# Grids extend this factor beyond each correlation's validity range so points just outside it still have a curve
+GRID_EXTENSION = 10
+
+# Points sent to a chart; about the pixel width of a chart in the main column
+CHART_POINTS = 400
+
+# What each curve plots: (size label, cost label, material table)
+CURVES = {
+    "reactor": ("Vessel weight W (lb)", "Vessel cost C_PV ($)", MATERIAL_FACTORS),
+    "distillation column": ("Vessel weight W (lb)", "Vessel cost C_PV ($)", MATERIAL_FACTORS),
+    "heat exchanger": ("Area A (ft²)", "Cost F_M * C_B ($)", HEAT_EXCHANGER_MATERIAL_FACTORS),
+    "compressor": ("Power P_c (hp)", "Cost F_M * C_B ($)", COMPRESSOR_MATERIAL_FACTORS),
+    "fired heater": ("Heat duty Q (Btu/hr)", "Cost F_M * C_B ($)", FIRED_HEATER_MATERIAL_FACTORS),
+}
+
+def curve_costs(equipment_type, material, size):
+    """
+    Cost against the size variable of each correlation, with the material factor applied.
+    Factors that do not depend on size (F_P, F_L, F_D) are left for the caller to multiply in.
+    """
+    if equipment_type in ("reactor", "distillation column"):
+        return _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "F_M") * vessel_cost(size, equipment_type)
+    if equipment_type == "heat exchanger":
+        return heat_exchanger_material_factor(size, material) * heat_exchanger_base_cost(size)
+    if equipment_type == "compressor":
+        return _lookup(COMPRESSOR_MATERIAL_FACTORS, material, 1.0) * compressor_base_cost(size)
+    if equipment_type == "fired heater":
+        return _lookup(FIRED_HEATER_MATERIAL_FACTORS, material, 1.0) * fired_heater_base_cost(size)
+    raise ValueError(f"Unknown equipment type: {equipment_type}")
+
+@functools.lru_cache(maxsize=None)
+@instrument("cost_curves.curve_grid")
+def curve_grid(equipment_type, material):
+    """
+    Precomputed (size, cost) grid for one equipment type and material, computed once per process
+    and shared by every session. The arrays are read-only.
+    """
+    _, low, high = VALIDITY_RANGES[equipment_type]
+    size = np.geomspace(low / GRID_EXTENSION, high * GRID_EXTENSION, GRID_POINTS)
+    cost = curve_costs(equipment_type, material.lower(), size)
+    size.setflags(write=False)
+    cost.setflags(write=False)
+    return size, cost
+
+def precompute():
+    """
+    Fill the grid cache for every equipment type and material, e.g. when the app starts.
+    """
+    for equipment_type, (_, _, materials) in CURVES.items():
+        for material in materials:
+            curve_grid(equipment_type, material)
+
+def interpolate(equipment_type, material, size):
+    """
+    Cost at any sizes from the grid, interpolated linearly in log-log space.
+    Sizes outside the grid are clamped to its ends.
+    """
+    grid_size, grid_cost = curve_grid(equipment_type, material.lower())
+    return np.exp(np.interp(np.log(size), np.log(grid_size), np.log(grid_cost)))
+
+@instrument("cost_curves.curve_window")
+def curve_window(equipment_type, material, center, span=10.0, points=CHART_POINTS, scale=1.0):
+    """
+    The curve from center / span to center * span, downsampled to about one point per pixel.
+    scale multiplies the cost, e.g. by the pressure or drive factor of the unit being charted.
+    Returns (size, cost) arrays of at most points entries.
+    """
+    grid_size, _ = curve_grid(equipment_type, material.lower())
+    center = min(max(center, grid_size[0]), grid_size[-1])
+    low = max(center / span, grid_size[0])
+    high = min(center * span, grid_size[-1])
+    size = np.geomspace(low, high, points)
+    return size, scale * interpolate(equipment_type, material, size)
@@ -0,0 +1,311 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+import numpy as np
+
+from batch_costing import BATCH_COSTERS
+from extrapolation import ENVELOPES, cost_in_range
+from instrumentation import snapshot, stage
+from result_cache import cached_monte_carlo, cached_sweep
+from units import to_native
+from validation import cost_valid_rows, describe, missing_inputs, non_numeric_inputs
+
+# Coalescing window: single-unit requests arriving within MAX_DELAY seconds are costed together
+MAX_DELAY = 0.002
+MAX_BATCH = 4096
+
+# Bulk requests larger than this are costed in a worker thread so the event loop stays responsive
+INLINE_ROWS = 10000
+
+# Fields each job request must give
+JOB_FIELDS = {
+    "sweep": ("equipment_type", "base", "name", "values"),
+    "monte carlo": ("equipment_type", "base"),
+}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+def _jsonable(results):
+    """
+    Convert result arrays to lists, with non-finite values as null.
+    """
+    output = {}
+    for name, values in results.items():
+        values = np.asarray(values)
+        if values.dtype.kind in "biu":
+            output[name] = values.tolist()
+            continue
+        values = values.astype(float)
+        output[name] = np.where(np.isfinite(values), values, None).tolist()
+    return output
+
+def _field_error(kind, names):
+    """
+    A 400 response naming the missing or invalid fields, e.g. {"error": "missing input: space_time"}.
+    """
+    return 400, {"error": f"{kind}{'s' if len(names) > 1 else ''}: {', '.join(names)}"}
+
+def _invalid_fields(body, bulk):
+    """
+    Names of the fields that are not a single value (or, in a bulk request, a flat list of values).
+    """
+    invalid = []
+    for name, value in body.items():
+        if isinstance(value, dict) or (isinstance(value, list) and not bulk):
+            invalid.append(name)
+        elif isinstance(value, list) and any(isinstance(item, (list, dict)) for item in value):
+            invalid.append(name)
+    return invalid
+
+def _columns(rows):
+    """
+    Turn a list of single-unit input dicts (with the same keys) into input columns.
+    """
+    return {name: np.array([row[name] for row in rows]) for name in rows[0]}
+
+def _bulk(kernel_name, columns):
+    """
+    Validate and cost many rows; equipment outside its correlation range is split or extrapolated.
+    """
+    if kernel_name in ENVELOPES:
+        return cost_in_range(kernel_name, columns)
+    return cost_valid_rows(kernel_name, columns)
+
+class Coalescer:
+    """
+    Collect concurrent single-unit requests for one kernel and evaluate them as one vectorized batch.
+    Units are validated like bulk rows; an invalid unit's future gets a ValueError with its reasons.
+    """
+
+    def __init__(self, kernel_name, max_delay=MAX_DELAY, max_batch=MAX_BATCH):
+        self.kernel_name = kernel_name
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self.pending = []
+        self.timer = None
+        self.batches = 0
+        self.rows = 0
+
+    def submit(self, unit):
+        """
+        Queue one unit and return a future for its results.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((unit, future))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.max_delay, self.flush)
+        return future
+
+    def flush(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        pending, self.pending = self.pending, []
+        if not pending:
+            return
+        self.batches += 1
+        self.rows += len(pending)
+
+        # Units with different input keys (e.g. area vs heat_duty) go in separate batches
+        groups = {}
+        for unit, future in pending:
+            groups.setdefault(tuple(sorted(unit)), []).append((unit, future))
+        for group in groups.values():
+            # Each unit is validated, so a bad unit fails only its own request
+            try:
+                results = _bulk(self.kernel_name, _columns([unit for unit, _ in group]))
+            except Exception as error:
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            for index, (_, future) in enumerate(group):
+                if future.done():
+                    continue
+                if not results["valid"][index]:
+                    future.set_exception(ValueError("; ".join(describe(int(results["reason"][index])))))
+                else:
+                    future.set_result({name: values[index] for name, values in results.items()})
+
+class CostingService:
+    """
+    HTTP/1.1 JSON service over the batch costing and utilities kernels.
+
+    POST /cost/<equipment-type>         {"diameter": 5, ...}           -> one unit, coalesced; 400 with the reasons if invalid
+    POST /cost/<equipment-type>/bulk    {"diameter": [5, 6], ...}      -> many units, with "valid", "reason", "trains" and "range_flags" per row;
+                                        inputs may declare units: {"units": {"diameter": "m"}} or "diameter [m]"
+    POST /utilities                     {"Q_cooling": 8621900, ...}    -> one profile, coalesced
+    POST /utilities/bulk                {"Q_cooling": [...], ...}      -> many profiles
+    POST /jobs/sweep                    {"equipment_type", "base", "name", "values"}
+    POST /jobs/monte-carlo              {"equipment_type", "base", "spreads", "samples", "seed"}
+    GET  /health, GET /stats, GET /metrics (instrumentation snapshot when COSTING_METRICS=1)
+
+    A body that is not a JSON object, or lacks or garbles a required field, gets a 400 naming the fields.
+    """
+
+    def __init__(self, workers=None):
+        self.coalescers = {name: Coalescer(name) for name in BATCH_COSTERS}
+        self.coalescers["utilities"] = Coalescer("utilities")
+        self.pool = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+        self.requests = 0
+
+    async def handle(self, method, path, body):
+        """
+        Route one request and return (status, payload).
+        """
+        self.requests += 1
+        parts = [unquote(part).replace("-", " ") for part in path.split("?")[0].strip("/").split("/")]
+        if method == "GET" and parts == ["health"]:
+            return 200, {"status": "ok"}
+        if method == "GET" and parts == ["stats"]:
+            return 200, self.stats()
+        if method == "GET" and parts == ["metrics"]:
+            return 200, snapshot()
+        if method != "POST":
+            return 405, {"error": f"{method} not allowed"}
+        if not isinstance(body, dict):
+            return 400, {"error": "request body must be a JSON object"}
+        loop = asyncio.get_running_loop()
+
+        if (parts[0] == "cost" and len(parts) > 1) or parts[0] == "utilities":
+            kernel_name = parts[1] if parts[0] == "cost" else "utilities"
+            if kernel_name not in self.coalescers:
+                return 404, {"error": f"Unknown equipment type: {kernel_name}"}
+            # Rows are validated so a bad row comes back masked with its reason code (a bad single
+            # unit gets a 400), and units outside a correlation's range are split into trains or extrapolated
+            units = body.pop("units", None)
+            bulk = parts[-1] == "bulk"
+            invalid = _invalid_fields(body, bulk) + ([] if units is None or isinstance(units, dict) else ["units"])
+            if invalid:
+                return _field_error("invalid input", invalid)
+            if not bulk:
+                unit = to_native(body, units)
+                missing = missing_inputs(kernel_name, unit)
+                if missing:
+                    return _field_error("missing input", missing)
+                invalid = non_numeric_inputs(kernel_name, unit)
+                if invalid:
+                    return _field_error("invalid input", invalid)
+                return 200, _jsonable(await self.coalescers[kernel_name].submit(unit))
+            columns = to_native({name: np.asarray(values) for name, values in body.items()}, units)
+            missing = missing_inputs(kernel_name, columns)
+            if missing:
+                return _field_error("missing input", missing)
+            rows = max((values.size for values in columns.values()), default=0)
+            if rows > INLINE_ROWS:
+                results = await loop.run_in_executor(None, _bulk, kernel_name, columns)
+            else:
+                results = _bulk(kernel_name, columns)
+            return 200, _jsonable(results)
+
+        if parts[0] == "jobs" and len(parts) == 2 and parts[1] in JOB_FIELDS:
+            missing = [name for name in JOB_FIELDS[parts[1]] if name not in body]
+            if missing:
+                return _field_error("missing field", missing)
+            equipment_type, base = body["equipment_type"], body["base"]
+            if equipment_type not in BATCH_COSTERS:
+                return 404, {"error": f"Unknown equipment type: {equipment_type}"}
+            spreads = body.get("spreads", {})
+            invalid = [name for name, value in (("base", base), ("spreads", spreads)) if not isinstance(value, dict)]
+            if parts[1] == "sweep" and not isinstance(body["name"], str):
+                invalid.append("name")
+            if invalid:
+                return _field_error("invalid field", invalid)
+            # Sampled inputs vary around their base value, so each needs one
+            inputs = dict(base, **{body["name"]: body["values"]}) if parts[1] == "sweep" else base
+            missing = missing_inputs(equipment_type, inputs) + tuple(name for name in spreads if name not in base)
+            if missing:
+                return _field_error("missing input", missing)
+            if parts[1] == "sweep":
+                results = await loop.run_in_executor(
+                    self.pool, cached_sweep, equipment_type, base, body["name"], body["values"]
+                )
+            else:
+                results = await loop.run_in_executor(
+                    self.pool, cached_monte_carlo, equipment_type, base, spreads,
+                    int(body.get("samples", 10000)), int(body.get("seed", 0)),
+                )
+            return 200, _jsonable(results)
+        return 404, {"error": f"No route for {path}"}
+
+    def stats(self):
+        """
+        Return request counts and how well single-unit requests were coalesced.
+        """
+        return {
+            "requests": self.requests,
+            "coalescing": {
+                name: {"batches": coalescer.batches, "rows": coalescer.rows}
+                for name, coalescer in self.coalescers.items()
+            },
+        }
+
+    async def serve_connection(self, reader, writer):
+        """
+        Serve keep-alive HTTP/1.1 requests on one connection.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                try:
+                    body = json.loads(raw) if raw else {}
+                    with stage(f"service {method} {path.split('?')[0]}"):
+                        status, payload = await self.handle(method, path, body)
+                except KeyError as error:
+                    status, payload = _field_error("missing input", [str(error.args[0])])
+                except (TypeError, ValueError) as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": repr(error)}
+                data = json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host="127.0.0.1", port=8502, workers=None):
+    service = CostingService(workers)
+    server = await asyncio.start_server(service.serve_connection, host, port)
+    print(f"Costing service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.pool.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the equipment costing and utilities correlations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, default=None, help="Processes for sweep and Monte Carlo jobs")
+    args = parser.parse_args()
+    asyncio.run(serve(args.host, args.port, args.workers))
+
+if __name__ == "__main__":
+    main()
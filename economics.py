@@ -0,0 +1,147 @@
+import numpy as np
+
+from batch_utilities import CO2_emission_factor, utilities_batch
+from extrapolation import cost_in_range
+from instrumentation import instrument
+
+# Default economic assumptions
+OPERATING_HOURS = 8000  # hr/yr
+PROJECT_LIFE = 15  # years of operation after the capital is spent in year 0
+
+# Default utility prices
+UTILITY_PRICES = {
+    "cooling_water_price": 0.00002,  # $/kg
+    "natural_gas_price": 0.25,  # $/kg
+    "carbon_price": 0.05,  # $/kg CO₂
+}
+
+def scenario_grid(**axes):
+    """
+    Build scenario columns from every combination of the given values,
+    e.g. scenario_grid(natural_gas_price=[0.2, 0.3], discount_rate=[0.08, 0.1]) gives 4 scenarios.
+    """
+    names = list(axes)
+    grids = np.meshgrid(*(np.asarray(axes[name]) for name in names), indexing="ij")
+    return {name: grid.reshape(-1) for name, grid in zip(names, grids)}
+
+def purchased_equipment_cost(equipment):
+    """
+    Total purchased cost of a plant; equipment maps an equipment type to its input columns.
+    """
+    return sum(float(np.nansum(cost_in_range(equipment_type, columns)["total"])) for equipment_type, columns in equipment.items())
+
+@instrument("economics.annual_operating_costs")
+def annual_operating_costs(columns):
+    """
+    Annual cooling water, fuel and carbon costs ($/yr) of each scenario.
+    Utility flows come from m_cw, m_ng, m_CO2 (kg/hr) or from duties (Q_cooling, delta_T_cw, Q_heating);
+    m_CO2 is derived from m_ng when only the gas flow is given.
+    They are scaled by capacity_factor and priced with the UTILITY_PRICES columns.
+    """
+    flows = {name: columns[name] for name in ("m_cw", "m_ng", "m_CO2") if name in columns}
+    if "m_ng" in flows and "m_CO2" not in flows:
+        flows["m_CO2"] = np.asarray(flows["m_ng"], dtype=float) * np.asarray(columns.get("CO2_emission_factor", CO2_emission_factor), dtype=float)
+    flows = dict(utilities_batch(columns), **flows)
+    hours = np.asarray(columns.get("operating_hours", OPERATING_HOURS), dtype=float) * np.asarray(columns.get("capacity_factor", 1.0), dtype=float)
+
+    def price(name):
+        return np.asarray(columns.get(name, UTILITY_PRICES[name]), dtype=float)
+
+    return {
+        "cooling_water": np.asarray(flows.get("m_cw", 0.0), dtype=float) * hours * price("cooling_water_price"),
+        "fuel": np.asarray(flows.get("m_ng", 0.0), dtype=float) * hours * price("natural_gas_price"),
+        "carbon": np.asarray(flows.get("m_CO2", 0.0), dtype=float) * hours * price("carbon_price"),
+    }
+
+@instrument("economics.cash_flows")
+def cash_flows(columns, years=PROJECT_LIFE, operating=None):
+    """
+    Cash flow matrix (scenarios x years + 1): the capital in year 0, then the annual net income.
+    Annual revenue is production (units/yr at full capacity) * capacity_factor * product_price;
+    annual costs are the utility costs (annual_operating_costs(), unless already given as operating)
+    plus other_operating_cost ($/yr).
+    """
+    if operating is None:
+        operating = annual_operating_costs(columns)
+    capacity_factor = np.asarray(columns.get("capacity_factor", 1.0), dtype=float)
+    revenue = np.asarray(columns.get("production", 0.0), dtype=float) * capacity_factor * np.asarray(columns.get("product_price", 0.0), dtype=float)
+    net_income = revenue - operating["cooling_water"] - operating["fuel"] - operating["carbon"] - np.asarray(columns.get("other_operating_cost", 0.0), dtype=float)
+    capital = np.asarray(columns["capital"], dtype=float)
+
+    scenarios = np.broadcast_shapes(np.shape(net_income), np.shape(capital))
+    flows = np.empty(scenarios + (years + 1,))
+    flows[..., 0] = -capital
+    flows[..., 1:] = np.asarray(net_income)[..., None]
+    return flows
+
+def npv(flows, rate):
+    """
+    Net present value of each row of a cash flow matrix at its discount rate.
+    Equation: NPV = Σ CF_t / (1 + i)^t
+    """
+    flows = np.asarray(flows, dtype=float)
+    rate = np.asarray(rate, dtype=float)[..., None]
+    years = np.arange(flows.shape[-1])
+    return np.sum(flows / (1 + rate) ** years, axis=-1)
+
+@instrument("economics.irr")
+def irr(flows, low=-0.99, high=10.0, tolerance=1e-10, max_iterations=200):
+    """
+    Internal rate of return of every row at once, by bisection on all rows together.
+    Rows whose NPV does not change sign between low and high get NaN.
+    """
+    flows = np.asarray(flows, dtype=float)
+    shape = flows.shape[:-1]
+    low = np.full(shape, low)
+    high = np.full(shape, high)
+    npv_low = npv(flows, low)
+    bracketed = np.sign(npv_low) * np.sign(npv(flows, high)) <= 0
+    for _ in range(max_iterations):
+        middle = 0.5 * (low + high)
+        npv_middle = npv(flows, middle)
+        root_above = np.sign(npv_middle) == np.sign(npv_low)
+        low = np.where(root_above, middle, low)
+        npv_low = np.where(root_above, npv_middle, npv_low)
+        high = np.where(root_above, high, middle)
+        if np.all(high - low < tolerance):
+            break
+    return np.where(bracketed, 0.5 * (low + high), np.nan)
+
+def payback_period(flows):
+    """
+    Years until the cumulative cash flow turns positive, interpolated within the year; NaN if never.
+    """
+    flows = np.asarray(flows, dtype=float)
+    cumulative = np.cumsum(flows, axis=-1)
+    positive = cumulative >= 0
+    # Year 0 is the capital outlay, so only later years count
+    positive[..., 0] = False
+    paid_back = positive.any(axis=-1)
+    year = np.argmax(positive, axis=-1)
+    before = np.take_along_axis(cumulative, np.maximum(year - 1, 0)[..., None], axis=-1)[..., 0]
+    income = np.take_along_axis(flows, year[..., None], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = -before / income
+    return np.where(paid_back, year - 1 + fraction, np.nan)
+
+@instrument("economics.evaluate_scenarios")
+def evaluate_scenarios(columns, years=PROJECT_LIFE):
+    """
+    Cash flows, NPV, IRR and payback for every scenario in one call.
+    Columns: capital, production, product_price, capacity_factor, discount_rate, utility flows or duties,
+    utility prices and other_operating_cost; scalars apply to every scenario.
+    """
+    operating = annual_operating_costs(columns)
+    flows = cash_flows(columns, years, operating)
+    rate = np.asarray(columns.get("discount_rate", 0.1), dtype=float)
+    # Every result has one entry per scenario, even when only the discount rate varies
+    shape = np.broadcast_shapes(flows.shape[:-1], rate.shape)
+    return {
+        "annual_net_income": np.broadcast_to(flows[..., 1], shape),
+        "cooling_water_cost": np.broadcast_to(operating["cooling_water"], shape),
+        "fuel_cost": np.broadcast_to(operating["fuel"], shape),
+        "carbon_cost": np.broadcast_to(operating["carbon"], shape),
+        "npv": npv(flows, rate),
+        "irr": np.broadcast_to(irr(flows), shape),
+        "payback": np.broadcast_to(payback_period(flows), shape),
+    }
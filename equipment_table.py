@@ -0,0 +1,208 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from batch_costing import BATCH_COSTERS, DEFAULT_MATERIALS, INPUT_COLUMNS
+from capital import capital_rollup
+from result_cache import cached_cost_in_range
+from units import to_native
+from validation import unit_status, validate
+
+# Columns of the equipment table; each equipment type uses the subset in INPUT_COLUMNS
+TABLE_COLUMNS = [
+    "tag", "plant_area", "equipment_type", "diameter", "length", "num_trays", "tray_type", "tray_material",
+    "heat_duty", "flux_rate", "pressure", "inlet_flow", "inlet_pressure", "outlet_pressure",
+    "specific_heat_ratio", "efficiency", "drive_type", "material",
+]
+TEXT_COLUMNS = ["tag", "plant_area", "equipment_type", "tray_type", "tray_material", "drive_type", "material"]
+INPUTS = [name for name in TABLE_COLUMNS if name not in ("tag", "plant_area")]
+
+# Values used when an optional input is left blank
+DEFAULTS = {
+    "material": DEFAULT_MATERIALS,
+    "tray_type": "sieve",
+    "tray_material": "carbon steel",
+    "drive_type": "electric",
+    "pressure": 0.0,
+}
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+EXAMPLE_TABLE = pd.DataFrame(
+    [
+        {"tag": "R-101", "plant_area": "100", "equipment_type": "reactor", "diameter": 6.0, "length": 20.0, "material": "stainless steel 316"},
+        {"tag": "T-201", "plant_area": "200", "equipment_type": "distillation column", "diameter": 8.0, "length": 90.0, "num_trays": 40, "tray_type": "sieve", "tray_material": "carbon steel", "material": "carbon steel"},
+        {"tag": "E-202", "plant_area": "200", "equipment_type": "heat exchanger", "heat_duty": 1.5e7, "flux_rate": 5000.0, "pressure": 150.0, "material": "carbon steel/stainless steel"},
+        {"tag": "C-301", "plant_area": "300", "equipment_type": "compressor", "inlet_flow": 8000.0, "inlet_pressure": 20.0, "outlet_pressure": 80.0, "specific_heat_ratio": 1.4, "efficiency": 0.78, "drive_type": "electric", "material": "carbon steel"},
+        {"tag": "H-101", "plant_area": "100", "equipment_type": "fired heater", "heat_duty": 5e7, "material": "carbon steel"},
+    ],
+    columns=TABLE_COLUMNS,
+)
+
+def normalize(table):
+    """
+    Give a table every column in TABLE_COLUMNS, with units in headers converted to native units.
+    """
+    table = table.rename(columns=str)
+    converted = to_native({name: table[name].to_numpy() for name in table.columns})
+    table = pd.DataFrame(converted, index=table.index).reindex(columns=TABLE_COLUMNS)
+    for name in TEXT_COLUMNS:
+        table[name] = table[name].astype("string").str.strip()
+    table["equipment_type"] = table["equipment_type"].str.lower()
+    for name in TABLE_COLUMNS:
+        if name not in TEXT_COLUMNS:
+            table[name] = pd.to_numeric(table[name], errors="coerce")
+    return table
+
+def row_hashes(table):
+    """
+    One hash per row of the costing inputs, so unchanged rows are never recosted.
+    """
+    return pd.util.hash_pandas_object(table[INPUTS], index=False).to_numpy()
+
+def _columns(equipment_type, group):
+    """
+    Input columns for one equipment type, with blank optional inputs filled from DEFAULTS.
+    """
+    columns = {}
+    for name in INPUT_COLUMNS[equipment_type]:
+        if name == "tube_length":
+            continue
+        values = group[name]
+        default = DEFAULTS.get(name)
+        if isinstance(default, dict):
+            default = default[equipment_type]
+        if default is not None:
+            values = values.fillna(default)
+        columns[name] = values.to_numpy(dtype=object if name in TEXT_COLUMNS else float)
+    return columns
+
+def cost_rows(table, memo):
+    """
+    Cost the rows whose inputs are not in memo yet, one batch per equipment type, and record them in memo.
+    memo maps a row hash to (purchase cost, status). Returns the purchase cost and status of every row.
+    The batches go through the persistent result cache, so a list costed in an earlier session is a lookup.
+    """
+    hashes = row_hashes(table)
+    changed = ~pd.Index(hashes).isin(list(memo))
+    if changed.any():
+        new_rows = table[changed]
+        new_hashes = hashes[changed]
+        for equipment_type, group in new_rows.groupby(new_rows["equipment_type"].fillna(""), sort=False):
+            positions = new_rows.index.get_indexer(group.index)
+            if equipment_type not in BATCH_COSTERS:
+                for row_hash in new_hashes[positions]:
+                    memo[row_hash] = (np.nan, "unknown equipment type")
+                continue
+            columns = _columns(equipment_type, group)
+            valid, reasons = validate(equipment_type, columns, check_ranges=False)
+            if not valid.any():
+                # e.g. a blank row just added in the editor: show it as invalid without costing anything
+                for row_hash, reason in zip(new_hashes[positions], reasons):
+                    memo[row_hash] = (np.nan, unit_status(reason, False, 1))
+                continue
+            results = cached_cost_in_range(equipment_type, columns)
+            totals = np.broadcast_to(results["total"], len(group))
+            reasons = np.broadcast_to(results["reason"], len(group))
+            trains = np.broadcast_to(results["trains"], len(group))
+            extrapolated = np.broadcast_to(results["extrapolated"], len(group))
+            for row_hash, total, reason, train_count, outside in zip(new_hashes[positions], totals, reasons, trains, extrapolated):
+                memo[row_hash] = (float(total), unit_status(reason, outside, train_count))
+    costs = [memo[row_hash] for row_hash in hashes]
+    return np.array([cost for cost, _ in costs], dtype=float), [status for _, status in costs]
+
+def apply_changes(table, page, changes):
+    """
+    Apply one page's data_editor changes (edited, added and deleted rows, by page position) to the full table.
+    """
+    table = table.copy()
+    for position, values in changes.get("edited_rows", {}).items():
+        label = page.index[int(position)]
+        for name, value in values.items():
+            if name in TABLE_COLUMNS:
+                table.at[label, name] = value
+    table = table.drop(index=page.index[list(changes.get("deleted_rows", []))])
+    added = [row for row in changes.get("added_rows", []) if row]
+    if added:
+        start = int(table.index.max()) + 1 if len(table) else 0
+        table = pd.concat([table, pd.DataFrame(added, index=pd.RangeIndex(start, start + len(added)))])
+    return normalize(table)
+
+def equipment_table_page():
+    """
+    Cost a full equipment list in an editable, paginated table.
+    """
+    st.subheader("Equipment Table")
+    st.write("Upload or edit a whole equipment list. Only changed rows are recosted; totals update as you edit.")
+
+    if "equipment_table" not in st.session_state:
+        st.session_state.equipment_table = normalize(EXAMPLE_TABLE)
+        st.session_state.equipment_costs = {}
+
+    uploaded = st.file_uploader("Upload an equipment list (CSV; headers may carry units, e.g. \"diameter [m]\")", type="csv")
+    if uploaded is not None and st.session_state.get("equipment_upload") != uploaded.file_id:
+        st.session_state.equipment_table = normalize(pd.read_csv(uploaded)).reset_index(drop=True)
+        st.session_state.equipment_upload = uploaded.file_id
+        st.session_state.equipment_editor_version = st.session_state.get("equipment_editor_version", 0) + 1
+    table = st.session_state.equipment_table
+    memo = st.session_state.equipment_costs
+
+    # Pagination: only the current page is sent to the browser
+    left, right = st.columns(2)
+    page_size = left.selectbox("Rows per page", PAGE_SIZES, index=1)
+    pages = max(1, -(-len(table) // page_size))
+    page_number = min(right.number_input("Page", min_value=1, value=1, step=1), pages)
+    page = table.iloc[(page_number - 1) * page_size:page_number * page_size]
+
+    costs, status = cost_rows(page, memo)
+    shown = page.assign(purchase_cost=costs, status=status)
+    editor_key = f"equipment_editor_{st.session_state.get('equipment_editor_version', 0)}"
+    st.data_editor(
+        shown,
+        key=editor_key,
+        num_rows="dynamic",
+        column_config={
+            "equipment_type": st.column_config.SelectboxColumn(options=list(BATCH_COSTERS)),
+            "purchase_cost": st.column_config.NumberColumn("Purchase cost ($)", format="%.0f", disabled=True),
+            "status": st.column_config.TextColumn(disabled=True),
+        },
+    )
+
+    # Fold the page's edits into the full table, then start a fresh editor so edits are not replayed
+    changes = st.session_state.get(editor_key, {})
+    if changes.get("edited_rows") or changes.get("added_rows") or changes.get("deleted_rows"):
+        st.session_state.equipment_table = apply_changes(table, page, changes)
+        st.session_state.equipment_editor_version = st.session_state.get("equipment_editor_version", 0) + 1
+        st.rerun()
+
+    # Server-side aggregation over the whole table
+    costs, status = cost_rows(table, memo)
+    if len(memo) > 4 * max(len(table), 1000):
+        hashes = set(row_hashes(table).tolist())
+        st.session_state.equipment_costs = {row_hash: value for row_hash, value in memo.items() if row_hash in hashes}
+    costed = np.isfinite(costs)
+    rollup = capital_rollup(
+        table["equipment_type"].to_numpy(dtype=str)[costed],
+        costs[costed],
+        table["plant_area"].fillna("unassigned").to_numpy(dtype=str)[costed],
+    )
+    plant = rollup["plant"]
+    first, second, third = st.columns(3)
+    first.metric("Purchased equipment (C_P)", f"${plant['C_P']:,.0f}")
+    second.metric("Total bare-module (C_TBM)", f"${plant['C_TBM']:,.0f}")
+    third.metric("Total permanent investment (C_TPI)", f"${plant['C_TPI']:,.0f}")
+    st.write(f"{int(costed.sum())} of {len(table)} units costed.")
+    if (~costed).any():
+        st.warning(f"{int((~costed).sum())} units could not be costed; see the status column.")
+    st.dataframe(
+        pd.DataFrame({
+            "Purchase cost ($)": pd.Series(rollup["area_purchase"]),
+            "Bare-module cost ($)": pd.Series(rollup["area_bare_module"]),
+        }).rename_axis("Plant area"),
+    )
+    st.download_button(
+        "Download costed table (CSV)",
+        table.assign(purchase_cost=costs, status=status).to_csv(index=False),
+        file_name="equipment_costs.csv",
+        mime="text/csv",
+    )
@@ -0,0 +1,168 @@
+import numpy as np
+
+from batch_costing import (
+    RESULT_COLUMNS,
+    VALIDITY_RANGES,
+    compressor_base_cost,
+    cost_batch,
+    fired_heater_base_cost,
+    heat_exchanger_base_cost,
+    size_variable,
+    vessel_cost,
+)
+from instrumentation import instrument
+from validation import scatter_rows, select_rows, validate
+
+# Validity envelope of every correlation used per equipment type: (correlation, result column, low, high)
+ENVELOPES = {
+    "reactor": (
+        ("vessel cost", *VALIDITY_RANGES["reactor"]),
+        ("platform and ladder diameter", "D", 3, 21),  # ft
+        ("platform and ladder length", "L", 12, 40),  # ft
+    ),
+    "distillation column": (
+        ("vessel cost", *VALIDITY_RANGES["distillation column"]),
+        ("platform and ladder diameter", "D", 3, 24),  # ft
+        ("platform and ladder length", "L", 27, 170),  # ft
+        ("tray diameter", "D", 2, 16),  # ft
+    ),
+    "heat exchanger": (("base cost", *VALIDITY_RANGES["heat exchanger"]),),
+    "compressor": (("base cost", *VALIDITY_RANGES["compressor"]),),
+    "fired heater": (("base cost", *VALIDITY_RANGES["fired heater"]),),
+}
+
+# Units that can be split into identical parallel trains, and the extensive inputs divided between trains
+SPLIT_COLUMNS = {
+    "heat exchanger": ("area", "heat_duty"),
+    "compressor": ("power", "inlet_flow"),
+    "fired heater": ("heat_duty",),
+}
+
+# Exponent of the six-tenths rule used to extrapolate a base cost beyond its correlation range
+SCALING_EXPONENT = 0.6
+
+def flag_bit(index, above):
+    """
+    Flag bit for envelope number index of an equipment type: even bits below range, odd bits above.
+    """
+    return 1 << (2 * index + int(above))
+
+@instrument("extrapolation.out_of_range_flags", rows="results")
+def out_of_range_flags(equipment_type, results):
+    """
+    Flag each costed row whose size lies outside any correlation envelope of its equipment type.
+    """
+    flags = np.zeros(np.shape(results["total"]), dtype=np.uint32)
+    for index, (_, column, low, high) in enumerate(ENVELOPES[equipment_type]):
+        values = np.asarray(results[column], dtype=float)
+        flags |= np.where(values < low, flag_bit(index, False), 0).astype(np.uint32)
+        flags |= np.where(values > high, flag_bit(index, True), 0).astype(np.uint32)
+    return flags
+
+def describe_flags(equipment_type, flags):
+    """
+    List the out-of-range messages for one row's flags.
+    """
+    messages = []
+    for index, (correlation, column, low, high) in enumerate(ENVELOPES[equipment_type]):
+        if flags & flag_bit(index, False):
+            messages.append(f"{correlation}: {column} below {low:g}")
+        if flags & flag_bit(index, True):
+            messages.append(f"{correlation}: {column} above {high:g}")
+    return messages
+
+@instrument("extrapolation.split_into_trains", rows="columns")
+def split_into_trains(equipment_type, columns):
+    """
+    Split units larger than the correlation range into the fewest identical parallel trains within range.
+    Returns (columns per train, number of trains per unit).
+    """
+    _, low, high = VALIDITY_RANGES[equipment_type]
+    with np.errstate(all="ignore"):
+        size = np.asarray(size_variable(equipment_type, columns), dtype=float)
+    trains = np.where(np.isfinite(size) & (size > high), np.ceil(size / high), 1.0)
+    if equipment_type not in SPLIT_COLUMNS or not (trains > 1).any():
+        return columns, np.ones_like(size)
+    split = dict(columns)
+    for name in SPLIT_COLUMNS[equipment_type]:
+        if name in split:
+            split[name] = np.asarray(split[name], dtype=float) / trains
+            break
+    return split, trains
+
+def _extrapolate_vessel(equipment_type, results, size, clipped):
+    material_factor = results["C_PV"] / results["C_V"]
+    base_cost = vessel_cost(clipped, equipment_type) * (size / clipped) ** SCALING_EXPONENT
+    results["total"] = results["total"] - results["C_PV"] + material_factor * base_cost
+    results["C_V"] = base_cost
+    results["C_PV"] = material_factor * base_cost
+
+def _extrapolate_heat_exchanger(equipment_type, results, size, clipped):
+    results["C_B"] = heat_exchanger_base_cost(clipped) * (size / clipped) ** SCALING_EXPONENT
+    results["total"] = results["F_P"] * results["F_M"] * results["F_L"] * results["C_B"]
+
+def _extrapolate_compressor(equipment_type, results, size, clipped):
+    results["C_B"] = compressor_base_cost(clipped) * (size / clipped) ** SCALING_EXPONENT
+    results["total"] = results["F_D"] * results["F_M"] * results["C_B"]
+
+def _extrapolate_fired_heater(equipment_type, results, size, clipped):
+    results["C_B"] = fired_heater_base_cost(clipped) * (size / clipped) ** SCALING_EXPONENT
+    results["total"] = results["F_M"] * results["C_B"]
+
+# Fallback correlation per equipment type: base cost at the nearest range limit, scaled by the six-tenths rule
+FALLBACKS = {
+    "reactor": _extrapolate_vessel,
+    "distillation column": _extrapolate_vessel,
+    "heat exchanger": _extrapolate_heat_exchanger,
+    "compressor": _extrapolate_compressor,
+    "fired heater": _extrapolate_fired_heater,
+}
+
+@instrument("extrapolation.cost_with_fallback", rows="columns")
+def cost_with_fallback(equipment_type, columns):
+    """
+    Cost units so that no base cost is read off a correlation outside its fitted range.
+    Oversized exchangers, compressors and fired heaters are split into parallel trains; sizes still
+    outside the range are extrapolated from the range limit with the six-tenths rule.
+    The breakdown columns are per train; "total" covers all trains of the unit.
+    Adds "trains", "extrapolated" and "range_flags" (flags before fallback, see describe_flags).
+    """
+    columns, trains = split_into_trains(equipment_type, columns)
+    results = dict(cost_batch(equipment_type, columns))
+    flags = out_of_range_flags(equipment_type, results)
+
+    size_column, low, high = VALIDITY_RANGES[equipment_type]
+    size = np.asarray(results[size_column], dtype=float)
+    clipped = np.clip(size, low, high)
+    extrapolated = np.isfinite(size) & (size != clipped)
+    if extrapolated.any():
+        FALLBACKS[equipment_type](equipment_type, results, size, clipped)
+    results["total"] = results["total"] * trains
+    results["trains"] = trains
+    results["extrapolated"] = extrapolated
+    results["range_flags"] = flags
+    return results
+
+@instrument("extrapolation.cost_in_range", rows="columns")
+def cost_in_range(equipment_type, columns):
+    """
+    Validate the physical domain, then cost the valid rows with cost_with_fallback().
+    Invalid rows get NaN costs and their validation reason codes; a batch with no valid row is never costed.
+    """
+    valid, reasons = validate(equipment_type, columns, check_ranges=False)
+    flags = np.zeros(valid.shape, dtype=np.uint32)
+    extrapolated = np.zeros(valid.shape, dtype=bool)
+    if valid.any():
+        with np.errstate(all="ignore"):
+            results = cost_with_fallback(equipment_type, select_rows(columns, valid))
+        flags[valid] = results.pop("range_flags")
+        extrapolated[valid] = results.pop("extrapolated")
+        results = scatter_rows(results, valid)
+    else:
+        # Nothing to cost, so the kernel never sees an empty batch
+        results = {name: np.full(valid.shape, np.nan) for name in RESULT_COLUMNS[equipment_type] + ("trains",)}
+    results["extrapolated"] = extrapolated
+    results["range_flags"] = flags
+    results["valid"] = valid
+    results["reason"] = reasons
+    return results
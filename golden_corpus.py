@@ -0,0 +1,577 @@
+import argparse
+import ast
+import functools
+import hashlib
+import importlib.util
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import batch_costing
+import batch_utilities
+import jit_kernels
+from batch_costing import (
+    COMPRESSOR_DRIVE_FACTORS,
+    COMPRESSOR_MATERIAL_FACTORS,
+    CORRELATION_VERSION,
+    FIRED_HEATER_MATERIAL_FACTORS,
+    HEAT_EXCHANGER_MATERIAL_FACTORS,
+    MATERIAL_FACTORS,
+    TRAY_MATERIAL_FACTORS,
+    TRAY_TYPE_FACTORS,
+)
+from instrumentation import instrument, stage
+from result_cache import ResultCache, cached_cost_batch, cached_utilities_batch
+
+# Where the corpus is kept
+DEFAULT_CORPUS_PATH = os.environ.get(
+    "COSTING_GOLDEN_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "chemical-engguy", "golden_corpus.npz"),
+)
+
+# Committed seed and checksums of the reference outputs. The corpus itself is regenerated from the seed,
+# and its references must match these checksums, so a change to the CLI tables (which the vectorized
+# paths load too) is caught. Rewrite it with "pin" only after a deliberate correlation change.
+PINNED_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_corpus.json")
+
+# Cases per equipment type (and for the utilities) in a generated corpus
+GOLDEN_ROWS = 200_000
+
+# Cases per equipment type run through the slow scalar paths
+SCALAR_ROWS = 2_000
+
+KINDS = ("reactor", "distillation column", "heat exchanger", "compressor", "fired heater", "utilities")
+
+# The files holding a scalar copy of the correlations
+SOURCES = {
+    "cli": "Equipment cost full script.py",
+    "streamlit_app": "streamlit_app.py",
+    "streamlit_app2.0": "streamlit_app2.0.py",
+    "utilities_calculator": "UtilitiesCalculator.py",
+}
+
+# Source of the reference outputs for each kind
+REFERENCE_SOURCES = {
+    "reactor": "cli",
+    "distillation column": "cli",
+    "heat exchanger": "cli",
+    "compressor": "cli",
+    "fired heater": "streamlit_app2.0",  # the only file that costs fired heaters
+    "utilities": "utilities_calculator",
+}
+
+# Module-level constants and scalar functions compared across the files
+TABLES = (
+    "DENSITY_CARBON_STEEL",
+    "WALL_THICKNESS",
+    "MATERIAL_FACTORS",
+    "TRAY_TYPE_FACTORS",
+    "TRAY_MATERIAL_FACTORS",
+    "HEAT_EXCHANGER_MATERIAL_FACTORS",
+    "COMPRESSOR_MATERIAL_FACTORS",
+    "Cp_water",
+    "delta_H_comb",
+    "CO2_emission_factor",
+    "efficiency",
+)
+SCALAR_FUNCTIONS = (
+    "calculate_vessel_weight",
+    "calculate_vessel_cost",
+    "calculate_platform_ladder_cost",
+    "calculate_tray_cost",
+    "calculate_heat_exchanger_base_cost",
+    "calculate_pressure_factor",
+    "calculate_heat_exchanger_material_factor",
+    "calculate_compressor_power",
+    "calculate_compressor_base_cost",
+    "calculate_fired_heater_base_cost",
+)
+
+# Scalar functions a file is expected to lack: the CLI and the first app have no fired heater page
+EXPECTED_GAPS = {
+    "calculate_fired_heater_base_cost": ("cli", "streamlit_app"),
+}
+
+def _source_path(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), SOURCES[name])
+
+@functools.lru_cache(maxsize=None)
+def load_source(name):
+    """
+    Load one of the scalar files as a module (without running its main()), or None if its
+    dependencies are not installed.
+    """
+    if name == "cli":
+        return batch_costing.reference
+    spec = importlib.util.spec_from_file_location(f"golden_{name.replace('.', '_')}", _source_path(name))
+    module = importlib.util.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(module)
+    except ImportError:
+        return None
+    return module
+
+def supports(module, kind):
+    """
+    Whether a scalar file can cost this kind of unit.
+    """
+    if kind == "utilities":
+        return hasattr(module, "calculate_cooling_water")
+    if kind == "fired heater":
+        return hasattr(module, "calculate_fired_heater_base_cost")
+    return hasattr(module, "calculate_heat_exchanger_base_cost")
+
+def _scalar_unit(module, kind, unit):
+    """
+    One unit's results from a file's scalar functions and tables, with the same names as the batch kernels.
+    """
+    if kind in ("reactor", "distillation column"):
+        diameter, length = unit["diameter"], unit["length"]
+        material = module.MATERIAL_FACTORS.get(unit["material"], {"F_M": 1.0, "density": 490})
+        weight = module.calculate_vessel_weight(diameter, length, material["density"])
+        vessel_cost = module.calculate_vessel_cost(weight, kind)
+        results = {
+            "D": diameter,
+            "L": length,
+            "W": weight,
+            "C_V": vessel_cost,
+            "C_PV": material["F_M"] * vessel_cost,
+            "C_PL": module.calculate_platform_ladder_cost(diameter, length, kind),
+        }
+        results["total"] = results["C_PV"] + results["C_PL"]
+        if kind == "distillation column":
+            results["C_T"] = module.calculate_tray_cost(diameter, int(unit["num_trays"]), unit["tray_type"], unit["tray_material"])
+            results["total"] += results["C_T"]
+        return results
+    if kind == "heat exchanger":
+        area = unit["heat_duty"] / unit["flux_rate"]
+        results = {
+            "A": area,
+            "C_B": module.calculate_heat_exchanger_base_cost(area),
+            "F_P": module.calculate_pressure_factor(unit["pressure"]),
+            "F_L": 1.0,
+            "F_M": module.calculate_heat_exchanger_material_factor(area, unit["material"], module.HEAT_EXCHANGER_MATERIAL_FACTORS),
+        }
+        results["total"] = results["F_P"] * results["F_M"] * results["F_L"] * results["C_B"]
+        return results
+    if kind == "compressor":
+        power = module.calculate_compressor_power(
+            unit["inlet_flow"], unit["inlet_pressure"], unit["outlet_pressure"], unit["specific_heat_ratio"], unit["efficiency"]
+        )
+        # The drive factors are local to each file's compressor page, so the shared table stands in for them
+        results = {
+            "P_c": power,
+            "C_B": module.calculate_compressor_base_cost(power),
+            "F_D": COMPRESSOR_DRIVE_FACTORS.get(unit["drive_type"], 1.0),
+            "F_M": module.COMPRESSOR_MATERIAL_FACTORS.get(unit["material"], 1.0),
+        }
+        results["total"] = results["F_D"] * results["F_M"] * results["C_B"]
+        return results
+    if kind == "fired heater":
+        # As are the fired heater material factors in streamlit_app2.0.py
+        results = {
+            "Q": unit["heat_duty"],
+            "C_B": module.calculate_fired_heater_base_cost(unit["heat_duty"]),
+            "F_M": FIRED_HEATER_MATERIAL_FACTORS.get(unit["material"], 1.0),
+        }
+        results["total"] = results["F_M"] * results["C_B"]
+        return results
+    if kind == "utilities":
+        Q_heater, m_ng = module.calculate_natural_gas(unit["Q_heating"], module.delta_H_comb, module.efficiency)
+        return {
+            "m_cw": module.calculate_cooling_water(unit["Q_cooling"], module.Cp_water, unit["delta_T_cw"]),
+            "Q_heater": Q_heater,
+            "m_ng": m_ng,
+            "m_CO2": module.calculate_CO2_emissions(m_ng, module.CO2_emission_factor),
+        }
+    raise ValueError(f"Unknown kind: {kind}")
+
+def scalar_batch(module, kind, columns, rows=None):
+    """
+    Run a file's scalar functions over the first rows of a set of columns, one unit at a time.
+    Units the scalar code cannot cost (math domain errors) get NaN results.
+    """
+    count = len(next(iter(columns.values())))
+    rows = count if rows is None else min(rows, count)
+    names = list(columns)
+    results = {}
+    for row in range(rows):
+        unit = {name: columns[name][row].item() for name in names}
+        try:
+            values = _scalar_unit(module, kind, unit)
+        except (ValueError, ZeroDivisionError, OverflowError):
+            values = {}
+        for name, value in values.items():
+            if name not in results:
+                results[name] = np.full(rows, np.nan)
+            # A negative base raised to a fractional power gives a complex number in Python
+            results[name][row] = np.nan if isinstance(value, complex) else value
+    return results
+
+def random_inputs(equipment_type, rows, seed=0):
+    """
+    Random but physically sensible input columns for an equipment type, or for "utilities",
+    spanning and slightly exceeding each correlation's range and every factor table key.
+    """
+    rng = np.random.default_rng(seed)
+
+    def uniform(low, high):
+        return rng.uniform(low, high, rows)
+
+    def choice(table):
+        # Plus a key in no table, so the fallback for a mistyped material or drive is covered too
+        return rng.choice(np.array(list(table) + ["unlisted"]), rows)
+
+    if equipment_type in ("reactor", "distillation column"):
+        columns = {"diameter": uniform(1, 20), "length": uniform(5, 200), "material": choice(MATERIAL_FACTORS)}
+        if equipment_type == "distillation column":
+            columns["num_trays"] = rng.integers(1, 100, rows).astype(float)
+            columns["tray_type"] = choice(TRAY_TYPE_FACTORS)
+            columns["tray_material"] = choice(TRAY_MATERIAL_FACTORS)
+        return columns
+    if equipment_type == "heat exchanger":
+        return {
+            "heat_duty": np.exp(uniform(np.log(1e5), np.log(1e9))),
+            "flux_rate": uniform(1000, 20000),
+            "pressure": uniform(0, 1000),
+            "material": choice(HEAT_EXCHANGER_MATERIAL_FACTORS),
+        }
+    if equipment_type == "compressor":
+        inlet_pressure = uniform(10, 500)
+        return {
+            "inlet_flow": np.exp(uniform(np.log(100), np.log(1e5))),
+            "inlet_pressure": inlet_pressure,
+            "outlet_pressure": inlet_pressure * uniform(1.1, 5),
+            "specific_heat_ratio": uniform(1.05, 1.67),
+            "efficiency": uniform(0.5, 0.95),
+            "drive_type": choice(COMPRESSOR_DRIVE_FACTORS),
+            "material": choice(COMPRESSOR_MATERIAL_FACTORS),
+        }
+    if equipment_type == "fired heater":
+        return {"heat_duty": np.exp(uniform(np.log(1e6), np.log(1e9))), "material": choice(FIRED_HEATER_MATERIAL_FACTORS)}
+    if equipment_type == "utilities":
+        return {"Q_cooling": uniform(0, 1e8), "delta_T_cw": uniform(5, 20), "Q_heating": uniform(0, 1e8)}
+    raise ValueError(f"Unknown equipment type: {equipment_type}")
+
+def max_relative_error(reference, candidate):
+    """
+    Largest relative difference over every result column; NaN in the same place counts as equal.
+    """
+    worst = 0.0
+    for name, expected in reference.items():
+        # Scalar inputs echoed in the results may come back broadcast to the batch shape
+        expected, actual = np.broadcast_arrays(np.asarray(expected, dtype=float), np.asarray(candidate[name], dtype=float))
+        if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+            return math.inf
+        finite = np.isfinite(expected)
+        if finite.any():
+            error = np.abs(actual[finite] - expected[finite]) / np.maximum(np.abs(expected[finite]), 1e-300)
+            worst = max(worst, float(error.max()))
+    return worst
+
+def _head(columns, rows):
+    return {name: values[:rows] for name, values in columns.items()}
+
+@instrument("golden_corpus.generate")
+def generate(path=DEFAULT_CORPUS_PATH, rows=GOLDEN_ROWS, seed=0):
+    """
+    Generate the corpus: random inputs for every kind with reference outputs from the scalar files.
+    """
+    arrays = {}
+    for offset, kind in enumerate(KINDS):
+        module = load_source(REFERENCE_SOURCES[kind])
+        if module is None:
+            raise ImportError(f"{SOURCES[REFERENCE_SOURCES[kind]]} needs packages that are not installed")
+        columns = random_inputs(kind, rows, seed + offset)
+        for name, values in columns.items():
+            arrays[f"{kind}/input/{name}"] = values
+        for name, values in scalar_batch(module, kind, columns).items():
+            arrays[f"{kind}/output/{name}"] = values
+    meta = {"correlation_version": CORRELATION_VERSION, "rows": rows, "seed": seed, "reference_sources": REFERENCE_SOURCES}
+    arrays["meta"] = np.array(json.dumps(meta))
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = path + ".tmp.npz"
+    np.savez(temporary, **arrays)
+    os.replace(temporary, path)
+    return meta
+
+def load(path=DEFAULT_CORPUS_PATH):
+    """
+    Load the corpus as {kind: (input columns, reference outputs)} and its metadata.
+    """
+    corpus = {kind: ({}, {}) for kind in KINDS}
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        for key in data.files:
+            if key == "meta":
+                continue
+            kind, section, name = key.split("/")
+            corpus[kind][0 if section == "input" else 1][name] = data[key]
+    return corpus, meta
+
+def _column_checksums(prefix, columns):
+    sums = {}
+    for name, values in sorted(columns.items()):
+        if values.dtype.kind in "SU":
+            sums[f"{prefix}/{name}"] = {"sha256": hashlib.sha256("\n".join(values.tolist()).encode()).hexdigest()}
+        else:
+            finite = values[np.isfinite(values)]
+            sums[f"{prefix}/{name}"] = {"finite": int(finite.size), "sum": math.fsum(finite.tolist())}
+    return sums
+
+def checksums(corpus):
+    """
+    Compact checksums of every corpus column: the count and exact sum of the finite values of numbers,
+    a hash of text. Sums tolerate last-digit differences in exp/log between platforms; hashes do not need to.
+    """
+    sums = {}
+    for kind, sections in corpus.items():
+        for section, columns in zip(("input", "output"), sections):
+            sums.update(_column_checksums(f"{kind}/{section}", columns))
+    return sums
+
+def load_pinned(path=PINNED_PATH):
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+def pin(path=DEFAULT_CORPUS_PATH, pinned_path=PINNED_PATH):
+    """
+    Record the corpus's seed, size and checksums in the committed file.
+    """
+    corpus, meta = load(path)
+    pinned = {"correlation_version": meta["correlation_version"], "rows": meta["rows"], "seed": meta["seed"], "checksums": checksums(corpus)}
+    with open(pinned_path, "w", encoding="utf-8") as file:
+        json.dump(pinned, file, indent=1, sort_keys=True)
+        file.write("\n")
+    return pinned
+
+def _checksum_error(expected, actual):
+    if expected.keys() != actual.keys() or "sha256" in expected:
+        return 0.0 if expected == actual else math.inf
+    if expected["finite"] != actual["finite"]:
+        return math.inf
+    return abs(actual["sum"] - expected["sum"]) / max(abs(expected["sum"]), 1e-300)
+
+def _checksums_error(expected, actual, prefix):
+    """
+    Largest checksum error over the columns under prefix; a column on one side only counts as infinite.
+    """
+    keys = {key for key in set(expected) | set(actual) if key.startswith(f"{prefix}/")}
+    return max(
+        (math.inf if key not in expected or key not in actual else _checksum_error(expected[key], actual[key]) for key in keys),
+        default=0.0,
+    )
+
+def pinned_report(corpus, pinned, tolerance):
+    """
+    Compare a corpus file with the pinned checksums: one entry per kind for its inputs and one for its
+    references. Nothing is evaluated, so the entries count no cases.
+    """
+    sums = checksums(corpus)
+    report = []
+    for kind in KINDS:
+        for section in ("input", "output"):
+            error = _checksums_error(pinned["checksums"], sums, f"{kind}/{section}")
+            report.append({
+                "kind": kind,
+                "path": f"pinned {'inputs' if section == 'input' else 'references'}",
+                "cases": None,
+                "max_error": error,
+                "seconds": 0.0,
+                "ok": error <= tolerance,
+            })
+    return report
+
+def reference_report(corpus, pinned, tolerance):
+    """
+    Run each kind's reference file over every case and compare its outputs with the pinned checksums.
+    Comparing it with the corpus references would only compare it with itself.
+    """
+    report = []
+    for kind in KINDS:
+        name = REFERENCE_SOURCES[kind]
+        module = load_source(name)
+        if module is None:
+            continue
+        columns = corpus[kind][0]
+        start = time.perf_counter()
+        with stage(f"golden_corpus.scalar {name}", len(next(iter(columns.values())))):
+            error = _checksums_error(pinned["checksums"], _column_checksums(f"{kind}/output", scalar_batch(module, kind, columns)), f"{kind}/output")
+        report.append({
+            "kind": kind,
+            "path": f"scalar {name} (pinned)",
+            "cases": len(next(iter(columns.values()))),
+            "max_error": error,
+            "seconds": time.perf_counter() - start,
+            "ok": error <= tolerance,
+        })
+    return report
+
+def _paths(kind, scalar_rows, cache):
+    """
+    The implementations checked for a kind: (name, function of columns, rows it runs on or None for all).
+    """
+    if kind == "utilities":
+        paths = [
+            ("vectorized", batch_utilities.utilities_batch, None),
+            ("cached", lambda columns: cached_utilities_batch(columns, cache), None),
+            ("jit", jit_kernels.jit_utilities_batch, None if jit_kernels.HAVE_NUMBA else scalar_rows),
+        ]
+    else:
+        paths = [
+            ("vectorized", functools.partial(batch_costing.cost_batch, kind), None),
+            ("cached", lambda columns: cached_cost_batch(kind, columns, cache), None),
+            ("jit", jit_kernels.JIT_COSTERS[kind], None if jit_kernels.HAVE_NUMBA else scalar_rows),
+        ]
+    # The reference file is checked against the pinned checksums instead (see reference_report)
+    for name in SOURCES:
+        module = load_source(name)
+        if name != REFERENCE_SOURCES[kind] and module is not None and supports(module, kind):
+            paths.append((f"scalar {name}", functools.partial(scalar_batch, module, kind), scalar_rows))
+    return paths
+
+def check(path=DEFAULT_CORPUS_PATH, tolerance=1e-9, scalar_rows=SCALAR_ROWS):
+    """
+    Run every implementation over the corpus and compare it with the reference outputs.
+    The vectorized and cached paths (and the compiled kernels, when numba is installed) run every case;
+    scalar paths and uncompiled loops run the first scalar_rows cases of each kind.
+    The cached path runs twice, so both a miss and a hit are compared.
+    A missing corpus is generated from the pinned seed. A corpus of the pinned seed and size is compared
+    with the pinned checksums first, and the reference files are run over all of it and compared with
+    them too; other corpora have no pinned outputs to check the reference files against.
+    Returns one entry per (kind, path) with the cases run (None when nothing was evaluated) and the
+    largest relative error.
+    """
+    pinned = load_pinned()
+    if not os.path.exists(path):
+        generate(path, pinned["rows"], pinned["seed"])
+    corpus, meta = load(path)
+    for version in (meta["correlation_version"], pinned["correlation_version"]):
+        if version != CORRELATION_VERSION:
+            raise ValueError(
+                f"Corpus was generated for correlation version {version}, "
+                f"not {CORRELATION_VERSION}; regenerate and pin it after a deliberate correlation change"
+            )
+    report = []
+    if (meta["rows"], meta["seed"]) == (pinned["rows"], pinned["seed"]):
+        report += pinned_report(corpus, pinned, tolerance)
+        with np.errstate(all="ignore"):
+            report += reference_report(corpus, pinned, tolerance)
+    with tempfile.TemporaryDirectory() as directory, np.errstate(all="ignore"):
+        cache = ResultCache(os.path.join(directory, "cache.sqlite"))
+        for kind in KINDS:
+            columns, reference = corpus[kind]
+            for name, function, rows in _paths(kind, scalar_rows, cache):
+                inputs = columns if rows is None else _head(columns, rows)
+                expected = reference if rows is None else _head(reference, rows)
+                start = time.perf_counter()
+                with stage(f"golden_corpus.{name}", len(next(iter(inputs.values())))):
+                    error = max_relative_error(expected, function(inputs))
+                    if name == "cached":
+                        error = max(error, max_relative_error(expected, function(inputs)))
+                report.append({
+                    "kind": kind,
+                    "path": name,
+                    "cases": len(next(iter(inputs.values()))),
+                    "max_error": error,
+                    "seconds": time.perf_counter() - start,
+                    "ok": error <= tolerance,
+                })
+    return report
+
+def read_tables(path):
+    """
+    Module-level constants (see TABLES) and the functions a file defines or imports from
+    scalar_correlations, read without running it.
+    """
+    with open(path, encoding="utf-8") as file:
+        tree = ast.parse(file.read())
+    tables = {}
+    functions = set()
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name) and node.targets[0].id in TABLES:
+            tables[node.targets[0].id] = ast.literal_eval(node.value)
+        elif isinstance(node, ast.FunctionDef):
+            functions.add(node.name)
+        elif isinstance(node, ast.ImportFrom) and node.module == "scalar_correlations":
+            functions.update(alias.asname or alias.name for alias in node.names)
+    return tables, functions
+
+def _flatten(value, prefix=""):
+    if isinstance(value, dict):
+        flat = {}
+        for key, item in value.items():
+            flat.update(_flatten(item, f"{prefix}[{key!r}]"))
+        return flat
+    return {prefix: value}
+
+def table_drift():
+    """
+    Differences between the constants and scalar functions of the files that copy the correlations,
+    apart from the gaps in EXPECTED_GAPS. Returns one message per difference.
+    """
+    files = {name: read_tables(_source_path(name)) for name in SOURCES}
+    messages = []
+    for table in TABLES:
+        holders = {name: _flatten(tables[table]) for name, (tables, _) in files.items() if table in tables}
+        if len(holders) < 2:
+            continue
+        for entry in sorted(set().union(*holders.values())):
+            values = {name: flat.get(entry, "missing") for name, flat in holders.items()}
+            if len({repr(value) for value in values.values()}) > 1:
+                messages.append(f"{table}{entry}: " + ", ".join(f"{name}={value}" for name, value in values.items()))
+    costing_files = [name for name in SOURCES if name != "utilities_calculator"]
+    for function in SCALAR_FUNCTIONS:
+        missing = [name for name in costing_files if function not in files[name][1] and name not in EXPECTED_GAPS.get(function, ())]
+        if missing:
+            messages.append(f"{function}: missing in {', '.join(missing)}")
+    for name, value in batch_utilities.UTILITY_CONSTANTS.items():
+        if files["utilities_calculator"][0].get(name) != value:
+            messages.append(f"{name}: utilities_calculator={files['utilities_calculator'][0].get(name)}, batch_utilities={value}")
+    return messages
+
+def main():
+    parser = argparse.ArgumentParser(description="Golden regression corpus for the cost correlations.")
+    parser.add_argument("--path", default=DEFAULT_CORPUS_PATH, help="corpus file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    make = commands.add_parser("generate", help="generate inputs and reference outputs")
+    make.add_argument("--rows", type=int, default=GOLDEN_ROWS, help="cases per equipment type")
+    make.add_argument("--seed", type=int, default=0)
+    run = commands.add_parser("check", help="check every implementation against the corpus")
+    run.add_argument("--tolerance", type=float, default=1e-9, help="largest relative error allowed")
+    run.add_argument("--scalar-rows", type=int, default=SCALAR_ROWS, help="cases per kind for the scalar paths")
+    commands.add_parser("pin", help="record the corpus's seed and checksums in golden_corpus.json")
+    commands.add_parser("drift", help="list differences between the files' tables")
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        start = time.perf_counter()
+        meta = generate(args.path, args.rows, args.seed)
+        print(f"Wrote {meta['rows'] * len(KINDS):,} cases to {args.path} in {time.perf_counter() - start:.1f} s")
+    elif args.command == "check":
+        start = time.perf_counter()
+        report = check(args.path, args.tolerance, args.scalar_rows)
+        for entry in report:
+            status = "ok" if entry["ok"] else "FAIL"
+            cases = "n/a" if entry["cases"] is None else f"{entry['cases']:,}"
+            print(f"{status:4}  {entry['kind']:20} {entry['path']:32} {cases:>10} cases  max error {entry['max_error']:.2e}  {entry['seconds']:.2f} s")
+        total = sum(entry["cases"] for entry in report if entry["cases"] is not None)
+        print(f"{total:,} cases checked in {time.perf_counter() - start:.1f} s")
+        sys.exit(0 if all(entry["ok"] for entry in report) else 1)
+    elif args.command == "pin":
+        pinned = pin(args.path)
+        print(f"Pinned {len(pinned['checksums'])} column checksums (seed {pinned['seed']}, {pinned['rows']:,} rows) to {PINNED_PATH}")
+    else:
+        messages = table_drift()
+        for message in messages:
+            print(message)
+        print("No drift" if not messages else f"{len(messages)} differences")
+        sys.exit(1 if messages else 0)
+
+if __name__ == "__main__":
+    main()
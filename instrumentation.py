@@ -0,0 +1,210 @@
+import atexit
+import contextlib
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+# Opt in with COSTING_METRICS=1; COSTING_METRICS_FILE picks where flush() writes (.json or Prometheus text)
+_enabled = os.environ.get("COSTING_METRICS", "") not in ("", "0")
+METRICS_FILE = os.environ.get("COSTING_METRICS_FILE", "")
+
+# Latency samples kept per metric for percentiles (reservoir sampling beyond this)
+RESERVOIR_SIZE = 4096
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+class _Metric:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.max = 0.0
+        self.samples = []
+        self.random = random.Random(0)
+
+    def record(self, seconds, rows):
+        with self.lock:
+            self.calls += 1
+            self.rows += rows
+            self.seconds += seconds
+            self.max = max(self.max, seconds)
+            if len(self.samples) < RESERVOIR_SIZE:
+                self.samples.append(seconds)
+            else:
+                index = self.random.randrange(self.calls)
+                if index < RESERVOIR_SIZE:
+                    self.samples[index] = seconds
+
+    def summary(self):
+        with self.lock:
+            samples = sorted(self.samples)
+            summary = {
+                "calls": self.calls,
+                "rows": self.rows,
+                "seconds": self.seconds,
+                "max": self.max,
+            }
+        for quantile in QUANTILES:
+            summary[f"p{round(quantile * 100)}"] = samples[min(int(quantile * len(samples)), len(samples) - 1)] if samples else 0.0
+        return summary
+
+_metrics = {}
+_metrics_lock = threading.Lock()
+
+def enable():
+    global _enabled
+    _enabled = True
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def reset():
+    """
+    Forget every recorded metric.
+    """
+    with _metrics_lock:
+        _metrics.clear()
+
+def _metric(name):
+    metric = _metrics.get(name)
+    if metric is None:
+        with _metrics_lock:
+            metric = _metrics.setdefault(name, _Metric())
+    return metric
+
+def count_rows(value):
+    """
+    Number of rows in a batch argument: the longest column of a dict of input columns (scalar columns
+    apply to every row), the length of a list, or the size of an array.
+    """
+    if isinstance(value, dict):
+        return max((int(np.size(column)) for column in value.values() if np.ndim(column)), default=1)
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    return int(np.size(value))
+
+def record(name, seconds, rows=0):
+    """
+    Record one timed call under a metric name.
+    """
+    _metric(name).record(seconds, rows)
+
+def _row_counter(func, rows):
+    """
+    A function of a call's (args, kwargs) returning its row count, for instrument()'s rows argument.
+    """
+    if callable(rows):
+        return lambda args, kwargs: rows(*args, **kwargs)
+    parameters = inspect.signature(func).parameters
+    name = rows if rows is not None else next(iter(parameters), None)
+    if name is None:
+        return lambda args, kwargs: 0
+    position = list(parameters).index(name)
+    default = parameters[name].default
+
+    def counter(args, kwargs):
+        if position < len(args):
+            return count_rows(args[position])
+        value = kwargs.get(name, default)
+        return 0 if value is inspect.Parameter.empty else count_rows(value)
+    return counter
+
+def instrument(name, rows=None):
+    """
+    Decorator recording call count, latency and rows under name.
+    Rows are counted from the argument named rows (the first argument by default), or by calling
+    rows with the call's arguments when it is a function.
+    When metrics are disabled the only overhead is one global lookup per call.
+    """
+    def decorator(func):
+        counter = _row_counter(func, rows)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start, counter(args, kwargs))
+        return wrapper
+    return decorator
+
+@contextlib.contextmanager
+def stage(name, rows=0):
+    """
+    Time a block of code (I/O, rendering, a pipeline stage) under a metric name.
+    """
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start, rows)
+
+def snapshot():
+    """
+    Return every metric's counters and latency percentiles as a dict.
+    """
+    with _metrics_lock:
+        metrics = dict(_metrics)
+    return {name: metrics[name].summary() for name in sorted(metrics)}
+
+def prometheus_text():
+    """
+    Render the metrics in the Prometheus text exposition format.
+    """
+    metrics = snapshot()
+    lines = [
+        "# HELP costing_calls_total Calls per instrumented function or stage.",
+        "# TYPE costing_calls_total counter",
+    ]
+    lines += [f'costing_calls_total{{name="{name}"}} {summary["calls"]}' for name, summary in metrics.items()]
+    lines += [
+        "# HELP costing_rows_total Rows processed per instrumented function or stage.",
+        "# TYPE costing_rows_total counter",
+    ]
+    lines += [f'costing_rows_total{{name="{name}"}} {summary["rows"]}' for name, summary in metrics.items()]
+    lines += [
+        "# HELP costing_latency_seconds Latency per call.",
+        "# TYPE costing_latency_seconds summary",
+    ]
+    for name, summary in metrics.items():
+        for quantile in QUANTILES:
+            lines.append(f'costing_latency_seconds{{name="{name}",quantile="{quantile}"}} {summary[f"p{round(quantile * 100)}"]:.9f}')
+        lines.append(f'costing_latency_seconds_sum{{name="{name}"}} {summary["seconds"]:.9f}')
+        lines.append(f'costing_latency_seconds_count{{name="{name}"}} {summary["calls"]}')
+    return "\n".join(lines) + "\n"
+
+def write(path):
+    """
+    Write the metrics to path: JSON for .json files, Prometheus text otherwise.
+    """
+    text = json.dumps(snapshot(), indent=2) if path.endswith(".json") else prometheus_text()
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+def flush():
+    """
+    Write the metrics to COSTING_METRICS_FILE if metrics are enabled and a file is configured.
+    """
+    if _enabled and METRICS_FILE:
+        write(METRICS_FILE)
+
+atexit.register(flush)
@@ -0,0 +1,314 @@
+import math
+import os
+
+import numpy as np
+
+import batch_costing
+import batch_utilities
+from batch_costing import (
+    COMPRESSOR_DRIVE_FACTORS,
+    COMPRESSOR_MATERIAL_FACTORS,
+    DEFAULT_MATERIALS,
+    FIRED_HEATER_MATERIAL_FACTORS,
+    HEAT_EXCHANGER_MATERIAL_FACTORS,
+    MATERIAL_FACTORS,
+    PLATFORM_LADDER_COEFFICIENTS,
+    TRAY_MATERIAL_FACTORS,
+    TRAY_TYPE_FACTORS,
+    VESSEL_COST_INTERCEPTS,
+    WALL_THICKNESS,
+    _lookup,
+    reactor_dimensions,
+)
+from instrumentation import instrument
+
+try:
+    import numba
+except ImportError:  # numba is optional; the NumPy kernels in batch_costing are used without it
+    numba = None
+
+# Set COSTING_JIT=0 to use the NumPy kernels even when numba is installed
+HAVE_NUMBA = numba is not None and os.environ.get("COSTING_JIT", "1") != "0"
+
+prange = numba.prange if numba is not None else range
+
+def _compile(function):
+    """
+    Compile a row loop with numba, parallel over rows. Without numba the plain Python loop is kept;
+    it is only run by the tests and the golden corpus on small samples.
+    """
+    if numba is None:
+        return function
+    return numba.njit(parallel=True, cache=True)(function)
+
+# Row loops: each computes every result of a unit in one pass, with no temporary arrays
+
+@_compile
+def _vessel_loop(diameter, length, density, material_factor, intercept, coefficient, diameter_exponent, length_exponent, weight, base_cost, adjusted_cost, platform_ladder):
+    for row in prange(weight.shape[0]):
+        D = diameter[row]
+        L = length[row]
+        W = math.pi * (D + WALL_THICKNESS) * (L + 0.8 * D) * WALL_THICKNESS * density[row]
+        ln_W = np.log(W)
+        C_V = np.exp(intercept + 0.18255 * ln_W + 0.02297 * ln_W * ln_W)
+        weight[row] = W
+        base_cost[row] = C_V
+        adjusted_cost[row] = material_factor[row] * C_V
+        platform_ladder[row] = coefficient * D**diameter_exponent * L**length_exponent
+
+@_compile
+def _tray_loop(diameter, num_trays, tray_type_factor, tray_material_factor, tray_cost):
+    for row in prange(tray_cost.shape[0]):
+        N = num_trays[row]
+        num_trays_factor = 1.0 if N > 20 else 2.25 / 1.0414**N
+        tray_cost[row] = N * num_trays_factor * tray_type_factor[row] * tray_material_factor[row] * 468 * np.exp(0.1739 * diameter[row])
+
+@_compile
+def _heat_exchanger_loop(area, pressure, a, b, base_cost, pressure_factor, material_factor, total):
+    for row in prange(total.shape[0]):
+        A = area[row]
+        ln_A = np.log(A)
+        C_B = np.exp(11.667 - 0.8709 * ln_A + 0.09005 * ln_A * ln_A)
+        P = pressure[row] / 100
+        F_P = 0.9803 + 0.018 * P + 0.0017 * P * P if pressure[row] > 100 else 1.0
+        F_M = a[row] + (A / 100) ** b[row]
+        base_cost[row] = C_B
+        pressure_factor[row] = F_P
+        material_factor[row] = F_M
+        total[row] = F_P * F_M * C_B
+
+@_compile
+def _compressor_power_loop(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency, power):
+    for row in prange(power.shape[0]):
+        k = specific_heat_ratio[row]
+        P_1 = inlet_pressure[row]
+        power[row] = 0.00436 * (k / (k - 1)) * (inlet_flow[row] * P_1 / efficiency[row]) * ((outlet_pressure[row] / P_1) ** ((k - 1) / k) - 1)
+
+@_compile
+def _compressor_cost_loop(power, drive_factor, material_factor, base_cost, total):
+    for row in prange(total.shape[0]):
+        C_B = np.exp(7.580 + 0.8 * np.log(power[row]))
+        base_cost[row] = C_B
+        total[row] = drive_factor[row] * material_factor[row] * C_B
+
+@_compile
+def _fired_heater_loop(heat_duty, material_factor, base_cost, total):
+    for row in prange(total.shape[0]):
+        C_B = np.exp(0.32325 + 0.766 * np.log(heat_duty[row]))
+        base_cost[row] = C_B
+        total[row] = material_factor[row] * C_B
+
+@_compile
+def _cooling_water_loop(Q_cooling, Cp_water, delta_T_cw, m_cw):
+    for row in prange(m_cw.shape[0]):
+        m_cw[row] = Q_cooling[row] / (Cp_water[row] * delta_T_cw[row])
+
+@_compile
+def _natural_gas_loop(Q_heating, delta_H_comb, efficiency, CO2_emission_factor, Q_heater, m_ng, m_CO2):
+    for row in prange(m_ng.shape[0]):
+        heater = Q_heating[row] / efficiency[row]
+        gas = heater / delta_H_comb[row]
+        Q_heater[row] = heater
+        m_ng[row] = gas
+        m_CO2[row] = gas * CO2_emission_factor[row]
+
+def _rows(*arrays):
+    """
+    Broadcast inputs to one flat length without copying (scalars become stride-0 views).
+    Returns the common shape and the flat arrays.
+    """
+    arrays = [np.asarray(array, dtype=float) for array in arrays]
+    shape = np.broadcast_shapes(*(array.shape for array in arrays))
+    return shape, [np.broadcast_to(array, shape).reshape(math.prod(shape)) for array in arrays]
+
+def _outputs(shape, count):
+    return [np.empty(math.prod(shape)) for _ in range(count)]
+
+def _result(array, shape):
+    """
+    An input echoed in the results, copied if it is a read-only broadcast view.
+    """
+    array = array.reshape(shape)
+    return array if array.flags.writeable else array.copy()
+
+def _vessels(equipment_type, diameter, length, material):
+    density = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "density")
+    material_factor = _lookup(MATERIAL_FACTORS, material, {"F_M": 1.0, "density": 490}, "F_M")
+    coefficient, diameter_exponent, length_exponent = PLATFORM_LADDER_COEFFICIENTS[equipment_type]
+    shape, (diameter, length, density, material_factor) = _rows(diameter, length, density, material_factor)
+    weight, base_cost, adjusted_cost, platform_ladder = _outputs(shape, 4)
+    _vessel_loop(
+        diameter, length, density, material_factor, VESSEL_COST_INTERCEPTS[equipment_type],
+        coefficient, diameter_exponent, length_exponent, weight, base_cost, adjusted_cost, platform_ladder,
+    )
+    return shape, {
+        "D": _result(diameter, shape),
+        "L": _result(length, shape),
+        "W": weight.reshape(shape),
+        "C_V": base_cost.reshape(shape),
+        "C_PV": adjusted_cost.reshape(shape),
+        "C_PL": platform_ladder.reshape(shape),
+    }
+
+@instrument("jit_kernels.cost_reactors")
+def cost_reactors(columns):
+    """
+    cost_reactors() with the vessel and platform/ladder correlations fused into one row loop.
+    """
+    if "diameter" in columns:
+        diameter, length = columns["diameter"], columns["length"]
+    else:
+        diameter, length = reactor_dimensions(columns["space_time"], columns["volumetric_flow_rate"])
+    _, results = _vessels("reactor", diameter, length, columns.get("material", DEFAULT_MATERIALS["reactor"]))
+    results["total"] = results["C_PV"] + results["C_PL"]
+    return results
+
+@instrument("jit_kernels.cost_distillation_columns")
+def cost_distillation_columns(columns):
+    """
+    cost_distillation_columns() with the vessel, platform/ladder and tray correlations in row loops.
+    """
+    shape, results = _vessels("distillation column", columns["diameter"], columns["length"], columns.get("material", DEFAULT_MATERIALS["distillation column"]))
+    tray_type_factor = _lookup(TRAY_TYPE_FACTORS, columns.get("tray_type", "sieve"), 1.0)
+    tray_material_factor = _lookup(TRAY_MATERIAL_FACTORS, columns.get("tray_material", "carbon steel"), 1.0)
+    shape, (diameter, num_trays, tray_type_factor, tray_material_factor) = _rows(
+        columns["diameter"], columns["num_trays"], tray_type_factor, tray_material_factor
+    )
+    (trays,) = _outputs(shape, 1)
+    _tray_loop(diameter, num_trays, tray_type_factor, tray_material_factor, trays)
+    results["C_T"] = trays.reshape(shape)
+    results["total"] = results["C_PV"] + results["C_PL"] + results["C_T"]
+    return results
+
+@instrument("jit_kernels.cost_heat_exchangers")
+def cost_heat_exchangers(columns):
+    """
+    cost_heat_exchangers() with C_B, F_P and F_M fused into one row loop.
+    """
+    if "area" in columns:
+        area = np.asarray(columns["area"], dtype=float)
+    else:
+        area = np.asarray(columns["heat_duty"], dtype=float) / np.asarray(columns["flux_rate"], dtype=float)
+    material = columns.get("material", DEFAULT_MATERIALS["heat exchanger"])
+    a = _lookup(HEAT_EXCHANGER_MATERIAL_FACTORS, material, HEAT_EXCHANGER_MATERIAL_FACTORS["carbon steel/carbon steel"], "a")
+    b = _lookup(HEAT_EXCHANGER_MATERIAL_FACTORS, material, HEAT_EXCHANGER_MATERIAL_FACTORS["carbon steel/carbon steel"], "b")
+    shape, (area, pressure, a, b) = _rows(area, columns.get("pressure", 0.0), a, b)
+    base_cost, pressure_factor, material_factor, total = _outputs(shape, 4)
+    _heat_exchanger_loop(area, pressure, a, b, base_cost, pressure_factor, material_factor, total)
+    return {
+        "A": _result(area, shape),
+        "C_B": base_cost.reshape(shape),
+        "F_P": pressure_factor.reshape(shape),
+        # Assume F_L = 1 for tube lengths < 20 ft, as the CLI does for all lengths
+        "F_L": np.ones(shape),
+        "F_M": material_factor.reshape(shape),
+        "total": total.reshape(shape),
+    }
+
+@instrument("jit_kernels.cost_compressors")
+def cost_compressors(columns):
+    """
+    cost_compressors() with the power law and the cost correlation in row loops.
+    """
+    if "power" in columns:
+        power = np.asarray(columns["power"], dtype=float)
+    else:
+        shape, inputs = _rows(
+            columns["inlet_flow"], columns["inlet_pressure"], columns["outlet_pressure"],
+            columns["specific_heat_ratio"], columns["efficiency"],
+        )
+        (power,) = _outputs(shape, 1)
+        _compressor_power_loop(*inputs, power)
+        power = power.reshape(shape)
+    drive_factor = _lookup(COMPRESSOR_DRIVE_FACTORS, columns.get("drive_type", "electric"), 1.0)
+    material_factor = _lookup(COMPRESSOR_MATERIAL_FACTORS, columns.get("material", DEFAULT_MATERIALS["compressor"]), 1.0)
+    shape, (power, drive_factor, material_factor) = _rows(power, drive_factor, material_factor)
+    base_cost, total = _outputs(shape, 2)
+    _compressor_cost_loop(power, drive_factor, material_factor, base_cost, total)
+    return {
+        "P_c": _result(power, shape),
+        "C_B": base_cost.reshape(shape),
+        "F_D": _result(drive_factor, shape),
+        "F_M": _result(material_factor, shape),
+        "total": total.reshape(shape),
+    }
+
+@instrument("jit_kernels.cost_fired_heaters")
+def cost_fired_heaters(columns):
+    """
+    cost_fired_heaters() in one row loop.
+    """
+    material_factor = _lookup(FIRED_HEATER_MATERIAL_FACTORS, columns.get("material", DEFAULT_MATERIALS["fired heater"]), 1.0)
+    shape, (heat_duty, material_factor) = _rows(columns["heat_duty"], material_factor)
+    base_cost, total = _outputs(shape, 2)
+    _fired_heater_loop(heat_duty, material_factor, base_cost, total)
+    return {
+        "Q": _result(heat_duty, shape),
+        "C_B": base_cost.reshape(shape),
+        "F_M": _result(material_factor, shape),
+        "total": total.reshape(shape),
+    }
+
+@instrument("jit_kernels.utilities_batch")
+def jit_utilities_batch(columns):
+    """
+    utilities_batch() with each utility's formulas fused into one row loop.
+    """
+    results = {}
+    if "Q_cooling" in columns:
+        shape, inputs = _rows(columns["Q_cooling"], columns.get("Cp_water", batch_utilities.Cp_water), columns["delta_T_cw"])
+        (m_cw,) = _outputs(shape, 1)
+        _cooling_water_loop(*inputs, m_cw)
+        results["m_cw"] = m_cw.reshape(shape)
+    if "Q_heating" in columns:
+        shape, inputs = _rows(
+            columns["Q_heating"],
+            columns.get("delta_H_comb", batch_utilities.delta_H_comb),
+            columns.get("efficiency", batch_utilities.efficiency),
+            columns.get("CO2_emission_factor", batch_utilities.CO2_emission_factor),
+        )
+        Q_heater, m_ng, m_CO2 = _outputs(shape, 3)
+        _natural_gas_loop(*inputs, Q_heater, m_ng, m_CO2)
+        results["Q_heater"] = Q_heater.reshape(shape)
+        results["m_ng"] = m_ng.reshape(shape)
+        results["m_CO2"] = m_CO2.reshape(shape)
+    return results
+
+JIT_COSTERS = {
+    "reactor": cost_reactors,
+    "distillation column": cost_distillation_columns,
+    "heat exchanger": cost_heat_exchangers,
+    "compressor": cost_compressors,
+    "fired heater": cost_fired_heaters,
+}
+
+def cost_batch(equipment_type, columns):
+    """
+    batch_costing.cost_batch() on the compiled kernels when numba is available, else on the NumPy kernels.
+    """
+    if not HAVE_NUMBA:
+        return batch_costing.cost_batch(equipment_type, columns)
+    if equipment_type not in JIT_COSTERS:
+        raise ValueError(f"Unknown equipment type: {equipment_type}")
+    with np.errstate(all="ignore"):
+        return JIT_COSTERS[equipment_type](columns)
+
+def utilities_batch(columns):
+    """
+    batch_utilities.utilities_batch() on the compiled kernels when numba is available.
+    """
+    if not HAVE_NUMBA:
+        return batch_utilities.utilities_batch(columns)
+    return jit_utilities_batch(columns)
+
+def sweep(equipment_type, base, name, values):
+    """
+    batch_costing.sweep() on the fastest available kernels.
+    """
+    return batch_costing.sweep(equipment_type, base, name, values, coster=cost_batch)
+
+def monte_carlo(equipment_type, base, spreads, samples, seed=0):
+    """
+    batch_costing.monte_carlo() on the fastest available kernels.
+    """
+    return batch_costing.monte_carlo(equipment_type, base, spreads, samples, seed, coster=cost_batch)
@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+# Example single-unit payloads, one per endpoint
+PAYLOADS = {
+    "/cost/reactor": lambda: {"diameter": random.uniform(3, 12), "length": random.uniform(10, 40), "material": "carbon steel"},
+    "/cost/distillation-column": lambda: {
+        "diameter": random.uniform(3, 12), "length": random.uniform(30, 150), "num_trays": random.randint(10, 60),
+        "material": "stainless steel 304", "tray_type": "sieve", "tray_material": "carbon steel",
+    },
+    "/cost/heat-exchanger": lambda: {"heat_duty": random.uniform(1e6, 5e7), "flux_rate": 5000, "pressure": 150, "material": "carbon steel/stainless steel"},
+    "/cost/compressor": lambda: {
+        "inlet_flow": random.uniform(500, 20000), "inlet_pressure": 20, "outlet_pressure": 80,
+        "specific_heat_ratio": 1.4, "efficiency": 0.78, "drive_type": "electric", "material": "carbon steel",
+    },
+    "/cost/fired-heater": lambda: {"heat_duty": random.uniform(1e7, 1e8), "material": "carbon steel"},
+    "/utilities": lambda: {"Q_cooling": random.uniform(1e6, 1e7), "delta_T_cw": 16.0, "Q_heating": random.uniform(1e6, 1e7)},
+}
+
+async def request(reader, writer, host, path, payload):
+    """
+    Send one POST on an open keep-alive connection and return the decoded response.
+    """
+    body = json.dumps(payload).encode()
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def client(host, port, path, deadline, latencies, errors):
+    """
+    Send requests back to back on one connection until the deadline.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, host, path, PAYLOADS[path]())
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def run(host, port, path, concurrency, duration):
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, path, deadline, latencies, errors) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return latencies, errors, elapsed
+
+def report(path, concurrency, latencies, errors, elapsed):
+    if not latencies:
+        print(f"{path}: no requests completed")
+        return
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"\n--- {path} ({concurrency} concurrent clients) ---")
+    print(f"Requests: {len(latencies)} in {elapsed:.2f} s, errors: {len(errors)}")
+    print(f"Throughput: {len(latencies) / elapsed:,.0f} requests/s")
+    print(f"Latency p50: {quantiles[49] * 1000:.2f} ms, p90: {quantiles[89] * 1000:.2f} ms, p99: {quantiles[98] * 1000:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate load against costing_service.py and report latency and throughput.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--path", choices=sorted(PAYLOADS), action="append", help="Endpoint(s) to load; default all")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+    args = parser.parse_args()
+
+    for path in args.path or sorted(PAYLOADS):
+        latencies, errors, elapsed = asyncio.run(run(args.host, args.port, path, args.concurrency, args.duration))
+        report(path, args.concurrency, latencies, errors, elapsed)
+
+if __name__ == "__main__":
+    main()
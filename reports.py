@@ -0,0 +1,352 @@
+import argparse
+import csv
+import hashlib
+import html
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch_costing import CORRELATION_VERSION, VALIDITY_RANGES
+from capital import capital_rollup
+from instrumentation import count_rows, instrument, stage
+from result_cache import cached_cost_in_range
+from validation import checked_columns, unit_status
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl is optional; XLSX output is unavailable without it
+    openpyxl = None
+
+# Bump whenever the layout of a data sheet changes so every unit is rendered again
+REPORT_VERSION = "1"
+
+FORMATS = ("html", "csv", "xlsx")
+DEFAULT_FORMATS = FORMATS if openpyxl is not None else ("html", "csv")
+
+# Units rendered per worker task
+CHUNK_SIZE = 250
+
+# Data sheet rows: result column -> (label, format)
+LABELS = {
+    "D": ("Diameter (ft)", "{:,.2f}"),
+    "L": ("Length (ft)", "{:,.2f}"),
+    "W": ("Vessel weight W (lbs)", "{:,.2f}"),
+    "C_V": ("Base vessel cost C_V ($)", "{:,.2f}"),
+    "C_PV": ("Adjusted vessel cost C_PV = F_M * C_V ($)", "{:,.2f}"),
+    "C_PL": ("Platform and ladder cost C_PL ($)", "{:,.2f}"),
+    "C_T": ("Tray cost C_T ($)", "{:,.2f}"),
+    "A": ("Heat exchange area A (ft²)", "{:,.2f}"),
+    "P_c": ("Power consumption P_c (hp)", "{:,.2f}"),
+    "Q": ("Heat duty Q (Btu/hr)", "{:,.0f}"),
+    "C_B": ("Base cost C_B ($)", "{:,.2f}"),
+    "F_P": ("Pressure correction factor F_P", "{:.2f}"),
+    "F_L": ("Tube length correction factor F_L", "{:.2f}"),
+    "F_D": ("Drive type factor F_D", "{:.2f}"),
+    "F_M": ("Material factor F_M", "{:.2f}"),
+    "trains": ("Parallel trains", "{:.0f}"),
+    "total": ("Total cost ($)", "{:,.2f}"),
+}
+
+SUMMARY_COLUMNS = ["tag", "plant_area", "equipment_type", "size", "size_variable", "total", "C_BM", "status"]
+
+def _plain(value):
+    """
+    A JSON-safe Python value; NaN and infinities become None.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        return None
+    return value
+
+@instrument("reports.unit_records", rows=lambda equipment, cache=None: sum(count_rows(columns) for columns in equipment.values()))
+def unit_records(equipment, cache=None):
+    """
+    Cost an equipment list and flatten the results into one record per unit.
+    equipment maps an equipment type to its input columns, optionally with "tag" and "plant_area".
+    Units without a tag are named after their type and position. Costs come from the result cache
+    (the default cache unless one is given), so re-running an unchanged list is a lookup.
+    """
+    records = []
+    seen = set()
+    for equipment_type, columns in equipment.items():
+        columns = dict(columns)
+        rows = count_rows(columns)
+        tags = np.broadcast_to(columns.pop("tag", ""), (rows,))
+        areas = np.broadcast_to(columns.pop("plant_area", "plant"), (rows,))
+        results = cached_cost_in_range(equipment_type, columns, cache)
+        inputs = {name: np.broadcast_to(values, (rows,)) for name, values in columns.items()}
+        breakdown = {name: np.broadcast_to(results[name], (rows,)) for name in LABELS if name in results}
+        status = {name: np.broadcast_to(results[name], (rows,)) for name in ("reason", "extrapolated", "trains", "range_flags")}
+        for row in range(rows):
+            tag = base = str(tags[row]) or f"{equipment_type.replace(' ', '-')}-{row + 1}"
+            # Every unit needs its own data sheet file, so repeated tags get a suffix
+            copy = 1
+            while file_stem(tag) in seen:
+                copy += 1
+                tag = f"{base} ({copy})"
+            seen.add(file_stem(tag))
+            records.append({
+                "tag": tag,
+                "plant_area": str(areas[row]),
+                "equipment_type": equipment_type,
+                "inputs": {name: _plain(values[row]) for name, values in inputs.items()},
+                "results": {name: _plain(values[row]) for name, values in breakdown.items()},
+                "status": unit_status(
+                    int(status["reason"][row]),
+                    bool(status["extrapolated"][row]),
+                    status["trains"][row],
+                    equipment_type,
+                    int(status["range_flags"][row]),
+                ),
+            })
+    return records
+
+def record_hash(record):
+    """
+    Content hash of a unit's inputs, results and the versions that shape its data sheet.
+    """
+    payload = json.dumps([REPORT_VERSION, CORRELATION_VERSION, record], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def file_stem(tag):
+    """
+    A file name for a unit's data sheets.
+    """
+    return re.sub(r"[^A-Za-z0-9._-]", "_", tag)
+
+def _format(name, value):
+    if value is None:
+        return "n/a"
+    return LABELS[name][1].format(value)
+
+def render_unit_html(record):
+    """
+    Render one unit's data sheet as an HTML page.
+    """
+    title = html.escape(f"{record['tag']} ({record['equipment_type']})")
+    lines = [
+        "<!DOCTYPE html>",
+        f"<html><head><meta charset=\"utf-8\"><title>{title}</title></head><body>",
+        f"<h1>{title}</h1>",
+        f"<p>Plant area: {html.escape(record['plant_area'])}</p>",
+        "<h2>Inputs</h2>",
+        "<table>",
+    ]
+    for name, value in record["inputs"].items():
+        lines.append(f"<tr><th>{html.escape(name)}</th><td>{html.escape(str(value))}</td></tr>")
+    lines += ["</table>", "<h2>Cost breakdown</h2>"]
+    if (record["results"].get("trains") or 1) > 1:
+        lines.append("<p>Breakdown values are per train; the total covers all trains.</p>")
+    lines.append("<table>")
+    for name, value in record["results"].items():
+        lines.append(f"<tr><th>{html.escape(LABELS[name][0])}</th><td>{_format(name, value)}</td></tr>")
+    lines += ["</table>", f"<p>Status: {html.escape(record['status'])}</p>", "</body></html>", ""]
+    return "\n".join(lines)
+
+def render_unit_csv(record):
+    """
+    Render one unit's data sheet as CSV rows of (section, item, value).
+    """
+    rows = [("unit", "tag", record["tag"]), ("unit", "equipment_type", record["equipment_type"]), ("unit", "plant_area", record["plant_area"])]
+    rows += [("input", name, "" if value is None else value) for name, value in record["inputs"].items()]
+    rows += [("result", name, "" if value is None else value) for name, value in record["results"].items()]
+    rows.append(("unit", "status", record["status"]))
+    return rows
+
+def _write_atomic(path, write, newline=None):
+    """
+    Write a file through a temporary name so a crash never leaves a half-written sheet behind.
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8", newline=newline) as file:
+        write(file)
+    os.replace(temporary, path)
+
+def _render_units(directory, records, formats):
+    """
+    Render a chunk of data sheets straight to disk; runs in a worker process.
+    """
+    for record in records:
+        stem = os.path.join(directory, "units", file_stem(record["tag"]))
+        if "html" in formats:
+            _write_atomic(stem + ".html", lambda file: file.write(render_unit_html(record)))
+        if "csv" in formats:
+            _write_atomic(stem + ".csv", lambda file: csv.writer(file).writerows(render_unit_csv(record)), newline="")
+    return len(records)
+
+def unit_files(tag, formats):
+    """
+    Data sheet file names of one unit, relative to the package directory.
+    """
+    return [f"units/{file_stem(tag)}.{extension}" for extension in ("html", "csv") if extension in formats]
+
+def load_manifest(directory):
+    path = os.path.join(directory, "manifest.json")
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as file:
+        return json.load(file).get("units", {})
+
+def _summary_rows(records, bare_module_costs):
+    for record, bare_module_cost in zip(records, bare_module_costs):
+        size_column = VALIDITY_RANGES[record["equipment_type"]][0]
+        yield [
+            record["tag"],
+            record["plant_area"],
+            record["equipment_type"],
+            record["results"].get(size_column),
+            size_column,
+            record["results"].get("total"),
+            _plain(bare_module_cost),
+            record["status"],
+        ]
+
+@instrument("reports.write_summary", rows="records")
+def write_summary(directory, records, formats=DEFAULT_FORMATS):
+    """
+    Stream the plant summary (one row per unit, then the capital roll-up) to disk in each format.
+    """
+    totals = np.array([np.nan if record["results"].get("total") is None else record["results"]["total"] for record in records])
+    costed = np.isfinite(totals)
+    bare_module_costs = np.full(len(records), np.nan)
+    equipment_types = np.array([record["equipment_type"] for record in records], dtype=str)
+    areas = np.array([record["plant_area"] for record in records], dtype=str)
+    rollup = capital_rollup(equipment_types[costed], totals[costed], areas[costed])
+    bare_module_costs[costed] = rollup["C_BM"]
+    plant = rollup["plant"]
+
+    if "csv" in formats:
+        def write_csv(file):
+            writer = csv.writer(file)
+            writer.writerow(SUMMARY_COLUMNS)
+            for row in _summary_rows(records, bare_module_costs):
+                writer.writerow(["" if value is None else value for value in row])
+        _write_atomic(os.path.join(directory, "summary.csv"), write_csv, newline="")
+        _write_atomic(os.path.join(directory, "plant_totals.csv"), lambda file: csv.writer(file).writerows([("item", "value")] + list(plant.items())), newline="")
+
+    if "html" in formats:
+        def write_html(file):
+            file.write("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Plant summary</title></head><body>\n")
+            file.write("<h1>Plant summary</h1>\n<table>\n<tr>" + "".join(f"<th>{name}</th>" for name in SUMMARY_COLUMNS) + "</tr>\n")
+            for row in _summary_rows(records, bare_module_costs):
+                cells = [html.escape("" if value is None else f"{value:,.2f}" if isinstance(value, float) else str(value)) for value in row]
+                cells[0] = f"<a href=\"units/{file_stem(row[0])}.html\">{cells[0]}</a>"
+                file.write("<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>\n")
+            file.write("</table>\n<h2>Capital</h2>\n<table>\n")
+            for name, value in plant.items():
+                file.write(f"<tr><th>{name}</th><td>${value:,.2f}</td></tr>\n")
+            file.write("</table>\n</body></html>\n")
+        _write_atomic(os.path.join(directory, "summary.html"), write_html)
+
+    if "xlsx" in formats:
+        if openpyxl is None:
+            raise ImportError("XLSX output requires openpyxl")
+        # Write-only workbooks stream rows to disk instead of holding every cell in memory
+        workbook = openpyxl.Workbook(write_only=True)
+        units = workbook.create_sheet("Units")
+        units.append(SUMMARY_COLUMNS)
+        for row in _summary_rows(records, bare_module_costs):
+            units.append(row)
+        totals_sheet = workbook.create_sheet("Plant")
+        totals_sheet.append(["item", "value"])
+        for name, value in plant.items():
+            totals_sheet.append([name, value])
+        temporary = os.path.join(directory, "summary.xlsx.tmp")
+        workbook.save(temporary)
+        os.replace(temporary, os.path.join(directory, "summary.xlsx"))
+    return rollup
+
+@instrument("reports.build_package", rows="records")
+def build_package(directory, records, formats=DEFAULT_FORMATS, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Render the data sheets and plant summary of an estimate revision into directory.
+    Units whose content hash matches the previous revision's manifest are not rendered again,
+    and sheets of units no longer in the estimate are removed.
+    Returns counts of units rendered, skipped and removed.
+    """
+    if "xlsx" in formats and openpyxl is None:
+        raise ImportError("XLSX output requires openpyxl")
+    os.makedirs(os.path.join(directory, "units"), exist_ok=True)
+    previous = load_manifest(directory)
+    manifest = {}
+    pending = []
+    for record in records:
+        files = unit_files(record["tag"], formats)
+        entry = {"hash": record_hash(record), "files": files}
+        manifest[record["tag"]] = entry
+        unchanged = previous.get(record["tag"]) == entry
+        if not (unchanged and all(os.path.exists(os.path.join(directory, name)) for name in files)):
+            pending.append(record)
+
+    removed = 0
+    for tag, entry in previous.items():
+        stale = set(entry["files"]) - set(manifest.get(tag, {}).get("files", []))
+        for name in stale:
+            path = os.path.join(directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        removed += tag not in manifest
+
+    with stage("reports.render_units", len(pending)):
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        if len(chunks) > 1 and workers != 1:
+            with ProcessPoolExecutor(workers) as executor:
+                for future in [executor.submit(_render_units, directory, chunk, formats) for chunk in chunks]:
+                    future.result()
+        else:
+            for chunk in chunks:
+                _render_units(directory, chunk, formats)
+
+    write_summary(directory, records, formats)
+    # Written last, so an interrupted run renders the remaining units again next time
+    _write_atomic(os.path.join(directory, "manifest.json"), lambda file: json.dump({"version": REPORT_VERSION, "units": manifest}, file, indent=1))
+    return {"units": len(records), "rendered": len(pending), "skipped": len(records) - len(pending), "removed": removed}
+
+def read_equipment_csv(path):
+    """
+    Read an equipment list CSV (one unit per row, with an equipment_type column) into columns per type.
+    Each type keeps only its own input columns (see validation.checked_columns), tag and plant_area,
+    and drops columns left blank for all of its units. Columns that are not all numbers are kept as text.
+    """
+    rows = {}
+    with open(path, newline="") as file:
+        for row in csv.DictReader(file):
+            equipment_type = row.pop("equipment_type").strip().lower()
+            rows.setdefault(equipment_type, []).append(row)
+    equipment = {}
+    for equipment_type, group in rows.items():
+        if equipment_type not in VALIDITY_RANGES:
+            raise ValueError(f"Unknown equipment type: {equipment_type}")
+        columns = {}
+        for name in group[0]:
+            if name not in ("tag", "plant_area") + checked_columns(equipment_type):
+                continue
+            values = [(row[name] or "").strip() for row in group]
+            if not any(values):
+                continue
+            try:
+                if name in ("tag", "plant_area"):
+                    raise ValueError
+                columns[name] = np.array([float(value) if value else np.nan for value in values])
+            except ValueError:
+                columns[name] = np.array(values)
+        equipment[equipment_type] = columns
+    return equipment
+
+def main():
+    parser = argparse.ArgumentParser(description="Render data sheets and a plant summary for an equipment list.")
+    parser.add_argument("equipment", help="equipment list CSV")
+    parser.add_argument("directory", help="output directory; unchanged units from a previous run are skipped")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="comma-separated subset of html,csv,xlsx")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    records = unit_records(read_equipment_csv(args.equipment))
+    counts = build_package(args.directory, records, args.formats.split(","), args.workers)
+    print(f"{counts['units']} units: {counts['rendered']} rendered, {counts['skipped']} unchanged, {counts['removed']} removed")
+
+if __name__ == "__main__":
+    main()
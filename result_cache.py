@@ -0,0 +1,204 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+
+from batch_costing import CORRELATION_VERSION, cost_batch, factor_tables
+from batch_utilities import UTILITY_CONSTANTS, utilities_batch
+from extrapolation import ENVELOPES, SCALING_EXPONENT, SPLIT_COLUMNS, cost_in_range
+from instrumentation import stage
+from jit_kernels import monte_carlo, sweep
+from sqlite_store import SQLiteStore, pack_arrays, unpack_arrays
+
+# Where results are kept and how much disk they may use
+DEFAULT_CACHE_PATH = os.environ.get(
+    "COSTING_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "chemical-engguy", "results.sqlite"),
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("COSTING_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+def table_fingerprint(tables):
+    """
+    Hash the factor tables and correlation version a result depends on.
+    """
+    header = json.dumps({"version": CORRELATION_VERSION, "tables": tables}, sort_keys=True, default=list)
+    return hashlib.sha256(header.encode()).hexdigest()
+
+def input_key(kernel, columns, fingerprint, params=None):
+    """
+    Hash the kernel name, its input columns, its parameters and the table fingerprint into a cache key.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"kernel": kernel, "fingerprint": fingerprint, "params": params}, sort_keys=True).encode())
+    for name in sorted(columns):
+        array = np.asarray(columns[name])
+        if array.dtype.kind in "OSU":
+            array = np.char.lower(array.astype(str))
+        array = np.ascontiguousarray(array)
+        digest.update(f"{name}:{array.dtype.str}:{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+class ResultCache(SQLiteStore):
+    """
+    Persistent cache of batch results in SQLite, evicted least-recently-used beyond max_bytes.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " kernel TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " value BLOB NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+
+    def get(self, key):
+        """
+        Return the cached results for a key, or None.
+        """
+        with stage("result_cache.get"):
+            connection = self._connection()
+            row = connection.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key))
+            return unpack_arrays(row[0])
+
+    def put(self, key, kernel, fingerprint, results):
+        """
+        Store results under a key, then evict the least recently used entries over max_bytes.
+        """
+        with stage("result_cache.put"):
+            blob = pack_arrays(results)
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO results (key, kernel, fingerprint, size, last_used, value) VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, kernel, fingerprint, len(blob), time.time(), blob),
+                )
+                self._evict(connection)
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    def _evict(self, connection):
+        total = connection.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in connection.execute("SELECT key, size FROM results ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        connection.executemany("DELETE FROM results WHERE key = ?", stale)
+
+    def get_or_compute(self, kernel, columns, tables, compute, params=None):
+        """
+        Return cached results for these inputs, computing and storing them on a miss.
+        """
+        fingerprint = table_fingerprint(tables)
+        key = input_key(kernel, columns, fingerprint, params)
+        results = self.get(key)
+        if results is None:
+            results = compute()
+            self.put(key, kernel, fingerprint, results)
+        return results
+
+    def purge_stale(self, kernel, tables):
+        """
+        Delete a kernel's entries computed with factor tables other than the given ones.
+        """
+        connection = self._connection()
+        cursor = connection.execute(
+            "DELETE FROM results WHERE kernel = ? AND fingerprint != ?", (kernel, table_fingerprint(tables))
+        )
+        return cursor.rowcount
+
+    def clear(self):
+        """
+        Delete every cached result.
+        """
+        self._connection().execute("DELETE FROM results")
+
+    def stats(self):
+        """
+        Return the number of entries and bytes used.
+        """
+        entries, size = self._connection().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes}
+
+_default_cache = None
+
+def default_cache():
+    """
+    Return the process-wide cache at DEFAULT_CACHE_PATH.
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+def cached_cost_batch(equipment_type, columns, cache=None):
+    """
+    cost_batch() through the persistent cache.
+    """
+    cache = cache or default_cache()
+    return cache.get_or_compute(
+        equipment_type, columns, factor_tables(equipment_type), lambda: cost_batch(equipment_type, columns)
+    )
+
+def cached_cost_in_range(equipment_type, columns, cache=None):
+    """
+    extrapolation.cost_in_range() through the persistent cache, as used for whole equipment lists.
+    """
+    cache = cache or default_cache()
+    tables = dict(
+        factor_tables(equipment_type),
+        ENVELOPES=ENVELOPES[equipment_type],
+        SPLIT_COLUMNS=SPLIT_COLUMNS.get(equipment_type),
+        SCALING_EXPONENT=SCALING_EXPONENT,
+    )
+    return cache.get_or_compute(
+        f"in range/{equipment_type}", columns, tables, lambda: cost_in_range(equipment_type, columns)
+    )
+
+def cached_utilities_batch(columns, cache=None):
+    """
+    utilities_batch() through the persistent cache.
+    """
+    cache = cache or default_cache()
+    return cache.get_or_compute("utilities", columns, UTILITY_CONSTANTS, lambda: utilities_batch(columns))
+
+def cached_sweep(equipment_type, base, name, values, cache=None):
+    """
+    sweep() through the persistent cache.
+    """
+    cache = cache or default_cache()
+    columns = dict(base, **{name: values})
+    return cache.get_or_compute(
+        f"sweep/{equipment_type}", columns, factor_tables(equipment_type),
+        lambda: sweep(equipment_type, base, name, values), params={"name": name},
+    )
+
+def cached_monte_carlo(equipment_type, base, spreads, samples, seed=0, cache=None):
+    """
+    monte_carlo() through the persistent cache; the seed is part of the key.
+    """
+    cache = cache or default_cache()
+    return cache.get_or_compute(
+        f"monte carlo/{equipment_type}", base, factor_tables(equipment_type),
+        lambda: monte_carlo(equipment_type, base, spreads, samples, seed),
+        params={"spreads": spreads, "samples": samples, "seed": seed},
+    )
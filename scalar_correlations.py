@@ -0,0 +1,55 @@
+import math
+
+def calculate_heat_exchanger_base_cost(area):
+    """
+    Calculate the base cost of a shell-and-tube heat exchanger.
+    Equation: C_B = exp(11.667 - 0.8709 * ln(A) + 0.09005 * (ln(A))^2)
+    """
+    ln_area = math.log(area)
+    base_cost = math.exp(11.667 - 0.8709 * ln_area + 0.09005 * (ln_area**2))
+    return base_cost
+
+def calculate_pressure_factor(pressure):
+    """
+    Calculate the pressure correction factor of a heat exchanger.
+    Equation: F_P = 0.9803 + 0.018 * (P/100) + 0.0017 * (P/100)^2  (for P > 100 psig)
+    """
+    if pressure > 100:
+        pressure_factor = 0.9803 + 0.018 * (pressure / 100) + 0.0017 * (pressure / 100)**2
+    else:
+        pressure_factor = 1.0
+    return pressure_factor
+
+def calculate_heat_exchanger_material_factor(area, material, material_factors):
+    """
+    Calculate the material correction factor of a heat exchanger from a table of (a, b) per material.
+    A material not in the table is costed as carbon steel/carbon steel.
+    Equation: F_M = a + (A/100)^b
+    """
+    material_data = material_factors.get(material, material_factors["carbon steel/carbon steel"])
+    material_factor = material_data["a"] + (area / 100) ** material_data["b"]
+    return material_factor
+
+def calculate_compressor_power(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency):
+    """
+    Calculate the power consumption of a compressor in horsepower.
+    Equation: P_c = 0.00436 * (k/(k-1)) * (Q_1 * P_1/η) * ((P_2/P_1)^((k-1)/k) - 1)
+    """
+    power_consumption = 0.00436 * (specific_heat_ratio / (specific_heat_ratio - 1)) * (inlet_flow * inlet_pressure / efficiency) * ((outlet_pressure / inlet_pressure) ** ((specific_heat_ratio - 1) / specific_heat_ratio) - 1)
+    return power_consumption
+
+def calculate_compressor_base_cost(power_consumption):
+    """
+    Calculate the base cost of a compressor.
+    Equation: C_B = exp(7.580 + 0.8 * ln(P_c))
+    """
+    base_cost = math.exp(7.580 + 0.8 * math.log(power_consumption))
+    return base_cost
+
+def calculate_fired_heater_base_cost(heat_duty):
+    """
+    Calculate the base cost of a fired heater.
+    Equation: C_B = exp(0.32325 + 0.766 * ln(Q))
+    """
+    base_cost = math.exp(0.32325 + 0.766 * math.log(heat_duty))
+    return base_cost
@@ -0,0 +1,283 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+from capital import CAPITAL_FACTORS, _subtotals, capital_rollup
+from instrumentation import instrument, stage
+from sqlite_store import SQLiteStore, pack_arrays, unpack_arrays
+
+# Where scenarios are kept
+DEFAULT_STORE_PATH = os.environ.get(
+    "COSTING_SCENARIO_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "chemical-engguy", "scenarios.sqlite"),
+)
+
+# Plant totals kept with each scenario so listing scenarios never reads their units
+PLANT_COLUMNS = ("C_P", "C_TBM", "C_TDC", "C_TPI")
+
+def unit_hash(record):
+    """
+    Content hash of a unit's type, inputs, results and status. The tag and plant area are left out,
+    so identical units are stored once however they are named.
+    """
+    content = {name: record[name] for name in ("equipment_type", "inputs", "results", "status")}
+    return hashlib.blake2b(json.dumps(content, sort_keys=True, default=str).encode(), digest_size=16).digest()
+
+def _unit_hashes(column):
+    """
+    The unit hashes of an "S16" column as bytes; indexing the column would drop trailing zero bytes.
+    """
+    raw = np.ascontiguousarray(column, dtype="S16").tobytes()
+    return [raw[start:start + 16] for start in range(0, len(raw), 16)]
+
+def _positions(keys, tags):
+    """
+    Position of each tag in keys, or -1 where it is absent, in one sorted search.
+    """
+    order = np.argsort(keys, kind="stable")
+    if not len(keys):
+        return np.full(len(tags), -1)
+    index = np.minimum(np.searchsorted(keys[order], tags), len(keys) - 1)
+    return np.where(keys[order][index] == tags, order[index], -1)
+
+class ScenarioStore(SQLiteStore):
+    """
+    Persistent store of costed scenarios (estimate revisions, material options, ...) in SQLite.
+    Each unit's full record is stored once per distinct content; a scenario keeps only columns of
+    tags, unit hashes and costs, so unchanged units cost nothing extra to keep and two scenarios
+    can be compared without reading any others.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        super().__init__(path)
+        connection = self._connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS units (hash BLOB PRIMARY KEY, record BLOB NOT NULL) WITHOUT ROWID")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS scenarios ("
+            " name TEXT PRIMARY KEY,"
+            " description TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " units INTEGER NOT NULL,"
+            " C_P REAL NOT NULL,"
+            " C_TBM REAL NOT NULL,"
+            " C_TDC REAL NOT NULL,"
+            " C_TPI REAL NOT NULL,"
+            " columns BLOB NOT NULL)"
+        )
+        if "C_TDC" not in [row[1] for row in connection.execute("PRAGMA table_info(scenarios)")]:
+            # Stores written before C_TDC was kept hold the total depreciable capital under C_TPI
+            permanent = 1 + CAPITAL_FACTORS["land"] + CAPITAL_FACTORS["royalties"] + CAPITAL_FACTORS["startup"]
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute("ALTER TABLE scenarios ADD COLUMN C_TDC REAL NOT NULL DEFAULT 0")
+                connection.execute("UPDATE scenarios SET C_TDC = C_TPI, C_TPI = C_TPI * ?", (permanent,))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+    @instrument("scenario_store.save", rows="records")
+    def save(self, name, records, description=""):
+        """
+        Store a scenario from unit records (see reports.unit_records), replacing any scenario of the same name.
+        Returns the plant totals.
+        """
+        hashes = [unit_hash(record) for record in records]
+        totals = np.array([np.nan if record["results"].get("total") is None else record["results"]["total"] for record in records], dtype=float)
+        columns = {
+            "tag": np.array([record["tag"] for record in records], dtype=str),
+            "plant_area": np.array([record["plant_area"] for record in records], dtype=str),
+            "equipment_type": np.array([record["equipment_type"] for record in records], dtype=str),
+            "unit": np.array(hashes, dtype="S16"),
+            "total": totals,
+            "C_BM": np.full(len(records), np.nan),
+        }
+        costed = np.isfinite(totals)
+        rollup = capital_rollup(columns["equipment_type"][costed], totals[costed], columns["plant_area"][costed])
+        columns["C_BM"][costed] = rollup["C_BM"]
+        plant = rollup["plant"]
+
+        connection = self._connection()
+        with stage("scenario_store.write", len(records)):
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                known = set()
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    known.update(row[0] for row in connection.execute(f"SELECT hash FROM units WHERE hash IN ({placeholders})", chunk))
+                new_units = {}
+                for unit, record in zip(hashes, records):
+                    if unit not in known and unit not in new_units:
+                        content = {key: value for key, value in record.items() if key not in ("tag", "plant_area")}
+                        new_units[unit] = zlib.compress(json.dumps(content).encode())
+                connection.executemany("INSERT INTO units (hash, record) VALUES (?, ?)", new_units.items())
+                connection.execute(
+                    "INSERT OR REPLACE INTO scenarios (name, description, created, units, C_P, C_TBM, C_TDC, C_TPI, columns) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (name, description, time.time(), len(records), plant["C_P"], plant["C_TBM"], plant["C_TDC"], plant["C_TPI"], pack_arrays(columns, compress=True)),
+                )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return plant
+
+    def scenarios(self):
+        """
+        List stored scenarios with their plant totals, newest first, without reading their units.
+        """
+        rows = self._connection().execute(
+            "SELECT name, description, created, units, C_P, C_TBM, C_TDC, C_TPI FROM scenarios ORDER BY created DESC"
+        )
+        return [dict(zip(("name", "description", "created", "units") + PLANT_COLUMNS, row)) for row in rows]
+
+    def columns(self, name):
+        """
+        Per-unit columns of one scenario: tag, plant_area, equipment_type, unit (content hash), total and C_BM.
+        """
+        row = self._connection().execute("SELECT columns FROM scenarios WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown scenario: {name}")
+        return unpack_arrays(row[0])
+
+    def records(self, name, tags=None):
+        """
+        Full unit records of a scenario, or of the given tags only.
+        """
+        columns = self.columns(name)
+        if tags is not None:
+            selected = np.isin(columns["tag"], np.asarray(tags, dtype=str))
+            columns = {key: values[selected] for key, values in columns.items()}
+        hashes = _unit_hashes(columns["unit"])
+        connection = self._connection()
+        stored = {}
+        for start in range(0, len(hashes), 500):
+            chunk = list(set(hashes[start:start + 500]))
+            placeholders = ",".join("?" * len(chunk))
+            stored.update(connection.execute(f"SELECT hash, record FROM units WHERE hash IN ({placeholders})", chunk))
+        records = []
+        for tag, area, unit in zip(columns["tag"], columns["plant_area"], hashes):
+            record = json.loads(zlib.decompress(stored[unit]))
+            records.append(dict(record, tag=str(tag), plant_area=str(area)))
+        return records
+
+    @instrument("scenario_store.diff")
+    def diff(self, base, other):
+        """
+        Per-unit and per-plant cost deltas from scenario base to scenario other, joined on tag.
+        Units are "added", "removed", "changed" or "unchanged"; missing costs count as zero in the deltas.
+        """
+        base_columns = self.columns(base)
+        other_columns = self.columns(other)
+        tags = np.union1d(base_columns["tag"], other_columns["tag"])
+        in_base = _positions(base_columns["tag"], tags)
+        in_other = _positions(other_columns["tag"], tags)
+
+        def take(columns, positions, name, missing):
+            values = columns[name][np.maximum(positions, 0)] if len(columns[name]) else np.full(len(positions), missing)
+            return np.where(positions >= 0, values, missing)
+
+        base_total = take(base_columns, in_base, "total", np.nan)
+        other_total = take(other_columns, in_other, "total", np.nan)
+        base_bare_module = take(base_columns, in_base, "C_BM", np.nan)
+        other_bare_module = take(other_columns, in_other, "C_BM", np.nan)
+        same = take(base_columns, in_base, "unit", b"") == take(other_columns, in_other, "unit", b"")
+        status = np.select(
+            [in_base < 0, in_other < 0, same],
+            ["added", "removed", "unchanged"],
+            "changed",
+        )
+        equipment_type = np.where(in_other >= 0, take(other_columns, in_other, "equipment_type", ""), take(base_columns, in_base, "equipment_type", ""))
+        plant_area = np.where(in_other >= 0, take(other_columns, in_other, "plant_area", ""), take(base_columns, in_base, "plant_area", ""))
+        delta = np.nan_to_num(other_total) - np.nan_to_num(base_total)
+        delta_bare_module = np.nan_to_num(other_bare_module) - np.nan_to_num(base_bare_module)
+
+        plants = {
+            row[0]: dict(zip(PLANT_COLUMNS, row[1:]))
+            for row in self._connection().execute(
+                "SELECT name, C_P, C_TBM, C_TDC, C_TPI FROM scenarios WHERE name IN (?, ?)", (base, other)
+            )
+        }
+        return {
+            "units": {
+                "tag": tags,
+                "equipment_type": equipment_type,
+                "plant_area": plant_area,
+                "status": status,
+                "base_total": base_total,
+                "other_total": other_total,
+                "delta": delta,
+                "delta_C_BM": delta_bare_module,
+            },
+            "areas": _subtotals(plant_area, delta_bare_module),
+            "plant": {name: plants[other][name] - plants[base][name] for name in PLANT_COLUMNS},
+            "counts": {name: int(np.count_nonzero(status == name)) for name in ("added", "removed", "changed", "unchanged")},
+        }
+
+    def delete(self, name):
+        """
+        Delete a scenario; its units stay until prune() finds them unreferenced.
+        """
+        self._connection().execute("DELETE FROM scenarios WHERE name = ?", (name,))
+
+    def prune(self):
+        """
+        Delete unit records no scenario refers to, reading one scenario at a time.
+        """
+        connection = self._connection()
+        referenced = set()
+        for (name,) in connection.execute("SELECT name FROM scenarios").fetchall():
+            referenced.update(_unit_hashes(self.columns(name)["unit"]))
+        stale = [(unit,) for (unit,) in connection.execute("SELECT hash FROM units") if unit not in referenced]
+        connection.executemany("DELETE FROM units WHERE hash = ?", stale)
+        return len(stale)
+
+    def stats(self):
+        """
+        Return the number of scenarios, distinct units and bytes used.
+        """
+        connection = self._connection()
+        scenarios, scenario_bytes = connection.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(columns)), 0) FROM scenarios").fetchone()
+        units, unit_bytes = connection.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(record)), 0) FROM units").fetchone()
+        return {"scenarios": scenarios, "units": units, "bytes": scenario_bytes + unit_bytes}
+
+def main():
+    from reports import read_equipment_csv, unit_records
+
+    parser = argparse.ArgumentParser(description="Store costed scenarios and compare them.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="scenario store file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    save = commands.add_parser("save", help="cost an equipment list CSV and store it as a scenario")
+    save.add_argument("name")
+    save.add_argument("equipment")
+    save.add_argument("--description", default="")
+    commands.add_parser("list", help="list stored scenarios")
+    compare = commands.add_parser("diff", help="compare two scenarios")
+    compare.add_argument("base")
+    compare.add_argument("other")
+    args = parser.parse_args()
+
+    store = ScenarioStore(args.store)
+    if args.command == "save":
+        plant = store.save(args.name, unit_records(read_equipment_csv(args.equipment)), args.description)
+        print(f"Saved {args.name}: total permanent investment ${plant['C_TPI']:,.2f}")
+    elif args.command == "list":
+        for scenario in store.scenarios():
+            created = time.strftime("%Y-%m-%d %H:%M", time.localtime(scenario["created"]))
+            print(f"{scenario['name']}\t{created}\t{scenario['units']} units\tC_TPI ${scenario['C_TPI']:,.2f}\t{scenario['description']}")
+    else:
+        result = store.diff(args.base, args.other)
+        units = result["units"]
+        for row in np.flatnonzero(units["status"] != "unchanged"):
+            print(f"{units['tag'][row]}\t{units['status'][row]}\t{units['delta'][row]:+,.2f}")
+        print(", ".join(f"{count} {name}" for name, count in result["counts"].items()))
+        for name, value in result["plant"].items():
+            print(f"Δ{name}: ${value:+,.2f}")
+
+if __name__ == "__main__":
+    main()
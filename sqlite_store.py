@@ -0,0 +1,44 @@
+import io
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+def pack_arrays(arrays, compress=False):
+    """
+    Serialize a dict of arrays to bytes, optionally zip-compressed.
+    """
+    buffer = io.BytesIO()
+    save = np.savez_compressed if compress else np.savez
+    save(buffer, **{name: np.asarray(values) for name, values in arrays.items()})
+    return buffer.getvalue()
+
+def unpack_arrays(blob):
+    """
+    Deserialize a dict of arrays from bytes.
+    """
+    with np.load(io.BytesIO(blob)) as data:
+        return {name: data[name] for name in data.files}
+
+class SQLiteStore:
+    """
+    Base class for the stores kept in an SQLite file (result cache, scenarios).
+    SQLite's write-ahead log lets any number of processes read and write the same file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        # One connection per thread, since sqlite3 connections cannot be shared between threads
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
@@ -1,6 +1,15 @@
 import math
 import streamlit as st
 
+import instrumentation
+from scalar_correlations import (
+    calculate_compressor_base_cost,
+    calculate_compressor_power,
+    calculate_heat_exchanger_base_cost,
+    calculate_heat_exchanger_material_factor,
+    calculate_pressure_factor,
+)
+
 # Constants
 DENSITY_CARBON_STEEL = 490  # lb/ft^3
 WALL_THICKNESS = 0.20833  # 2.5 inches in feet
@@ -222,15 +231,11 @@ def calculate_heat_exchanger_cost():
     tube_length = st.number_input("Enter the tube length (ft): ", min_value=0.0)
 
     # Calculate base cost (C_B)
-    ln_area = math.log(area)
-    base_cost = math.exp(11.667 - 0.8709 * ln_area + 0.09005 * (ln_area**2))
+    base_cost = calculate_heat_exchanger_base_cost(area)
     st.write(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Pressure correction factor (F_P)
-    if pressure > 100:
-        pressure_factor = 0.9803 + 0.018 * (pressure / 100) + 0.0017 * (pressure / 100)**2
-    else:
-        pressure_factor = 1.0
+    pressure_factor = calculate_pressure_factor(pressure)
     st.write(f"Pressure correction factor (F_P): {pressure_factor:.2f}")
 
     # Tube length correction factor (F_L)
@@ -241,8 +246,7 @@ def calculate_heat_exchanger_cost():
     st.write(f"Tube length correction factor (F_L): {tube_length_factor:.2f}")
 
     # Material correction factor (F_M)
-    material_data = HEAT_EXCHANGER_MATERIAL_FACTORS.get(material, {"a": 0.00, "b": 0.09})
-    material_factor = material_data["a"] + (area / 100) ** material_data["b"]
+    material_factor = calculate_heat_exchanger_material_factor(area, material, HEAT_EXCHANGER_MATERIAL_FACTORS)
     st.write(f"Material correction factor (F_M): {material_factor:.2f}")
 
     # Total cost
@@ -265,11 +269,11 @@ def calculate_compressor_cost():
     material = st.selectbox("Enter the material of construction:", list(COMPRESSOR_MATERIAL_FACTORS.keys()))
 
     # Calculate power consumption (P_c)
-    power_consumption = 0.00436 * (specific_heat_ratio / (specific_heat_ratio - 1)) * (inlet_flow * inlet_pressure / efficiency) * ((outlet_pressure / inlet_pressure) ** ((specific_heat_ratio - 1) / specific_heat_ratio) - 1)
+    power_consumption = calculate_compressor_power(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency)
     st.write(f"Power consumption (P_c): {power_consumption:.2f} horsepower")
 
     # Calculate base cost (C_B)
-    base_cost = math.exp(7.580 + 0.8 * math.log(power_consumption))
+    base_cost = calculate_compressor_base_cost(power_consumption)
     st.write(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Drive type factor (F_D)
@@ -294,14 +298,17 @@ def main():
     st.sidebar.title("Navigation")
     choice = st.sidebar.radio("Select the equipment to calculate the cost for:", ["Reactor", "Distillation Column", "Shell-and-Tube Heat Exchanger", "Compressor"])
 
-    if choice == "Reactor":
-        calculate_reactor_cost()
-    elif choice == "Distillation Column":
-        calculate_distillation_column_cost()
-    elif choice == "Shell-and-Tube Heat Exchanger":
-        calculate_heat_exchanger_cost()
-    elif choice == "Compressor":
-        calculate_compressor_cost()
+    # Time each page render when COSTING_METRICS=1
+    with instrumentation.stage(f"render {choice}"):
+        if choice == "Reactor":
+            calculate_reactor_cost()
+        elif choice == "Distillation Column":
+            calculate_distillation_column_cost()
+        elif choice == "Shell-and-Tube Heat Exchanger":
+            calculate_heat_exchanger_cost()
+        elif choice == "Compressor":
+            calculate_compressor_cost()
+    instrumentation.flush()
 
 if __name__ == "__main__":
     main()
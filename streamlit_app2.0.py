@@ -1,6 +1,20 @@
 import math
+import altair as alt
+import pandas as pd
 import streamlit as st
 
+import instrumentation
+from cost_curves import CURVES, curve_window
+from equipment_table import equipment_table_page
+from scalar_correlations import (
+    calculate_compressor_base_cost,
+    calculate_compressor_power,
+    calculate_fired_heater_base_cost,
+    calculate_heat_exchanger_base_cost,
+    calculate_heat_exchanger_material_factor,
+    calculate_pressure_factor,
+)
+
 # Constants
 DENSITY_CARBON_STEEL = 490  # lb/ft^3
 WALL_THICKNESS = 0.20833  # 2.5 inches in feet
@@ -116,6 +130,20 @@ def calculate_tray_cost(diameter, num_trays, tray_type, tray_material):
     tray_cost = num_trays * num_trays_factor * tray_type_factor * tray_material_factor * base_tray_cost
     return tray_cost
 
+def show_cost_curve(equipment_type, material, size, cost, scale=1.0):
+    """
+    Chart the precomputed cost curve around the unit being costed, with the unit marked.
+    """
+    if not (size > 0 and math.isfinite(size)):
+        return
+    size_label, cost_label, _ = CURVES[equipment_type]
+    sizes, costs = curve_window(equipment_type, material, size, scale=scale)
+    x = alt.X("size:Q", title=size_label, scale=alt.Scale(type="log"))
+    y = alt.Y("cost:Q", title=cost_label, scale=alt.Scale(type="log"))
+    curve = alt.Chart(pd.DataFrame({"size": sizes, "cost": costs})).mark_line().encode(x=x, y=y)
+    unit = alt.Chart(pd.DataFrame({"size": [size], "cost": [cost]})).mark_point(size=80, filled=True, color="red").encode(x=x, y=y)
+    st.altair_chart(curve + unit)
+
 def calculate_reactor_cost():
     """
     Calculate the total cost of a reactor.
@@ -162,6 +190,7 @@ def calculate_reactor_cost():
     # Total cost
     total_cost = vessel_cost + platform_ladder_cost
     st.success(f"Total Reactor Cost: ${total_cost:,.2f}")
+    show_cost_curve("reactor", material, weight, vessel_cost)
 
 def calculate_distillation_column_cost():
     """
@@ -204,6 +233,7 @@ def calculate_distillation_column_cost():
     # Total cost
     total_cost = vessel_cost + platform_ladder_cost + tray_cost
     st.success(f"Total Distillation Column Cost: ${total_cost:,.2f}")
+    show_cost_curve("distillation column", material, weight, vessel_cost)
 
 def calculate_heat_exchanger_cost():
     """
@@ -222,15 +252,11 @@ def calculate_heat_exchanger_cost():
     tube_length = st.number_input("Enter the tube length (ft)(any number less than 20): ", min_value=0.0)
 
     # Calculate base cost (C_B)
-    ln_area = math.log(area)
-    base_cost = math.exp(11.667 - 0.8709 * ln_area + 0.09005 * (ln_area**2))
+    base_cost = calculate_heat_exchanger_base_cost(area)
     st.write(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Pressure correction factor (F_P)
-    if pressure > 100:
-        pressure_factor = 0.9803 + 0.018 * (pressure / 100) + 0.0017 * (pressure / 100)**2
-    else:
-        pressure_factor = 1.0
+    pressure_factor = calculate_pressure_factor(pressure)
     st.write(f"Pressure correction factor (F_P): {pressure_factor:.2f}")
 
     # Tube length correction factor (F_L)
@@ -241,13 +267,13 @@ def calculate_heat_exchanger_cost():
     st.write(f"Tube length correction factor (F_L): {tube_length_factor:.2f}")
 
     # Material correction factor (F_M)
-    material_data = HEAT_EXCHANGER_MATERIAL_FACTORS.get(material, {"a": 0.00, "b": 0.09})
-    material_factor = material_data["a"] + (area / 100) ** material_data["b"]
+    material_factor = calculate_heat_exchanger_material_factor(area, material, HEAT_EXCHANGER_MATERIAL_FACTORS)
     st.write(f"Material correction factor (F_M): {material_factor:.2f}")
 
     # Total cost
     total_cost = pressure_factor * material_factor * tube_length_factor * base_cost
     st.success(f"Total Heat Exchanger Cost: ${total_cost:,.2f}")
+    show_cost_curve("heat exchanger", material, area, total_cost, scale=pressure_factor * tube_length_factor)
 
 def calculate_compressor_cost():
     """
@@ -265,11 +291,11 @@ def calculate_compressor_cost():
     material = st.selectbox("Enter the material of construction:", list(COMPRESSOR_MATERIAL_FACTORS.keys()))
 
     # Calculate power consumption (P_c)
-    power_consumption = 0.00436 * (specific_heat_ratio / (specific_heat_ratio - 1)) * (inlet_flow * inlet_pressure / efficiency) * ((outlet_pressure / inlet_pressure) ** ((specific_heat_ratio - 1) / specific_heat_ratio) - 1)
+    power_consumption = calculate_compressor_power(inlet_flow, inlet_pressure, outlet_pressure, specific_heat_ratio, efficiency)
     st.write(f"Power consumption (P_c): {power_consumption:.2f} horsepower")
 
     # Calculate base cost (C_B)
-    base_cost = math.exp(7.580 + 0.8 * math.log(power_consumption))
+    base_cost = calculate_compressor_base_cost(power_consumption)
     st.write(f"Base cost (C_B): ${base_cost:.2f}")
 
     # Drive type factor (F_D)
@@ -288,6 +314,7 @@ def calculate_compressor_cost():
     # Total cost
     total_cost = drive_factor * material_factor * base_cost
     st.success(f"Total Compressor Cost: ${total_cost:,.2f}")
+    show_cost_curve("compressor", material, power_consumption, total_cost, scale=drive_factor)
 def calculate_fired_heater_cost():
     """
     Calculate the total cost of a fired heater.
@@ -308,30 +335,36 @@ def calculate_fired_heater_cost():
 
     # Calculate base cost (C_B)
     if heat_duty > 0:
-        base_cost = math.exp(0.32325 + 0.766 * math.log(heat_duty))
+        base_cost = calculate_fired_heater_base_cost(heat_duty)
         st.write(f"Base cost (C_B): ${base_cost:.2f}")
 
         # Total cost
         total_cost = material_factor * base_cost
         st.success(f"Total Fired Heater Cost: ${total_cost:,.2f}")
+        show_cost_curve("fired heater", material, heat_duty, total_cost)
     else:
         st.error("Heat duty must be greater than 0.")
 def main():
     st.title("Equipment Cost Calculator")
     st.sidebar.title("Navigation")
     choice = st.sidebar.radio("Select the equipment to calculate the cost for:", 
-                              ["Reactor", "Distillation Column", "Shell-and-Tube Heat Exchanger", "Compressor", "Fired Heater"])
-
-    if choice == "Reactor":
-        calculate_reactor_cost()
-    elif choice == "Distillation Column":
-        calculate_distillation_column_cost()
-    elif choice == "Shell-and-Tube Heat Exchanger":
-        calculate_heat_exchanger_cost()
-    elif choice == "Compressor":
-        calculate_compressor_cost()
-    elif choice == "Fired Heater":
-        calculate_fired_heater_cost()
+                              ["Reactor", "Distillation Column", "Shell-and-Tube Heat Exchanger", "Compressor", "Fired Heater", "Equipment Table"])
+
+    # Time each page render when COSTING_METRICS=1
+    with instrumentation.stage(f"render {choice}"):
+        if choice == "Reactor":
+            calculate_reactor_cost()
+        elif choice == "Distillation Column":
+            calculate_distillation_column_cost()
+        elif choice == "Shell-and-Tube Heat Exchanger":
+            calculate_heat_exchanger_cost()
+        elif choice == "Compressor":
+            calculate_compressor_cost()
+        elif choice == "Fired Heater":
+            calculate_fired_heater_cost()
+        elif choice == "Equipment Table":
+            equipment_table_page()
+    instrumentation.flush()
 
 if __name__ == "__main__":
 
@@ -0,0 +1,10 @@
+import pytest
+
+import result_cache
+
+@pytest.fixture(autouse=True)
+def default_cache(tmp_path, monkeypatch):
+    # Keep every test's cached results out of the user's cache
+    cache = result_cache.ResultCache(str(tmp_path / "results.sqlite"))
+    monkeypatch.setattr(result_cache, "_default_cache", cache)
+    return cache
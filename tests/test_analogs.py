@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from analogs import HistoricalCostStore
+from extrapolation import cost_in_range
+
+def test_close_analog_is_scaled_by_six_tenths_rule():
+    store = HistoricalCostStore([{"equipment_type": "compressor", "material": "carbon steel", "size": 1000, "pressure": 0, "cost": 500000}])
+    columns = {"power": np.array([1200.0]), "material": "carbon steel"}
+    results = store.estimate("compressor", columns)
+    assert results["source"].tolist() == ["analog"]
+    assert results["total"][0] == pytest.approx(500000 * 1.2 ** 0.6)
+
+def test_blank_material_defaults_per_equipment_type():
+    store = HistoricalCostStore([
+        {"equipment_type": "heat exchanger", "material": "", "size": 1000, "pressure": 150, "cost": 60000},
+        {"equipment_type": "Reactor", "size": 20000, "pressure": 0, "cost": 90000},
+    ])
+    assert store.records[0]["material"] == "carbon steel/carbon steel"
+    assert store.records[1]["material"] == "carbon steel"
+    results = store.estimate("heat exchanger", {"area": np.array([1000.0]), "pressure": 150.0})
+    assert results["source"].tolist() == ["analog"]
+    assert results["total"][0] == pytest.approx(60000)
+
+def test_units_without_analogs_use_the_correlation():
+    store = HistoricalCostStore([{"equipment_type": "fired heater", "material": "carbon steel", "size": 5e7, "cost": 1e6}])
+    columns = {"heat_duty": np.array([5e8]), "material": "carbon steel"}
+    results = store.estimate("fired heater", columns)
+    assert results["source"].tolist() == ["correlation"]
+    assert results["total"][0] == pytest.approx(cost_in_range("fired heater", columns)["total"][0])
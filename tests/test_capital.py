@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+
+from capital import BARE_MODULE_FACTORS, CAPITAL_FACTORS, capital_rollup
+
+def test_bare_module_costs_and_subtotals():
+    rollup = capital_rollup(["reactor", "compressor", "reactor"], [100.0, 200.0, np.nan], ["100", "200", "100"])
+    np.testing.assert_allclose(rollup["C_BM"][:2], [100.0 * BARE_MODULE_FACTORS["reactor"], 200.0 * BARE_MODULE_FACTORS["compressor"]])
+    assert rollup["area_purchase"] == {"100": 100.0, "200": 200.0}
+    assert rollup["plant"]["C_P"] == 300.0
+
+def test_total_permanent_investment():
+    plant = capital_rollup(["heat exchanger"], [1000.0])["plant"]
+    f = CAPITAL_FACTORS
+    assert plant["C_DPI"] == pytest.approx(plant["C_TBM"] * (1 + f["site"] + f["service_facilities"]))
+    assert plant["C_TDC"] == pytest.approx(plant["C_DPI"] * (1 + f["contingency"] + f["fee"]))
+    assert plant["C_TPI"] == pytest.approx(plant["C_TDC"] * (1 + f["land"] + f["royalties"] + f["startup"]))
+    assert plant["C_DPI"] > plant["C_TBM"]
+
+def test_overrides_merge_into_the_defaults():
+    plant = capital_rollup(["reactor", "compressor"], [100.0, 100.0], factors={"reactor": 1.0}, capital_factors={"site": 0.0, "service_facilities": 0.0})["plant"]
+    assert plant["C_TBM"] == pytest.approx(100.0 + 100.0 * BARE_MODULE_FACTORS["compressor"])
+    assert plant["C_DPI"] == plant["C_TBM"]
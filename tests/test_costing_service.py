@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from costing_service import CostingService
+
+@pytest.fixture
+def service():
+    service = CostingService(workers=1)
+    yield service
+    service.pool.shutdown()
+
+def request(service, path, body, method="POST"):
+    return asyncio.run(service.handle(method, path, body))
+
+def test_single_unit_is_costed(service):
+    status, payload = request(service, "/cost/reactor", {"diameter": 6.0, "length": 20.0})
+    assert status == 200
+    assert payload["total"] > 0
+
+def test_missing_input_is_named(service):
+    status, payload = request(service, "/cost/reactor", {"volumetric_flow_rate": 10.0})
+    assert (status, payload) == (400, {"error": "missing input: space_time"})
+    status, payload = request(service, "/cost/distillation-column/bulk", {"diameter": [8.0], "num_trays": [40]})
+    assert (status, payload) == (400, {"error": "missing input: length"})
+    status, payload = request(service, "/utilities", {"Q_cooling": 8621900.0})
+    assert (status, payload) == (400, {"error": "missing input: delta_T_cw"})
+
+def test_invalid_input_is_named(service):
+    status, payload = request(service, "/cost/reactor", {"diameter": "wide", "length": 20.0})
+    assert (status, payload) == (400, {"error": "invalid input: diameter"})
+    status, payload = request(service, "/cost/reactor", {"diameter": [6.0], "length": {"value": 20.0}})
+    assert (status, payload) == (400, {"error": "invalid inputs: diameter, length"})
+    status, payload = request(service, "/cost/reactor/bulk", {"diameter": [[6.0]], "length": [20.0], "units": "m"})
+    assert (status, payload) == (400, {"error": "invalid inputs: diameter, units"})
+
+def test_body_must_be_an_object(service):
+    status, payload = request(service, "/cost/reactor", [6.0, 20.0])
+    assert (status, payload) == (400, {"error": "request body must be a JSON object"})
+
+def test_job_fields_are_checked(service):
+    status, payload = request(service, "/jobs/sweep", {"equipment_type": "reactor", "base": {"length": 20.0}})
+    assert (status, payload) == (400, {"error": "missing fields: name, values"})
+    status, payload = request(
+        service, "/jobs/monte-carlo", {"equipment_type": "reactor", "base": {"diameter": 6.0, "length": 20.0}, "spreads": {"space_time": 0.1}}
+    )
+    assert (status, payload) == (400, {"error": "missing input: space_time"})
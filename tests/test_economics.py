@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from economics import evaluate_scenarios, irr, npv, payback_period, scenario_grid
+
+def test_irr_of_a_single_period():
+    assert irr(np.array([-100.0, 110.0])) == pytest.approx(0.10)
+
+def test_irr_zeroes_the_npv_of_every_row():
+    flows = np.array([
+        [-1000.0] + [150.0] * 15,
+        [-1000.0] + [300.0] * 15,
+        [-500.0, 100.0, 200.0, 300.0, 400.0] + [0.0] * 11,
+    ])
+    rates = irr(flows)
+    assert rates.shape == (3,)
+    np.testing.assert_allclose(npv(flows, rates), 0.0, atol=1e-6)
+    assert rates[0] < rates[1]
+
+def test_irr_is_nan_without_a_sign_change():
+    rates = irr(np.array([[-100.0, -10.0, -10.0], [-100.0, 60.0, 60.0]]))
+    assert np.isnan(rates[0])
+    assert np.isfinite(rates[1])
+
+def test_payback_is_interpolated_within_the_year():
+    assert payback_period(np.array([-100.0, 40.0, 40.0, 40.0])) == pytest.approx(2.5)
+    assert np.isnan(payback_period(np.array([-100.0, 10.0, 10.0])))
+
+def test_every_scenario_gets_a_result():
+    scenarios = scenario_grid(product_price=[1.0, 1.2], discount_rate=[0.08, 0.1, 0.12])
+    results = evaluate_scenarios(dict(scenarios, capital=1e7, production=1e7, Q_heating=7194400.0))
+    for name, values in results.items():
+        assert np.shape(values) == (6,), name
+    # A higher price pays back sooner whatever the discount rate
+    assert (results["payback"][3:] < results["payback"][:3]).all()
+    assert (np.diff(results["npv"][:3]) < 0).all()
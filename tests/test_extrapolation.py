@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from batch_costing import VALIDITY_RANGES, cost_batch, vessel_cost
+from extrapolation import SCALING_EXPONENT, cost_in_range, cost_with_fallback, describe_flags, split_into_trains
+
+def test_oversized_exchangers_are_split_into_the_fewest_trains():
+    _, _, high = VALIDITY_RANGES["heat exchanger"]
+    columns = {"area": np.array([5000.0, 2.5 * high, 3 * high]), "pressure": 150.0, "material": "carbon steel/carbon steel"}
+    split, trains = split_into_trains("heat exchanger", columns)
+    assert trains.tolist() == [1.0, 3.0, 3.0]
+    np.testing.assert_allclose(split["area"], [5000.0, 2.5 * high / 3, high])
+    # The caller's columns are left alone
+    assert columns["area"][1] == 2.5 * high
+
+def test_split_total_covers_every_train():
+    _, _, high = VALIDITY_RANGES["heat exchanger"]
+    results = cost_with_fallback("heat exchanger", {"area": np.array([3 * high]), "pressure": 0.0})
+    one_train = cost_batch("heat exchanger", {"area": np.array([high]), "pressure": 0.0})
+    assert results["trains"][0] == 3
+    assert not results["extrapolated"][0]
+    assert results["total"][0] == pytest.approx(3 * one_train["total"][0])
+
+def test_units_within_range_are_not_split():
+    columns = {"inlet_flow": np.array([8000.0]), "inlet_pressure": 20.0, "outlet_pressure": 80.0, "specific_heat_ratio": 1.4, "efficiency": 0.78}
+    split, trains = split_into_trains("compressor", columns)
+    assert split is columns
+    assert trains.tolist() == [1.0]
+
+def test_vessels_beyond_range_are_extrapolated_with_six_tenths_rule():
+    _, _, high = VALIDITY_RANGES["reactor"]
+    results = cost_with_fallback("reactor", {"diameter": np.array([20.0]), "length": np.array([400.0]), "material": "carbon steel"})
+    assert results["W"][0] > high
+    assert results["extrapolated"][0] and results["trains"][0] == 1
+    expected = vessel_cost(high, "reactor") * (results["W"][0] / high) ** SCALING_EXPONENT
+    assert results["C_V"][0] == pytest.approx(expected)
+    assert describe_flags("reactor", results["range_flags"][0])[0] == f"vessel cost: W above {high:g}"
+
+def test_invalid_rows_keep_their_place():
+    results = cost_in_range("fired heater", {"heat_duty": np.array([5e7, -1.0, 2e9]), "material": "carbon steel"})
+    assert results["valid"].tolist() == [True, False, True]
+    assert np.isnan(results["total"][1])
+    assert results["trains"][2] == 4
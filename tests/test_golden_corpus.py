@@ -0,0 +1,24 @@
+import numpy as np
+
+import golden_corpus
+
+def test_factor_tables_do_not_drift():
+    assert golden_corpus.table_drift() == []
+
+def test_inputs_include_a_key_in_no_table():
+    columns = golden_corpus.random_inputs("heat exchanger", 1_000)
+    assert "unlisted" in set(columns["material"].tolist())
+
+def test_every_path_matches_a_small_corpus(tmp_path):
+    path = str(tmp_path / "corpus.npz")
+    golden_corpus.generate(path, rows=300, seed=7)
+    report = golden_corpus.check(path, scalar_rows=100)
+    failures = [(entry["kind"], entry["path"], entry["max_error"]) for entry in report if not entry["ok"]]
+    assert not failures
+    # Its seed is not the pinned one, so there are no pinned checksums to compare
+    assert all(entry["cases"] for entry in report)
+    assert {"vectorized", "cached", "jit"} <= {entry["path"] for entry in report}
+
+def test_max_relative_error_treats_matching_nan_as_equal():
+    assert golden_corpus.max_relative_error({"total": np.array([1.0, np.nan])}, {"total": np.array([1.0, np.nan])}) == 0.0
+    assert golden_corpus.max_relative_error({"total": np.array([1.0, np.nan])}, {"total": np.array([1.0, 2.0])}) == np.inf
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+import batch_costing
+import batch_utilities
+import jit_kernels
+from golden_corpus import max_relative_error, random_inputs
+
+# Without numba the row loops run as plain Python, so the sample is kept small
+ROWS = 2_000
+
+@pytest.mark.parametrize("equipment_type", sorted(jit_kernels.JIT_COSTERS))
+def test_row_loops_match_numpy_kernels(equipment_type):
+    columns = random_inputs(equipment_type, ROWS, seed=1)
+    with np.errstate(all="ignore"):
+        expected = batch_costing.cost_batch(equipment_type, columns)
+        actual = jit_kernels.JIT_COSTERS[equipment_type](columns)
+    assert max_relative_error(expected, actual) <= 1e-9
+
+def test_utilities_loop_matches_numpy_kernel():
+    columns = random_inputs("utilities", ROWS, seed=1)
+    assert max_relative_error(batch_utilities.utilities_batch(columns), jit_kernels.jit_utilities_batch(columns)) <= 1e-9
+
+def test_monte_carlo_matches_numpy_kernels():
+    base = {"diameter": 6.0, "length": 40.0, "num_trays": 30.0, "material": "stainless steel 304", "tray_type": "sieve", "tray_material": "carbon steel"}
+    spreads = {"diameter": 0.1, "length": 0.05}
+    expected = batch_costing.monte_carlo("distillation column", base, spreads, 500, seed=3)
+    actual = jit_kernels.monte_carlo("distillation column", base, spreads, 500, seed=3)
+    assert max_relative_error(expected, actual) <= 1e-9
+    assert actual["total"].shape == (500,)
+
+def test_sweep_keeps_one_result_per_value():
+    base = {"heat_duty": 1.5e7, "flux_rate": 5000.0, "pressure": 150.0, "material": "carbon steel/stainless steel"}
+    results = jit_kernels.sweep("heat exchanger", base, "pressure", np.linspace(0, 500, 11))
+    assert all(np.shape(values) == (11,) for values in results.values())
+    assert (np.diff(results["total"]) >= 0).all()
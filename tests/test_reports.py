@@ -0,0 +1,37 @@
+import os
+
+from reports import build_package, read_equipment_csv, unit_records
+from validation import checked_columns
+
+# One unit of each type, plus an invalid reactor, in one equipment list with blanks for other types' inputs
+MIXED_EQUIPMENT_CSV = """tag,plant_area,equipment_type,diameter,length,num_trays,tray_type,tray_material,heat_duty,flux_rate,pressure,inlet_flow,inlet_pressure,outlet_pressure,specific_heat_ratio,efficiency,drive_type,material
+R-101,100,reactor,6,20,,,,,,,,,,,,,stainless steel 316
+R-102,100,reactor,0,20,,,,,,,,,,,,,carbon steel
+T-201,200,distillation column,8,90,40,sieve,carbon steel,,,,,,,,,,carbon steel
+E-202,200,heat exchanger,,,,,,15000000,5000,150,,,,,,,carbon steel/stainless steel
+C-301,300,compressor,,,,,,,,,8000,20,80,1.4,0.78,electric,carbon steel
+H-101,100,fired heater,,,,,,50000000,,,,,,,,,carbon steel
+"""
+
+def mixed_records(tmp_path):
+    path = tmp_path / "equipment.csv"
+    path.write_text(MIXED_EQUIPMENT_CSV)
+    return unit_records(read_equipment_csv(str(path)))
+
+def test_mixed_equipment_list_costs_every_valid_unit(tmp_path):
+    records = mixed_records(tmp_path)
+    costed = {record["tag"]: record["results"].get("total") is not None for record in records}
+    assert costed == {"R-101": True, "R-102": False, "T-201": True, "E-202": True, "C-301": True, "H-101": True}
+    assert records[1]["status"] == "diameter must be > 0"
+
+def test_records_keep_only_their_own_inputs(tmp_path):
+    for record in mixed_records(tmp_path):
+        assert set(record["inputs"]) <= set(checked_columns(record["equipment_type"])), record["tag"]
+
+def test_package_renders_a_sheet_per_unit(tmp_path):
+    records = mixed_records(tmp_path)
+    counts = build_package(str(tmp_path / "package"), records, ("html", "csv"), workers=1)
+    assert counts["rendered"] == 6
+    assert os.path.exists(tmp_path / "package" / "plant_totals.csv")
+    # Unchanged units are not rendered again
+    assert build_package(str(tmp_path / "package"), records, ("html", "csv"), workers=1)["rendered"] == 0
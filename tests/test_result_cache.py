@@ -0,0 +1,81 @@
+import itertools
+import types
+
+import numpy as np
+import pytest
+
+import result_cache
+from batch_costing import cost_batch, factor_tables
+from extrapolation import cost_in_range
+from result_cache import ResultCache, cached_cost_batch, cached_cost_in_range, input_key, table_fingerprint
+
+@pytest.fixture
+def clock(monkeypatch):
+    # A strictly increasing clock, so least-recently-used order never depends on timer resolution
+    ticks = itertools.count()
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(time=lambda: float(next(ticks))))
+
+def exchangers(heat_duty):
+    return {"heat_duty": np.array(heat_duty), "flux_rate": 5000.0, "pressure": 150.0, "material": "carbon steel/stainless steel"}
+
+def test_hit_returns_stored_results(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    columns = exchangers([1.5e7, 3e7])
+    first = cached_cost_batch("heat exchanger", columns, cache)
+    second = cached_cost_batch("heat exchanger", columns, cache)
+    np.testing.assert_array_equal(first["total"], cost_batch("heat exchanger", columns)["total"])
+    np.testing.assert_array_equal(first["total"], second["total"])
+    assert cache.stats()["entries"] == 1
+
+def test_key_depends_on_inputs_and_ignores_category_case():
+    fingerprint = table_fingerprint({})
+    key = input_key("heat exchanger", exchangers([1.5e7]), fingerprint)
+    assert key != input_key("heat exchanger", exchangers([1.6e7]), fingerprint)
+    assert key == input_key("heat exchanger", dict(exchangers([1.5e7]), material="Carbon Steel/Stainless Steel"), fingerprint)
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    results = {"total": np.arange(1000, dtype=float)}
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    cache.put("a", "kernel", "f", results)
+    size = cache.stats()["bytes"]
+    cache.max_bytes = 2 * size
+    cache.put("b", "kernel", "f", results)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") is not None
+    cache.put("c", "kernel", "f", results)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+def test_changed_tables_miss_and_stale_entries_are_purged(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite"))
+    columns = exchangers([1.5e7])
+    tables = factor_tables("heat exchanger")
+    changed = {"HEAT_EXCHANGER_MATERIAL_FACTORS": dict(tables["HEAT_EXCHANGER_MATERIAL_FACTORS"], **{"carbon steel/stainless steel": {"a": 1.0, "b": 0.1}})}
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"total": np.array([float(len(calls))])}
+
+    cache.get_or_compute("heat exchanger", columns, tables, compute)
+    cache.get_or_compute("heat exchanger", columns, tables, compute)
+    assert len(calls) == 1
+    cache.get_or_compute("heat exchanger", columns, changed, compute)
+    assert len(calls) == 2
+    assert cache.purge_stale("heat exchanger", changed) == 1
+    assert cache.stats()["entries"] == 1
+
+def test_correlation_version_is_part_of_the_fingerprint(monkeypatch):
+    fingerprint = table_fingerprint(factor_tables("heat exchanger"))
+    monkeypatch.setattr(result_cache, "CORRELATION_VERSION", "test")
+    assert table_fingerprint(factor_tables("heat exchanger")) != fingerprint
+
+def test_equipment_lists_are_costed_once(default_cache):
+    columns = {"heat_duty": np.array([5e7, -1.0, 2e9]), "material": np.array(["carbon steel", "carbon steel", "Cr-Mo alloy"])}
+    first = cached_cost_in_range("fired heater", columns)
+    assert default_cache.stats()["entries"] == 1
+    second = cached_cost_in_range("fired heater", columns)
+    for name, values in cost_in_range("fired heater", columns).items():
+        np.testing.assert_array_equal(first[name], values)
+        np.testing.assert_array_equal(second[name], values)
@@ -0,0 +1,67 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from scenario_store import ScenarioStore
+
+def unit(tag, total, equipment_type="heat exchanger", plant_area="100"):
+    return {
+        "tag": tag,
+        "plant_area": plant_area,
+        "equipment_type": equipment_type,
+        "inputs": {"area": total / 10},
+        "results": {"total": total},
+        "status": "ok",
+    }
+
+@pytest.fixture
+def store(tmp_path):
+    return ScenarioStore(str(tmp_path / "scenarios.sqlite"))
+
+def test_diff_joins_units_on_tag(store):
+    store.save("base", [unit("E-101", 1000.0), unit("E-102", 2000.0), unit("E-103", 3000.0)])
+    store.save("revised", [unit("E-101", 1000.0), unit("E-102", 2500.0), unit("E-104", 4000.0, plant_area="200")])
+    result = store.diff("base", "revised")
+    units = result["units"]
+    assert units["tag"].tolist() == ["E-101", "E-102", "E-103", "E-104"]
+    assert units["status"].tolist() == ["unchanged", "changed", "removed", "added"]
+    np.testing.assert_allclose(units["delta"], [0.0, 500.0, -3000.0, 4000.0])
+    assert result["counts"] == {"added": 1, "removed": 1, "changed": 1, "unchanged": 1}
+    assert result["plant"]["C_P"] == pytest.approx(1500.0)
+    assert result["areas"]["200"] == pytest.approx(units["delta_C_BM"][3])
+
+def test_plant_deltas_match_the_stored_totals(store):
+    store.save("base", [unit("E-101", 1000.0), unit("C-101", 5000.0, "compressor")])
+    store.save("revised", [unit("E-101", 1200.0), unit("C-101", 5000.0, "compressor")])
+    totals = {scenario["name"]: scenario for scenario in store.scenarios()}
+    plant = store.diff("base", "revised")["plant"]
+    for name in ("C_P", "C_TBM", "C_TDC", "C_TPI"):
+        assert plant[name] == pytest.approx(totals["revised"][name] - totals["base"][name])
+
+def test_identical_units_are_stored_once(store):
+    store.save("a", [unit("E-101", 1000.0), unit("E-102", 1000.0)])
+    store.save("b", [unit("E-101", 1000.0)])
+    assert store.stats()["units"] == 1
+    assert [record["tag"] for record in store.records("a")] == ["E-101", "E-102"]
+
+def test_prune_keeps_referenced_units(store):
+    store.save("a", [unit("E-101", 1000.0)])
+    store.save("b", [unit("E-101", 2000.0)])
+    store.delete("a")
+    assert store.prune() == 1
+    assert store.records("b")[0]["results"]["total"] == 2000.0
+
+def test_stores_without_C_TDC_are_migrated(tmp_path):
+    path = str(tmp_path / "old.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE scenarios (name TEXT PRIMARY KEY, description TEXT NOT NULL, created REAL NOT NULL, units INTEGER NOT NULL,"
+        " C_P REAL NOT NULL, C_TBM REAL NOT NULL, C_TPI REAL NOT NULL, columns BLOB NOT NULL)"
+    )
+    connection.execute("INSERT INTO scenarios VALUES ('old', '', 0, 0, 1.0, 2.0, 100.0, x'00')")
+    connection.commit()
+    connection.close()
+    (scenario,) = ScenarioStore(path).scenarios()
+    assert scenario["C_TDC"] == 100.0
+    assert scenario["C_TPI"] == pytest.approx(114.0)
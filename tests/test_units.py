@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from units import conversion, convert, fired_heater_natural_gas, split_header, to_native
+
+def test_convert_scales_whole_columns():
+    np.testing.assert_allclose(convert(np.array([1.0, 10.0]), "m", "ft"), [3.280839895, 32.80839895])
+    np.testing.assert_allclose(convert(1.0, "MMBtu/hr", "Btu/hr"), 1e6)
+
+def test_gauge_pressure_has_an_offset():
+    assert convert(0.0, "psig", "psia") == pytest.approx(14.6959488)
+    assert convert(1.0, "barg", "kPag") == pytest.approx(100.0)
+
+def test_temperature_differences_have_no_offset():
+    assert convert(9.0, "delta_degF", "delta_degC") == pytest.approx(5.0)
+
+def test_incompatible_and_unknown_units_raise():
+    with pytest.raises(ValueError, match="Cannot convert"):
+        conversion("m", "kg")
+    with pytest.raises(ValueError, match="Unknown unit"):
+        conversion("furlong", "m")
+
+def test_headers_declare_units():
+    assert split_header("heat_duty [MMBtu/hr]") == ("heat_duty", "MMBtu/hr")
+    assert split_header("tag") == ("tag", None)
+    columns = to_native({"diameter [m]": np.array([0.3048]), "pressure": np.array([150.0]), "tag": np.array(["R-101"])}, units={"pressure": "psig"})
+    np.testing.assert_allclose(columns["diameter"], [1.0])
+    np.testing.assert_allclose(columns["pressure"], [150.0])
+    assert columns["tag"][0] == "R-101"
+
+def test_unit_on_a_column_without_native_unit_raises():
+    with pytest.raises(ValueError, match="no native unit"):
+        to_native({"tag [m]": np.array(["R-101"])})
+
+def test_fired_heater_gas_from_btu_per_hour():
+    Q_heater, m_ng = fired_heater_natural_gas(np.array([3.968e6]))
+    assert Q_heater[0] == pytest.approx(3.968e6 * 0.29307107017 / 1.163 / 0.8)
+    assert m_ng[0] == pytest.approx(Q_heater[0] / 13277.0)
@@ -0,0 +1,69 @@
+import numpy as np
+
+from extrapolation import cost_in_range
+from validation import (
+    EFFICIENCY_OUT_OF_RANGE,
+    NON_POSITIVE_DIAMETER,
+    NOT_FINITE,
+    OUTLET_NOT_ABOVE_INLET,
+    UNKNOWN_DRIVE_TYPE,
+    UNKNOWN_MATERIAL,
+    cost_valid_rows,
+    describe,
+    reason_counts,
+    validate,
+)
+
+def compressors():
+    return {
+        "inlet_flow": np.array([8000.0, 8000.0, 8000.0, np.nan]),
+        "inlet_pressure": np.array([20.0, 80.0, 20.0, 20.0]),
+        "outlet_pressure": np.array([80.0, 20.0, 80.0, 80.0]),
+        "specific_heat_ratio": 1.4,
+        "efficiency": np.array([0.78, 0.78, 1.5, 0.78]),
+        "drive_type": np.array(["electric", "electric", "diesel", "electric"]),
+        "material": "carbon steel",
+    }
+
+def test_reason_codes_per_row():
+    valid, reasons = validate("compressor", compressors())
+    assert valid.tolist() == [True, False, False, False]
+    assert reasons[0] == 0
+    assert reasons[1] == OUTLET_NOT_ABOVE_INLET
+    assert reasons[2] == EFFICIENCY_OUT_OF_RANGE | UNKNOWN_DRIVE_TYPE
+    assert reasons[3] == NOT_FINITE
+
+def test_describe_and_count_reasons():
+    _, reasons = validate("compressor", compressors())
+    assert describe(reasons[2]) == ["efficiency must be in (0, 1]", "unknown drive type"]
+    assert reason_counts(reasons) == {
+        "missing or non-numeric input": 1,
+        "outlet pressure must exceed inlet pressure": 1,
+        "efficiency must be in (0, 1]": 1,
+        "unknown drive type": 1,
+    }
+
+def test_unknown_material_is_case_insensitive():
+    _, reasons = validate("reactor", {"diameter": 6.0, "length": 20.0, "material": np.array(["Carbon Steel", "unobtainium"])})
+    assert reasons.tolist() == [0, UNKNOWN_MATERIAL]
+
+def test_invalid_rows_are_not_costed():
+    results = cost_valid_rows("compressor", compressors())
+    assert np.isfinite(results["total"][0])
+    assert np.isnan(results["total"][1:]).all()
+    assert results["valid"].tolist() == [True, False, False, False]
+
+def test_all_invalid_vessel_batch():
+    # A reactor or column batch with no valid row comes back as NaN with reason codes instead of raising
+    columns = {"diameter": np.array([0.0, -1.0]), "length": np.array([10.0, 10.0]), "num_trays": 10.0}
+    for equipment_type in ("reactor", "distillation column"):
+        for results in (cost_valid_rows(equipment_type, columns), cost_in_range(equipment_type, columns)):
+            assert not results["valid"].any()
+            assert np.isnan(results["total"]).all()
+            assert (results["reason"] & NON_POSITIVE_DIAMETER).all()
+
+def test_blank_inputs_of_other_types_are_ignored():
+    columns = {"diameter": np.array([6.0]), "length": np.array([20.0]), "heat_duty": np.array([np.nan]), "pressure": np.array([np.nan])}
+    results = cost_in_range("reactor", columns)
+    assert results["valid"].all()
+    assert np.isfinite(results["total"]).all()
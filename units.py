@@ -0,0 +1,160 @@
+import re
+
+import numpy as np
+
+from batch_utilities import calculate_natural_gas, delta_H_comb, efficiency
+
+# Units: name -> (dimension, scale, offset) with value_in_SI = value * scale + offset
+UNITS = {
+    # Length
+    "m": ("length", 1.0, 0.0),
+    "cm": ("length", 0.01, 0.0),
+    "mm": ("length", 0.001, 0.0),
+    "ft": ("length", 0.3048, 0.0),
+    "in": ("length", 0.0254, 0.0),
+    # Area
+    "m2": ("area", 1.0, 0.0),
+    "ft2": ("area", 0.09290304, 0.0),
+    # Time
+    "s": ("time", 1.0, 0.0),
+    "min": ("time", 60.0, 0.0),
+    "hr": ("time", 3600.0, 0.0),
+    # Volumetric flow
+    "m3/s": ("volumetric flow", 1.0, 0.0),
+    "m3/min": ("volumetric flow", 1 / 60, 0.0),
+    "m3/hr": ("volumetric flow", 1 / 3600, 0.0),
+    "L/min": ("volumetric flow", 0.001 / 60, 0.0),
+    "ft3/min": ("volumetric flow", 0.028316846592 / 60, 0.0),
+    "ft3/s": ("volumetric flow", 0.028316846592, 0.0),
+    "gpm": ("volumetric flow", 0.003785411784 / 60, 0.0),
+    # Mass
+    "kg": ("mass", 1.0, 0.0),
+    "lb": ("mass", 0.45359237, 0.0),
+    "t": ("mass", 1000.0, 0.0),
+    # Mass flow
+    "kg/s": ("mass flow", 1.0, 0.0),
+    "kg/hr": ("mass flow", 1 / 3600, 0.0),
+    "lb/hr": ("mass flow", 0.45359237 / 3600, 0.0),
+    "t/hr": ("mass flow", 1000 / 3600, 0.0),
+    # Power and heat duty
+    "W": ("power", 1.0, 0.0),
+    "kW": ("power", 1e3, 0.0),
+    "MW": ("power", 1e6, 0.0),
+    "hp": ("power", 745.69987158227, 0.0),
+    "Btu/hr": ("power", 0.29307107017, 0.0),
+    "MMBtu/hr": ("power", 293071.07017, 0.0),
+    "kcal/hr": ("power", 1.163, 0.0),
+    "Gcal/hr": ("power", 1.163e6, 0.0),
+    "GJ/hr": ("power", 1e9 / 3600, 0.0),
+    # Heat flux
+    "W/m2": ("heat flux", 1.0, 0.0),
+    "kW/m2": ("heat flux", 1e3, 0.0),
+    "Btu/hr-ft2": ("heat flux", 3.15459075, 0.0),
+    # Pressure, absolute and gauge
+    "Pa": ("pressure", 1.0, 0.0),
+    "kPa": ("pressure", 1e3, 0.0),
+    "MPa": ("pressure", 1e6, 0.0),
+    "bar": ("pressure", 1e5, 0.0),
+    "atm": ("pressure", 101325.0, 0.0),
+    "psia": ("pressure", 6894.757293168, 0.0),
+    "psig": ("pressure", 6894.757293168, 101325.0),
+    "barg": ("pressure", 1e5, 101325.0),
+    "kPag": ("pressure", 1e3, 101325.0),
+    # Temperature difference
+    "delta_degC": ("temperature difference", 1.0, 0.0),
+    "delta_K": ("temperature difference", 1.0, 0.0),
+    "delta_degF": ("temperature difference", 5 / 9, 0.0),
+    # Specific energy
+    "kJ/kg": ("specific energy", 1e3, 0.0),
+    "kcal/kg": ("specific energy", 4186.8, 0.0),
+    "Btu/lb": ("specific energy", 2326.0, 0.0),
+    # Dimensionless
+    "-": ("dimensionless", 1.0, 0.0),
+    "%": ("dimensionless", 0.01, 0.0),
+}
+
+# Units the correlations expect for each input column
+NATIVE_UNITS = {
+    # Equipment cost full script.py
+    "diameter": "ft",
+    "length": "ft",
+    "tube_length": "ft",
+    "space_time": "min",
+    "volumetric_flow_rate": "ft3/min",
+    "area": "ft2",
+    "heat_duty": "Btu/hr",
+    "flux_rate": "Btu/hr-ft2",
+    "pressure": "psig",
+    "inlet_flow": "ft3/min",
+    "inlet_pressure": "psia",
+    "outlet_pressure": "psia",
+    "efficiency": "-",
+    "power": "hp",
+    # UtilitiesCalculator.py
+    "Q_cooling": "kcal/hr",
+    "Q_heating": "kcal/hr",
+    "delta_T_cw": "delta_degC",
+    "delta_H_comb": "kcal/kg",
+    "m_cw": "kg/hr",
+    "m_ng": "kg/hr",
+    "m_CO2": "kg/hr",
+}
+
+HEADER = re.compile(r"^\s*(?P<name>[^\[]+?)\s*\[(?P<unit>[^\]]+)\]\s*$")
+
+def conversion(from_unit, to_unit):
+    """
+    Return (scale, offset) such that value_in_to_unit = value_in_from_unit * scale + offset.
+    """
+    if from_unit not in UNITS:
+        raise ValueError(f"Unknown unit: {from_unit}")
+    if to_unit not in UNITS:
+        raise ValueError(f"Unknown unit: {to_unit}")
+    from_dimension, from_scale, from_offset = UNITS[from_unit]
+    to_dimension, to_scale, to_offset = UNITS[to_unit]
+    if from_dimension != to_dimension:
+        raise ValueError(f"Cannot convert {from_unit} ({from_dimension}) to {to_unit} ({to_dimension})")
+    return from_scale / to_scale, (from_offset - to_offset) / to_scale
+
+def convert(values, from_unit, to_unit):
+    """
+    Convert a whole column with one multiply-add.
+    """
+    if from_unit == to_unit:
+        return values
+    scale, offset = conversion(from_unit, to_unit)
+    return np.asarray(values, dtype=float) * scale + offset
+
+def split_header(header):
+    """
+    Split a column header like "heat_duty [MMBtu/hr]" into ("heat_duty", "MMBtu/hr"); the unit is None if absent.
+    """
+    match = HEADER.match(header)
+    if match is None:
+        return header.strip(), None
+    return match.group("name"), match.group("unit").strip()
+
+def to_native(columns, units=None, native=NATIVE_UNITS):
+    """
+    Convert input columns to the units the correlations expect, once per column.
+    Units are declared in the units mapping or in the column headers ("diameter [m]");
+    columns without a declared unit are taken to be in native units already.
+    """
+    units = dict(units or {})
+    converted = {}
+    for header, values in columns.items():
+        name, unit = split_header(header)
+        unit = units.get(name, unit)
+        if unit is not None and name in native:
+            values = convert(values, unit, native[name])
+        elif unit is not None:
+            raise ValueError(f"Column {name} has no native unit to convert {unit} to")
+        converted[name] = values
+    return converted
+
+def fired_heater_natural_gas(heat_duty, unit="Btu/hr", delta_H_comb=delta_H_comb, efficiency=efficiency):
+    """
+    Natural gas for fired heaters costed in Btu/hr, with the duty converted to kcal/hr for calculate_natural_gas.
+    Returns Q_heater (kcal/hr) and m_ng (kg/hr).
+    """
+    return calculate_natural_gas(convert(heat_duty, unit, "kcal/hr"), delta_H_comb, efficiency)
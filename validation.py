@@ -0,0 +1,289 @@
+import numpy as np
+
+from batch_costing import (
+    ALTERNATE_INPUTS,
+    COMPRESSOR_DRIVE_FACTORS,
+    COMPRESSOR_MATERIAL_FACTORS,
+    FIRED_HEATER_MATERIAL_FACTORS,
+    HEAT_EXCHANGER_MATERIAL_FACTORS,
+    INPUT_COLUMNS,
+    MATERIAL_FACTORS,
+    RESULT_COLUMNS,
+    TRAY_MATERIAL_FACTORS,
+    TRAY_TYPE_FACTORS,
+    VALIDITY_RANGES,
+    cost_batch,
+    size_variable,
+)
+from batch_utilities import UTILITY_INPUTS, UTILITY_RESULTS, utilities_batch
+from instrumentation import count_rows, instrument
+
+# Reason codes: one bit per failed check, OR-ed together per row
+NOT_FINITE = 1 << 0
+NON_POSITIVE_DIAMETER = 1 << 1
+NON_POSITIVE_LENGTH = 1 << 2
+NO_TRAYS = 1 << 3
+NON_POSITIVE_SPACE_TIME = 1 << 4
+NON_POSITIVE_FLOW_RATE = 1 << 5
+NON_POSITIVE_HEAT_DUTY = 1 << 6
+NON_POSITIVE_FLUX = 1 << 7
+NON_POSITIVE_AREA = 1 << 8
+NEGATIVE_PRESSURE = 1 << 9
+NON_POSITIVE_INLET_FLOW = 1 << 10
+NON_POSITIVE_INLET_PRESSURE = 1 << 11
+OUTLET_NOT_ABOVE_INLET = 1 << 12
+SPECIFIC_HEAT_RATIO_NOT_ABOVE_1 = 1 << 13
+EFFICIENCY_OUT_OF_RANGE = 1 << 14
+NON_POSITIVE_POWER = 1 << 15
+NON_POSITIVE_DELTA_T = 1 << 16
+NEGATIVE_DUTY = 1 << 17
+UNKNOWN_MATERIAL = 1 << 18
+UNKNOWN_TRAY_TYPE = 1 << 19
+UNKNOWN_TRAY_MATERIAL = 1 << 20
+UNKNOWN_DRIVE_TYPE = 1 << 21
+BELOW_CORRELATION_RANGE = 1 << 22
+ABOVE_CORRELATION_RANGE = 1 << 23
+
+REASONS = {
+    NOT_FINITE: "missing or non-numeric input",
+    NON_POSITIVE_DIAMETER: "diameter must be > 0",
+    NON_POSITIVE_LENGTH: "length must be > 0",
+    NO_TRAYS: "number of trays must be >= 1",
+    NON_POSITIVE_SPACE_TIME: "space time must be > 0",
+    NON_POSITIVE_FLOW_RATE: "volumetric flow rate must be > 0",
+    NON_POSITIVE_HEAT_DUTY: "heat duty must be > 0",
+    NON_POSITIVE_FLUX: "flux rate must be > 0",
+    NON_POSITIVE_AREA: "area must be > 0",
+    NEGATIVE_PRESSURE: "design pressure must be >= 0",
+    NON_POSITIVE_INLET_FLOW: "inlet flow must be > 0",
+    NON_POSITIVE_INLET_PRESSURE: "inlet pressure must be > 0",
+    OUTLET_NOT_ABOVE_INLET: "outlet pressure must exceed inlet pressure",
+    SPECIFIC_HEAT_RATIO_NOT_ABOVE_1: "k = Cp/Cv must be > 1",
+    EFFICIENCY_OUT_OF_RANGE: "efficiency must be in (0, 1]",
+    NON_POSITIVE_POWER: "power must be > 0",
+    NON_POSITIVE_DELTA_T: "cooling water temperature rise must be > 0",
+    NEGATIVE_DUTY: "utility duty must be >= 0",
+    UNKNOWN_MATERIAL: "unknown material of construction",
+    UNKNOWN_TRAY_TYPE: "unknown tray type",
+    UNKNOWN_TRAY_MATERIAL: "unknown tray material",
+    UNKNOWN_DRIVE_TYPE: "unknown drive type",
+    BELOW_CORRELATION_RANGE: "size below the correlation's validity range",
+    ABOVE_CORRELATION_RANGE: "size above the correlation's validity range",
+}
+
+# Reason codes that make a row uncostable (the rest only mark it outside the fitted range)
+DOMAIN_ERRORS = sum(REASONS) & ~(BELOW_CORRELATION_RANGE | ABOVE_CORRELATION_RANGE)
+
+# Numeric checks per input column: (reason, test that is True for bad values)
+COLUMN_CHECKS = {
+    "diameter": (NON_POSITIVE_DIAMETER, lambda x: x <= 0),
+    "length": (NON_POSITIVE_LENGTH, lambda x: x <= 0),
+    "num_trays": (NO_TRAYS, lambda x: x < 1),
+    "space_time": (NON_POSITIVE_SPACE_TIME, lambda x: x <= 0),
+    "volumetric_flow_rate": (NON_POSITIVE_FLOW_RATE, lambda x: x <= 0),
+    "heat_duty": (NON_POSITIVE_HEAT_DUTY, lambda x: x <= 0),
+    "flux_rate": (NON_POSITIVE_FLUX, lambda x: x <= 0),
+    "area": (NON_POSITIVE_AREA, lambda x: x <= 0),
+    "pressure": (NEGATIVE_PRESSURE, lambda x: x < 0),
+    "inlet_flow": (NON_POSITIVE_INLET_FLOW, lambda x: x <= 0),
+    "inlet_pressure": (NON_POSITIVE_INLET_PRESSURE, lambda x: x <= 0),
+    "outlet_pressure": (OUTLET_NOT_ABOVE_INLET, lambda x: x <= 0),
+    "specific_heat_ratio": (SPECIFIC_HEAT_RATIO_NOT_ABOVE_1, lambda x: x <= 1),
+    "efficiency": (EFFICIENCY_OUT_OF_RANGE, lambda x: (x <= 0) | (x > 1)),
+    "power": (NON_POSITIVE_POWER, lambda x: x <= 0),
+    "delta_T_cw": (NON_POSITIVE_DELTA_T, lambda x: x <= 0),
+    "Q_cooling": (NEGATIVE_DUTY, lambda x: x < 0),
+    "Q_heating": (NEGATIVE_DUTY, lambda x: x < 0),
+}
+
+# Category checks per equipment type: (column, table, reason)
+CATEGORY_CHECKS = {
+    "reactor": (("material", MATERIAL_FACTORS, UNKNOWN_MATERIAL),),
+    "distillation column": (
+        ("material", MATERIAL_FACTORS, UNKNOWN_MATERIAL),
+        ("tray_type", TRAY_TYPE_FACTORS, UNKNOWN_TRAY_TYPE),
+        ("tray_material", TRAY_MATERIAL_FACTORS, UNKNOWN_TRAY_MATERIAL),
+    ),
+    "heat exchanger": (("material", HEAT_EXCHANGER_MATERIAL_FACTORS, UNKNOWN_MATERIAL),),
+    "compressor": (
+        ("material", COMPRESSOR_MATERIAL_FACTORS, UNKNOWN_MATERIAL),
+        ("drive_type", COMPRESSOR_DRIVE_FACTORS, UNKNOWN_DRIVE_TYPE),
+    ),
+    "fired heater": (("material", FIRED_HEATER_MATERIAL_FACTORS, UNKNOWN_MATERIAL),),
+}
+
+# Inputs a unit cannot be costed without, as alternative sets: any one complete set is enough
+# (e.g. reactor dimensions, or space time and flow rate). Every utility whose duty is given needs its set.
+REQUIRED_INPUTS = {
+    "reactor": (("diameter", "length"), ("space_time", "volumetric_flow_rate")),
+    "distillation column": (("diameter", "length", "num_trays"),),
+    "heat exchanger": (("heat_duty", "flux_rate"), ("area",)),
+    "compressor": (("inlet_flow", "inlet_pressure", "outlet_pressure", "specific_heat_ratio", "efficiency"), ("power",)),
+    "fired heater": (("heat_duty",),),
+    "utilities": (("Q_cooling", "delta_T_cw"), ("Q_heating",)),
+}
+
+def missing_inputs(equipment_type, columns):
+    """
+    Names of the required inputs missing from columns for an equipment type (or "utilities"); empty if none are.
+    When no set is complete, the missing names of the most complete set are returned.
+    """
+    alternatives = REQUIRED_INPUTS[equipment_type]
+    if equipment_type == "utilities":
+        given = [names for names in alternatives if names[0] in columns] or alternatives[:1]
+        return tuple(name for names in given for name in names if name not in columns)
+    return min((tuple(name for name in names if name not in columns) for names in alternatives), key=len)
+
+def checked_columns(equipment_type):
+    """
+    The input columns validated for an equipment type (or "utilities"); other columns in a batch,
+    e.g. blank cells of another type's inputs in a mixed equipment list, are ignored.
+    """
+    if equipment_type == "utilities":
+        return tuple(name for names in UTILITY_INPUTS.values() for name in names)
+    return INPUT_COLUMNS.get(equipment_type, ()) + ALTERNATE_INPUTS.get(equipment_type, ())
+
+def result_columns(equipment_type, columns):
+    """
+    Names of the result columns the kernel returns for an equipment type (or "utilities") and these inputs.
+    """
+    if equipment_type == "utilities":
+        return tuple(name for utility, names in UTILITY_RESULTS.items() if utility in columns for name in names)
+    return RESULT_COLUMNS[equipment_type]
+
+def _unknown(table, keys, rows):
+    """
+    True where a category key is not in its factor table, with one check per distinct key.
+    """
+    keys = np.asarray(keys)
+    unique, inverse = np.unique(keys.reshape(-1), return_inverse=True)
+    unknown = np.array([str(key).lower() not in table for key in unique])
+    return np.broadcast_to(unknown[inverse].reshape(keys.shape), (rows,))
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def non_numeric_inputs(equipment_type, columns):
+    """
+    Names of the checked numeric inputs with a missing or non-numeric value in any row.
+    """
+    names = []
+    for name in checked_columns(equipment_type):
+        if name in columns and name in COLUMN_CHECKS:
+            values = np.array([_to_float(value) for value in np.ravel(columns[name])])
+            if not np.isfinite(values).all():
+                names.append(name)
+    return tuple(names)
+
+@instrument("validation.validate", rows="columns")
+def validate(equipment_type, columns, check_ranges=True):
+    """
+    Check every row's physical domain in one pass, over the inputs in checked_columns(equipment_type).
+    Returns (valid, reasons): a boolean mask and an array of OR-ed reason codes per row.
+    Rows outside the correlation's fitted size range are invalid unless check_ranges is False.
+    """
+    rows = count_rows(columns)
+    reasons = np.zeros(rows, dtype=np.uint32)
+
+    # Numeric domain checks
+    numeric = {}
+    for name in checked_columns(equipment_type):
+        if name not in columns or name not in COLUMN_CHECKS:
+            continue
+        values = columns[name]
+        try:
+            values = np.broadcast_to(np.asarray(values, dtype=float), (rows,))
+        except ValueError:
+            values = np.broadcast_to(np.array([_to_float(value) for value in np.ravel(values)]), (rows,))
+        numeric[name] = values
+        reason, test = COLUMN_CHECKS[name]
+        with np.errstate(invalid="ignore"):
+            reasons |= np.where(~np.isfinite(values), NOT_FINITE, np.where(test(values), reason, 0)).astype(np.uint32)
+    if "inlet_pressure" in numeric and "outlet_pressure" in numeric:
+        reasons |= np.where(numeric["outlet_pressure"] <= numeric["inlet_pressure"], OUTLET_NOT_ABOVE_INLET, 0).astype(np.uint32)
+
+    # Category checks
+    for name, table, reason in CATEGORY_CHECKS.get(equipment_type, ()):
+        if name in columns:
+            reasons |= np.where(_unknown(table, columns[name], rows), reason, 0).astype(np.uint32)
+
+    # Correlation validity range, evaluated only where the inputs are in the physical domain
+    if check_ranges and equipment_type in VALIDITY_RANGES:
+        _, low, high = VALIDITY_RANGES[equipment_type]
+        with np.errstate(all="ignore"):
+            size = np.broadcast_to(size_variable(equipment_type, dict(columns, **numeric)), (rows,))
+        domain_ok = (reasons & DOMAIN_ERRORS) == 0
+        reasons |= np.where(domain_ok & (size < low), BELOW_CORRELATION_RANGE, 0).astype(np.uint32)
+        reasons |= np.where(domain_ok & (size > high), ABOVE_CORRELATION_RANGE, 0).astype(np.uint32)
+    return reasons == 0, reasons
+
+def describe(reason):
+    """
+    List the messages for one row's reason code.
+    """
+    return [message for code, message in REASONS.items() if reason & code]
+
+def unit_status(reason, extrapolated, trains, equipment_type=None, flags=0):
+    """
+    One-line status of a costed unit.
+    """
+    # Imported here because extrapolation imports this module
+    from extrapolation import describe_flags
+
+    if reason:
+        return "; ".join(describe(reason))
+    if extrapolated:
+        messages = describe_flags(equipment_type, flags) if equipment_type else []
+        return "extrapolated beyond correlation range" + (f" ({'; '.join(messages)})" if messages else "")
+    if trains > 1:
+        return f"split into {int(trains)} trains"
+    return "ok"
+
+def reason_counts(reasons):
+    """
+    Count the rows failing each check.
+    """
+    counts = {}
+    for code, message in REASONS.items():
+        count = int(np.count_nonzero(reasons & code))
+        if count:
+            counts[message] = count
+    return counts
+
+def select_rows(columns, mask):
+    """
+    Keep the rows of every array column where mask is True; scalar columns are kept as they are.
+    """
+    return {name: np.asarray(values)[mask] if np.ndim(values) else values for name, values in columns.items()}
+
+def scatter_rows(results, mask):
+    """
+    Expand results computed for the masked rows back to full length, with NaN in the other rows.
+    """
+    expanded = {}
+    for name, values in results.items():
+        full = np.full(mask.shape, np.nan)
+        full[mask] = values
+        expanded[name] = full
+    return expanded
+
+@instrument("validation.cost_valid_rows", rows="columns")
+def cost_valid_rows(equipment_type, columns, check_ranges=True):
+    """
+    Validate, then cost only the valid rows; invalid rows get NaN costs and their reason codes.
+    A batch with no valid row is never passed to the kernel.
+    """
+    valid, reasons = validate(equipment_type, columns, check_ranges)
+    kernel = utilities_batch if equipment_type == "utilities" else lambda selected: cost_batch(equipment_type, selected)
+    if valid.any():
+        with np.errstate(all="ignore"):
+            results = scatter_rows(kernel(select_rows(columns, valid)), valid)
+    else:
+        # Nothing to cost, so the kernel never sees an empty batch
+        results = {name: np.full(valid.shape, np.nan) for name in result_columns(equipment_type, columns)}
+    results["valid"] = valid
+    results["reason"] = reasons
+    return results